@@ -4,9 +4,12 @@ Korrekte Ellipsen-Erkennung basierend auf X-Achsen-Richtungsänderungen
 Jeder Umkehrpunkt ist gleichzeitig Ende einer Ellipse und Start der nächsten
 """
 
-import matplotlib.pyplot as plt
+import sys
+
 import numpy as np
 
+from trajectory_io import load_trajectory, parse_trajectory
+
 # === DATEN AUS DEM LOG ===
 csv_data = """Frame,X,Y
 0,0.782227,0.399475
@@ -122,268 +125,234 @@ csv_data = """Frame,X,Y
 133,0.050018,0.478851
 134,0.005936,0.578964"""
 
-# === CSV PARSEN & SORTIEREN ===
-lines = csv_data.strip().split('\n')[1:]
-data_points = []
-
-for line in lines:
-    parts = line.split(',')
-    frame = int(parts[0])
-    x = float(parts[1])
-    y = float(parts[2])
-    data_points.append({'frame': frame, 'x': x, 'y': y})
-
-# Nach Frame-Nummer sortieren
-data_points.sort(key=lambda p: p['frame'])
-
-print(f"📊 {len(data_points)} Punkte geladen (Frame {data_points[0]['frame']} → {data_points[-1]['frame']})")
-
-# === UMKEHRPUNKT-ERKENNUNG ===
 MIN_MOVEMENT = 0.015  # Schwellwert für signifikante Bewegung
 MIN_FRAMES_BETWEEN = 10  # Mindestabstand zwischen Umkehrpunkten
+COLORS = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844']
+OUTPUT_PATH = '/Users/merlinhummel/Documents/HammerTrack/correct_ellipses.png'
+
+
+def points_of(trajectory):
+    return [
+        {'frame': frame, 'x': x, 'y': y}
+        for frame, x, y in zip(trajectory.frames.tolist(), trajectory.x.tolist(), trajectory.y.tolist())
+    ]
+
+
+def initial_direction(data_points):
+    """+1 (rechts), -1 (links) oder None - aus den ersten 5 Punkten."""
+    for i in range(1, min(5, len(data_points))):
+        dx = data_points[i]['x'] - data_points[i-1]['x']
+        if abs(dx) > MIN_MOVEMENT:
+            return 1 if dx > 0 else -1
+    return None
+
+
+def detect_turning_points(data_points):
+    """Umkehrpunkte mit Bewegungs-Schwellwert und Mindestabstand.
+
+    1. Erster Punkt ist immer Startpunkt
+    2. Initiale Richtung aus den ersten Punkten
+    3. Jeder Richtungswechsel nach MIN_FRAMES_BETWEEN Frames
+    """
+    turning_points = [{
+        'index': 0,
+        'frame': data_points[0]['frame'],
+        'x': data_points[0]['x'],
+        'y': data_points[0]['y'],
+        'type': 'START'
+    }]
+    current_direction = initial_direction(data_points)
+
+    frames_since_last_turn = 0
+    for i in range(1, len(data_points)):
+        frames_since_last_turn += 1
+
+        dx = data_points[i]['x'] - data_points[i-1]['x']
+
+        if abs(dx) > MIN_MOVEMENT and frames_since_last_turn >= MIN_FRAMES_BETWEEN:
+            new_direction = 1 if dx > 0 else -1
+
+            if current_direction is not None and new_direction != current_direction:
+                # Richtungswechsel erkannt!
+                turning_points.append({
+                    'index': i-1,
+                    'frame': data_points[i-1]['frame'],
+                    'x': data_points[i-1]['x'],
+                    'y': data_points[i-1]['y'],
+                    'type': 'MAXIMUM' if current_direction > 0 else 'MINIMUM'
+                })
+                current_direction = new_direction
+                frames_since_last_turn = 0
+    return turning_points
+
+
+def three_point_ellipses(turning_points, colors=COLORS):
+    """3-Punkt-Ellipsen TP(i) → TP(i+1) → TP(i+2), in 2er-Schritten.
+
+    Der Winkel wird von TP(i) zu TP(i+2) gemessen, TP(i+2) wird dann zum
+    Start der nächsten Ellipse (Überlappung).
+    """
+    ellipses = []
+    for number, i in enumerate(range(0, len(turning_points) - 2, 2), start=1):
+        tp1 = turning_points[i]      # Start
+        tp2 = turning_points[i + 1]  # Mitte
+        tp3 = turning_points[i + 2]  # Ende (wird Start der nächsten)
+
+        # Winkel berechnen: Von TP1 zu TP3!
+        dx = tp3['x'] - tp1['x']
+        dy = tp3['y'] - tp1['y']
+
+        angle_rad = np.arctan2(abs(dy), abs(dx))
+        angle_deg = angle_rad * 180.0 / np.pi
+
+        # Richtung bestimmen (Y=0 ist oben)
+        if tp1['y'] > tp3['y']:
+            angle_deg = angle_deg  # Positiv = fällt nach oben
+        else:
+            angle_deg = -angle_deg  # Negativ = fällt nach unten
+
+        ellipses.append({
+            'number': number,
+            'start_frame': tp1['frame'],
+            'end_frame': tp3['frame'],
+            'start_index': tp1['index'],
+            'end_index': tp3['index'],
+            'mid_frame': tp2['frame'],
+            'mid_index': tp2['index'],
+            'start_x': tp1['x'],
+            'start_y': tp1['y'],
+            'mid_x': tp2['x'],
+            'mid_y': tp2['y'],
+            'end_x': tp3['x'],
+            'end_y': tp3['y'],
+            'angle': angle_deg,
+            'color': colors[(number - 1) % len(colors)],
+            'tp_start': i,
+            'tp_mid': i + 1,
+            'tp_end': i + 2
+        })
+    return ellipses
+
+
+def average_angle(ellipses):
+    return sum(e['angle'] for e in ellipses) / len(ellipses) if ellipses else 0
+
+
+def print_report(data_points, turning_points, ellipses):
+    print(f"📊 {len(data_points)} Punkte geladen (Frame {data_points[0]['frame']} → {data_points[-1]['frame']})")
+
+    start = turning_points[0]
+    print(f"\n🎯 Umkehrpunkt 0 (START): Frame {start['frame']} bei ({start['x']:.3f}, {start['y']:.3f})")
+    direction = initial_direction(data_points)
+    if direction is not None:
+        print(f"   Initiale Richtung: {'rechts →' if direction > 0 else 'links ←'}")
+    for number, tp in enumerate(turning_points[1:], start=1):
+        print(f"🔄 Umkehrpunkt {number}: Frame {tp['frame']} "
+              f"({tp['x']:.3f}, {tp['y']:.3f}) - {tp['type']}")
+    print(f"\n✅ Insgesamt {len(turning_points)} Umkehrpunkte gefunden")
+
+    print("\n🔍 Erstelle 3-Punkt-Ellipsen (mit Überlappung):")
+    for e in ellipses:
+        i = e['tp_start']
+        print(f"\n📐 Ellipse {e['number']}:")
+        print(f"   TP{i} → TP{i+1} → TP{i+2}")
+        print(f"   Frame {e['start_frame']} → {e['mid_frame']} → {e['end_frame']}")
+        print(f"   Position: ({e['start_x']:.3f}, {e['start_y']:.3f}) → ({e['mid_x']:.3f}, {e['mid_y']:.3f}) → ({e['end_x']:.3f}, {e['end_y']:.3f})")
+        print(f"   Winkel (TP{i} → TP{i+2}): {e['angle']:.2f}°")
+
+    print(f"\n✅ {len(ellipses)} Ellipsen gefunden")
+    print(f"\n📊 Durchschnittlicher Winkel: {average_angle(ellipses):.2f}°")
+
+
+def render_figure(trajectory, turning_points, ellipses):
+    """3-Punkt-Ellipsen, Umkehrpunkte und Winkel-Linien als Figure."""
+    from rendering import (draw_angle_lines, draw_segment_points, draw_segments, draw_turning_points,
+                           new_figure, segment_legend_handles)
+
+    fig, ax = new_figure((16, 10))
+
+    x_flipped = trajectory.x
+    y_flipped = 1 - trajectory.y  # Y-Flip
+    colors = [e['color'] for e in ellipses]
+    start = [e['start_index'] for e in ellipses]
+    end = [e['end_index'] for e in ellipses]
+
+    # Alle 3-Punkt-Ellipsen als farbige Linien + Punkte - je ein Artist
+    draw_segments(ax, x_flipped, y_flipped, start, end, colors, linewidth=5, alpha=0.85, zorder=4)
+    draw_segment_points(ax, x_flipped, y_flipped, start, end, colors, s=70, alpha=0.8, zorder=5)
+
+    # Zeichne Umkehrpunkte
+    draw_turning_points(ax, [tp['x'] for tp in turning_points], [1 - tp['y'] for tp in turning_points],
+                        [tp['type'] for tp in turning_points], size=400, start_size=500)
+
+    for i, tp in enumerate(turning_points):
+        # Label
+        label_offset = -0.07 if i % 2 == 0 else 0.07
+        va = 'top' if i % 2 == 0 else 'bottom'
+
+        ax.text(
+            tp['x'], 1 - tp['y'] + label_offset,
+            f"TP{i}\nF{tp['frame']}",
+            ha='center', va=va,
+            fontsize=10, fontweight='bold',
+            bbox=dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.95, edgecolor='black', linewidth=2),
+            zorder=11
+        )
+
+    # Gestrichelte Linie von Start zu Ende jeder Ellipse (Winkel-Linie)
+    draw_angle_lines(ax, [e['start_x'] for e in ellipses], [1 - e['start_y'] for e in ellipses],
+                     [e['end_x'] for e in ellipses], [1 - e['end_y'] for e in ellipses], colors)
+
+    # Layout
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+    ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
+    ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
+    ax.set_title(f'HammerTrack: 3-Punkt-Ellipsen-Analyse\n{len(trajectory)} Frames • {len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
+                 fontsize=15, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_aspect('equal')
+
+    # Legende
+    ax.legend(handles=segment_legend_handles(
+                  colors, [f"Ellipse {e['number']}: {e['angle']:.2f}°" for e in ellipses], alpha=0.85),
+              loc='upper right', fontsize=11, framealpha=0.95, edgecolor='black')
+
+    # Info-Box
+    info_text = f"""3-Punkt-Ellipsen:
+• {len(turning_points)} Umkehrpunkte gefunden
+• {len(ellipses)} Ellipsen (je 3 Umkehrpunkte)
+• Winkel: TP(i) → TP(i+2)
+• TP(i+2) wird Start der nächsten Ellipse
+• Durchschnittlicher Winkel: {average_angle(ellipses):.2f}°
+• Gestrichelte Linien = Winkel-Messung"""
 
-turning_points = []
-current_direction = None
-
-# 1. Erster Punkt ist immer Startpunkt
-turning_points.append({
-    'index': 0,
-    'frame': data_points[0]['frame'],
-    'x': data_points[0]['x'],
-    'y': data_points[0]['y'],
-    'type': 'START'
-})
-print(f"\n🎯 Umkehrpunkt 0 (START): Frame {data_points[0]['frame']} bei ({data_points[0]['x']:.3f}, {data_points[0]['y']:.3f})")
-
-# 2. Bestimme initiale Richtung
-for i in range(1, min(5, len(data_points))):
-    dx = data_points[i]['x'] - data_points[i-1]['x']
-    if abs(dx) > MIN_MOVEMENT:
-        current_direction = 1 if dx > 0 else -1
-        print(f"   Initiale Richtung: {'rechts →' if current_direction > 0 else 'links ←'}")
-        break
-
-# 3. Finde alle Umkehrpunkte
-frames_since_last_turn = 0
-for i in range(1, len(data_points)):
-    frames_since_last_turn += 1
-
-    dx = data_points[i]['x'] - data_points[i-1]['x']
-
-    if abs(dx) > MIN_MOVEMENT and frames_since_last_turn >= MIN_FRAMES_BETWEEN:
-        new_direction = 1 if dx > 0 else -1
-
-        if current_direction is not None and new_direction != current_direction:
-            # Richtungswechsel erkannt!
-            turning_points.append({
-                'index': i-1,
-                'frame': data_points[i-1]['frame'],
-                'x': data_points[i-1]['x'],
-                'y': data_points[i-1]['y'],
-                'type': 'MAXIMUM' if current_direction > 0 else 'MINIMUM'
-            })
-
-            print(f"🔄 Umkehrpunkt {len(turning_points)-1}: Frame {data_points[i-1]['frame']} "
-                  f"({data_points[i-1]['x']:.3f}, {data_points[i-1]['y']:.3f}) - "
-                  f"{'MAXIMUM' if current_direction > 0 else 'MINIMUM'}")
-
-            current_direction = new_direction
-            frames_since_last_turn = 0
-
-print(f"\n✅ Insgesamt {len(turning_points)} Umkehrpunkte gefunden")
-
-# === ELLIPSEN BERECHNEN (3-PUNKT-ELLIPSEN) ===
-# Jede Ellipse umfasst 3 Umkehrpunkte: TP(i) → TP(i+1) → TP(i+2)
-# Der Winkel wird von TP(i) zu TP(i+2) gemessen!
-# TP(i+2) wird dann zum Start der nächsten Ellipse (Überlappung)
-
-ellipses = []
-colors = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844']
-
-print("\n🔍 Erstelle 3-Punkt-Ellipsen (mit Überlappung):")
-
-# Gehe in 2er-Schritten: 0, 2, 4, 6, ...
-# Jede Ellipse: TP(i) → TP(i+1) → TP(i+2)
-ellipse_number = 1
-for i in range(0, len(turning_points) - 2, 2):
-    tp1 = turning_points[i]      # Start
-    tp2 = turning_points[i + 1]  # Mitte
-    tp3 = turning_points[i + 2]  # Ende (wird Start der nächsten)
-
-    print(f"\n📐 Ellipse {ellipse_number}:")
-    print(f"   TP{i} → TP{i+1} → TP{i+2}")
-    print(f"   Frame {tp1['frame']} → {tp2['frame']} → {tp3['frame']}")
-    print(f"   Position: ({tp1['x']:.3f}, {tp1['y']:.3f}) → ({tp2['x']:.3f}, {tp2['y']:.3f}) → ({tp3['x']:.3f}, {tp3['y']:.3f})")
-
-    # Winkel berechnen: Von TP1 zu TP3!
-    dx = tp3['x'] - tp1['x']
-    dy = tp3['y'] - tp1['y']
-
-    angle_rad = np.arctan2(abs(dy), abs(dx))
-    angle_deg = angle_rad * 180.0 / np.pi
-
-    # Richtung bestimmen (Y=0 ist oben)
-    if tp1['y'] > tp3['y']:
-        angle_deg = angle_deg  # Positiv = fällt nach oben
-    else:
-        angle_deg = -angle_deg  # Negativ = fällt nach unten
-
-    print(f"   Winkel (TP{i} → TP{i+2}): {angle_deg:.2f}°")
-
-    ellipse = {
-        'number': ellipse_number,
-        'start_frame': tp1['frame'],
-        'end_frame': tp3['frame'],
-        'start_index': tp1['index'],
-        'end_index': tp3['index'],
-        'mid_frame': tp2['frame'],
-        'mid_index': tp2['index'],
-        'start_x': tp1['x'],
-        'start_y': tp1['y'],
-        'mid_x': tp2['x'],
-        'mid_y': tp2['y'],
-        'end_x': tp3['x'],
-        'end_y': tp3['y'],
-        'angle': angle_deg,
-        'color': colors[(ellipse_number - 1) % len(colors)],
-        'tp_start': i,
-        'tp_mid': i + 1,
-        'tp_end': i + 2
-    }
-
-    ellipses.append(ellipse)
-    ellipse_number += 1
-
-print(f"\n✅ {len(ellipses)} Ellipsen gefunden")
-
-average_angle = sum(e['angle'] for e in ellipses) / len(ellipses) if ellipses else 0
-print(f"\n📊 Durchschnittlicher Winkel: {average_angle:.2f}°")
-
-# === VISUALISIERUNG ===
-fig, ax = plt.subplots(figsize=(16, 10))
-
-# Extrahiere sortierte Koordinaten
-frames = [p['frame'] for p in data_points]
-x_coords = [p['x'] for p in data_points]
-y_coords = [1 - p['y'] for p in data_points]  # Y-Flip
-
-# Zeichne jede 3-Punkt-Ellipse als farbige Linie
-for ellipse in ellipses:
-    # Sammle alle Punkte dieser Ellipse
-    ellipse_x = []
-    ellipse_y = []
-
-    for i, p in enumerate(data_points):
-        if ellipse['start_index'] <= i <= ellipse['end_index']:
-            ellipse_x.append(p['x'])
-            ellipse_y.append(1 - p['y'])
-
-    # Zeichne Ellipsen-Segment
-    ax.plot(
-        ellipse_x, ellipse_y,
-        color=ellipse['color'],
-        linewidth=5,
-        alpha=0.85,
-        zorder=4,
-        label=f"Ellipse {ellipse['number']}: {ellipse['angle']:.2f}°"
-    )
-
-    # Zeichne Punkte
-    ax.scatter(
-        ellipse_x, ellipse_y,
-        s=70,
-        color=ellipse['color'],
-        alpha=0.8,
-        edgecolors='black',
-        linewidth=1.5,
-        zorder=5
+    ax.text(
+        0.02, 0.98, info_text,
+        transform=ax.transAxes,
+        fontsize=11,
+        verticalalignment='top',
+        bbox=dict(boxstyle='round,pad=1', facecolor='lightgreen', alpha=0.9, edgecolor='black', linewidth=2),
+        family='monospace'
     )
 
-# Zeichne Umkehrpunkte
-for i, tp in enumerate(turning_points):
-    if tp['type'] == 'START':
-        color = '#FFD700'
-        marker = 'o'
-        size = 500
-    elif tp['type'] == 'MAXIMUM':
-        color = '#FF1493'
-        marker = '^'
-        size = 400
-    else:  # MINIMUM
-        color = '#00CED1'
-        marker = 'v'
-        size = 400
-
-    ax.scatter(
-        tp['x'], 1 - tp['y'],
-        s=size,
-        color=color,
-        marker=marker,
-        edgecolors='black',
-        linewidth=3,
-        zorder=10,
-        alpha=0.95
-    )
+    fig.tight_layout()
+    return fig
 
-    # Label
-    label_offset = -0.07 if i % 2 == 0 else 0.07
-    va = 'top' if i % 2 == 0 else 'bottom'
 
-    ax.text(
-        tp['x'], 1 - tp['y'] + label_offset,
-        f"TP{i}\nF{tp['frame']}",
-        ha='center', va=va,
-        fontsize=10, fontweight='bold',
-        bbox=dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.95, edgecolor='black', linewidth=2),
-        zorder=11
-    )
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Datei, Xcode-Log oder '-' (stdin) als Argument - sonst die eingebetteten Daten
+    trajectory = load_trajectory(argv[0]) if argv else parse_trajectory(csv_data)
+    data_points = points_of(trajectory)
+    turning_points = detect_turning_points(data_points)
+    ellipses = three_point_ellipses(turning_points)
+    print_report(data_points, turning_points, ellipses)
 
-# Markiere Mittelpunkte der Ellipsen besonders
-for ellipse in ellipses:
-    mid_tp = turning_points[ellipse['tp_mid']]
-    # Zeichne gestrichelte Linie von Start zu Ende (Winkel-Linie)
-    ax.plot(
-        [ellipse['start_x'], ellipse['end_x']],
-        [1 - ellipse['start_y'], 1 - ellipse['end_y']],
-        color=ellipse['color'],
-        linewidth=2,
-        linestyle=':',
-        alpha=0.6,
-        zorder=3
-    )
+    render_figure(trajectory, turning_points, ellipses).savefig(OUTPUT_PATH, dpi=150, bbox_inches='tight')
+    print(f"\n✅ Visualisierung gespeichert: {OUTPUT_PATH}")
+    return 0
 
-# Layout
-ax.set_xlim(-0.05, 1.05)
-ax.set_ylim(-0.05, 1.05)
-ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
-ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
-ax.set_title(f'HammerTrack: 3-Punkt-Ellipsen-Analyse\n{len(data_points)} Frames • {len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
-             fontsize=15, fontweight='bold', pad=20)
-ax.grid(True, alpha=0.3, linestyle='--')
-ax.set_aspect('equal')
-
-# Legende
-ax.legend(loc='upper right', fontsize=11, framealpha=0.95, edgecolor='black')
-
-# Info-Box
-info_text = f"""3-Punkt-Ellipsen:
-• {len(turning_points)} Umkehrpunkte gefunden
-• {len(ellipses)} Ellipsen (je 3 Umkehrpunkte)
-• Winkel: TP(i) → TP(i+2)
-• TP(i+2) wird Start der nächsten Ellipse
-• Durchschnittlicher Winkel: {average_angle:.2f}°
-• Gestrichelte Linien = Winkel-Messung"""
 
-ax.text(
-    0.02, 0.98, info_text,
-    transform=ax.transAxes,
-    fontsize=11,
-    verticalalignment='top',
-    bbox=dict(boxstyle='round,pad=1', facecolor='lightgreen', alpha=0.9, edgecolor='black', linewidth=2),
-    family='monospace'
-)
-
-plt.tight_layout()
-output_path = '/Users/merlinhummel/Documents/HammerTrack/correct_ellipses.png'
-plt.savefig(output_path, dpi=150, bbox_inches='tight')
-print(f"\n✅ Visualisierung gespeichert: {output_path}")
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Batch-Analyse vieler Würfe
+==========================
+Analysiert ganze Verzeichnisse exportierter Würfe (CSV, Xcode-Logs oder
+.htarch-Archive) parallel über einen Prozess-Pool und schreibt EINE
+spaltenorientierte Übersichtstabelle (eine Zeile pro Wurf).
+
+Pro Wurf - gleiche Logik wie HammerTracker.analyzeTrajectory:
+- Umkehrpunkte (findTurningPoints + filterSignificantTurningPoints)
+- 3-Punkt-Ellipsen (createEllipsesFromThreePoints)
+- Durchschnittlicher Winkel
+
+Verwendung:
+    python batch_analysis.py wuerfe/ -o summary.csv
+    python batch_analysis.py wuerfe/ -o summary.npz -j 8
+"""
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ellipses import three_point_ellipse_angles
+from trajectory_archive import TrajectoryArchive
+from trajectory_io import collect_files, is_archive, iter_trajectories
+from turning_points import MIN_DISTANCE, MIN_FRAMES, detect_turning_points
+
+MIN_TRACKED_FRAMES = 20  # analyzeTrajectory: trackedFrames.count > 20
+ARCHIVE_CHUNK = 256      # Würfe pro Job bei .htarch-Archiven
+
+COLUMNS = [
+    ('source', object),
+    ('block', np.int32),
+    ('points', np.int32),
+    ('first_frame', np.int32),
+    ('last_frame', np.int32),
+    ('turning_points', np.int32),
+    ('ellipses', np.int32),
+    ('average_angle', np.float64),
+    ('min_angle', np.float64),
+    ('max_angle', np.float64),
+    ('angles', object),      # Einzelwinkel, ';'-getrennt
+    ('error', object),
+]
+
+
+def analyze_trajectory(trajectory, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Analysiert eine Trajektorie. Gibt ein Dict mit den Tabellen-Spalten zurück."""
+    row = {
+        'points': len(trajectory),
+        'first_frame': int(trajectory.frames[0]) if len(trajectory) else -1,
+        'last_frame': int(trajectory.frames[-1]) if len(trajectory) else -1,
+        'turning_points': 0,
+        'ellipses': 0,
+        'average_angle': np.nan,
+        'min_angle': np.nan,
+        'max_angle': np.nan,
+        'angles': '',
+        'error': '',
+    }
+    if len(trajectory) <= MIN_TRACKED_FRAMES:
+        row['error'] = f'zu wenige Frames ({len(trajectory)})'
+        return row
+
+    tp_index, _ = detect_turning_points(trajectory.x, trajectory.y,
+                                        min_distance=min_distance, min_frames=min_frames)
+    row['turning_points'] = len(tp_index)
+    if len(tp_index) < 3:
+        row['error'] = f'nicht genug Umkehrpunkte ({len(tp_index)})'
+        return row
+
+    angles = three_point_ellipse_angles(trajectory.x, trajectory.y, tp_index)
+    row.update(
+        ellipses=len(angles),
+        average_angle=float(angles.mean()),
+        min_angle=float(angles.min()),
+        max_angle=float(angles.max()),
+        angles=';'.join(f'{a:.2f}' for a in angles),
+    )
+    return row
+
+
+def analyze_file(path, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES, throws=None):
+    """Analysiert alle `Frame,X,Y`-Blöcke einer Datei (ein Block = ein Wurf).
+
+    Bei Archiven wählt `throws` = (start, stop) einen Bereich von Würfen.
+    """
+    rows = []
+    try:
+        if throws is None:
+            blocks = enumerate(iter_trajectories(path))
+        else:
+            archive = TrajectoryArchive(path)
+            blocks = ((i, archive[i]) for i in range(*throws))
+        for block, trajectory in blocks:
+            row = analyze_trajectory(trajectory, min_distance=min_distance, min_frames=min_frames)
+            rows.append({'source': str(path), 'block': block, **row})
+    except (OSError, ValueError) as error:
+        rows.append({'source': str(path), 'block': -1, 'error': str(error)})
+    if not rows:
+        rows.append({'source': str(path), 'block': -1, 'error': "kein 'Frame,X,Y'-Block"})
+    return rows
+
+
+def _analyze_file_args(args):
+    return analyze_file(*args)
+
+
+def _jobs(files, min_distance, min_frames):
+    """Ein Job pro Datei; Archive werden in Blöcke zu ARCHIVE_CHUNK Würfen geteilt."""
+    for path in files:
+        if not is_archive(path):
+            yield path, min_distance, min_frames, None
+            continue
+        count = len(TrajectoryArchive(path))
+        for start in range(0, count, ARCHIVE_CHUNK):
+            yield path, min_distance, min_frames, (start, min(start + ARCHIVE_CHUNK, count))
+
+
+def analyze_batch(files, workers=None, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Verteilt die Dateien auf einen Prozess-Pool. Gibt die Tabelle als Spalten-Dict zurück."""
+    jobs = list(_jobs(files, min_distance, min_frames))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 8))
+
+    rows = []
+    if workers == 1:
+        for job in jobs:
+            rows.extend(_analyze_file_args(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file_rows in pool.map(_analyze_file_args, jobs, chunksize=chunksize):
+                rows.extend(file_rows)
+    return rows_to_columns(rows)
+
+
+def rows_to_columns(rows):
+    """Zeilen-Dicts → spaltenorientierte Tabelle (ein Array pro Spalte)."""
+    defaults = {object: '', np.float64: np.nan}
+    return {
+        name: np.array([row.get(name, defaults.get(dtype, -1)) for row in rows], dtype=dtype)
+        for name, dtype in COLUMNS
+    }
+
+
+def write_table(table, output):
+    """Schreibt die Tabelle als .csv oder .npz (je nach Dateiendung)."""
+    output = Path(output)
+    if output.suffix == '.npz':
+        np.savez(output, **{name: column.astype(str) if column.dtype == object else column
+                            for name, column in table.items()})
+        return
+
+    names = [name for name, _ in COLUMNS]
+    with open(output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(table[name].tolist() for name in names)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HammerTrack Batch-Analyse vieler Würfe')
+    parser.add_argument('inputs', nargs='+', help='Dateien oder Verzeichnisse mit Würfen')
+    parser.add_argument('-o', '--output', default='summary.csv', help='Übersichtstabelle (.csv oder .npz)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Anzahl Prozesse (Standard: alle Kerne)')
+    parser.add_argument('--min-distance', type=float, default=MIN_DISTANCE)
+    parser.add_argument('--min-frames', type=int, default=MIN_FRAMES)
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if not files:
+        print('❌ Keine Wurf-Dateien gefunden', file=sys.stderr)
+        return 1
+
+    print(f"📂 {len(files)} Dateien werden analysiert ...")
+    table = analyze_batch(files, workers=args.workers,
+                          min_distance=args.min_distance, min_frames=args.min_frames)
+    write_table(table, args.output)
+
+    analyzed = int(np.count_nonzero(table['ellipses'] > 0))
+    print(f"✅ {len(table['source'])} Würfe, davon {analyzed} mit Ellipsen")
+    if analyzed:
+        print(f"📊 Durchschnittlicher Winkel über alle Würfe: {np.nanmean(table['average_angle']):.2f}°")
+    print(f"💾 Übersicht gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
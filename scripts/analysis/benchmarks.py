@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmarks der Analyse-Stufen
+=============================
+Misst jede Stufe der Pipeline einzeln - von 10² bis 10⁷ Punkten in einem
+Wurf und über Batches aus vielen Würfen:
+
+- parse_csv:  `Frame,X,Y`-CSV → Trajectory (trajectory_io)
+- parse_log:  derselbe Block eingebettet in Xcode-Log-Zeilen
+- turning_points: find_turning_points (alle X-Richtungswechsel)
+- filter:     filter_significant_turning_points (minDistance / minFrames)
+- ellipses:   segment_ellipses (Strategie 'swift')
+- smoothing:  gaussian_smooth (σ = 0.5, wie smoothedPoints)
+- render:     render_throw + PNG auf dem Agg-Canvas - einzeln nur Würfe bis
+              --render-max-points Punkte, im Batch die ersten
+              RENDER_BATCH_THROWS Würfe (ein PNG pro Wurf wie rendering.py)
+
+Testdaten kommen aus synthetic.py: einzeln ein langer Wurf mit
+gleichmäßiger Drehung, im Batch realistische Würfe mit Standard-Parametern.
+
+Pro Messung: beste Zeit aus mehreren Wiederholungen (mindestens
+MIN_SECONDS Messzeit), Durchsatz in Punkten/s und Peak-Speicher der
+Python/NumPy-Allokationen (tracemalloc, in einem eigenen Lauf - die
+Zeitmessung läuft ohne tracemalloc). Mit --baseline werden die Ergebnisse
+mit einem gespeicherten Lauf verglichen; langsamer oder speicherhungriger
+als die Toleranz → ⚠️ und Exit-Code 1.
+
+Verwendung:
+    python benchmarks.py                           # 10² … 10⁶ Punkte + Batch mit 1000 Würfen
+    python benchmarks.py --max-exponent 7 --batch 1000 10000
+    python benchmarks.py --stage parse_csv --stage smoothing
+    python benchmarks.py --save-baseline bench.json
+    python benchmarks.py --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from ellipses import segment_ellipses
+from smoothing import gaussian_smooth
+from synthetic import DEFAULTS, generate_throws, generate_trajectory
+from trajectory_io import Trajectory, format_trajectory_csv, iter_trajectories, load_trajectory
+from turning_points import detect_turning_points, filter_significant_turning_points, find_turning_points
+
+BASELINE_VERSION = 1
+MIN_SECONDS = 0.2          # Messzeit pro Fall (Wiederholungen bis dahin)
+MAX_REPEATS = 1000
+TOLERANCE = 0.25           # +25 % gegenüber der Baseline = Regression
+RENDER_MAX_POINTS = 10**4  # größere Würfe werden nicht gerendert (eine Legende pro Ellipse: ~30 s bei 10^5)
+RENDER_BATCH_THROWS = 10   # Würfe pro Batch-Render-Fall (~0.3 s pro PNG)
+PERIOD = 25.0              # Frames pro Umdrehung der langen synthetischen Würfe
+SPARE_FRAMES = 1.15        # Reserve für Aussetzer und Konfidenz-Gate (~9 % der Frames)
+
+STAGES = ('parse_csv', 'parse_log', 'turning_points', 'filter', 'ellipses', 'smoothing', 'render')
+
+
+def synthetic_trajectory(n, seed=0, period=PERIOD):
+    """Ein Wurf mit genau `n` Punkten aus synthetic.py - gleichmäßige Drehung mit `period` Frames pro Umdrehung."""
+    seconds = period / DEFAULTS['fps']
+    frames = n * SPARE_FRAMES
+    while True:
+        throw = generate_trajectory(seed=seed, turns=frames / period, start_period=seconds, end_period=seconds,
+                                    jitter=0)
+        if len(throw) >= n:
+            return Trajectory(frames=throw.frames[:n], x=throw.x[:n], y=throw.y[:n])
+        frames *= SPARE_FRAMES
+
+
+def synthetic_throws(count, seed=0):
+    """`count` realistische Würfe aus synthetic.py (~125 Punkte, schneller werdende Drehung)."""
+    throws, offsets = generate_throws(count, seed=seed)
+    return [Trajectory(frames=throws.frames[start:end], x=throws.x[start:end], y=throws.y[start:end])
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def log_bytes(csv):
+    """Einen `Frame,X,Y`-Block wie im Xcode-Log einbetten (Text davor und danach)."""
+    before = b'Hammer Track[812:40213] Analyse gestartet\n=== ALLE DETEKTIERTEN PUNKTE ===\n'
+    after = b'=== ENDE ===\nDurchschnittlicher Winkel: -24.33\n'
+    return before + csv + after
+
+
+def single_cases(trajectory, stages, render_max_points=RENDER_MAX_POINTS):
+    """(Stufe, Funktion, Punkte) für einen Wurf - Eingaben werden vorab berechnet."""
+    x, y = trajectory.x, trajectory.y
+    candidates = find_turning_points(x)
+    tp_index, _ = filter_significant_turning_points(*candidates, x, y)
+    csv = format_trajectory_csv(trajectory) if {'parse_csv', 'parse_log'} & set(stages) else b''
+    log = log_bytes(csv) if 'parse_log' in stages else b''
+    cases = {
+        'parse_csv': lambda: load_trajectory(io.BytesIO(csv)),
+        'parse_log': lambda: load_trajectory(io.BytesIO(log)),
+        'turning_points': lambda: find_turning_points(x),
+        'filter': lambda: filter_significant_turning_points(*candidates, x, y),
+        'ellipses': lambda: segment_ellipses(x, y, tp_index, strategies=['swift']),
+        'smoothing': lambda: gaussian_smooth(np.stack((x, y))),
+        'render': lambda: _render_png(trajectory),
+    }
+    if len(trajectory) > render_max_points:
+        del cases['render']
+    return [(stage, cases[stage], len(trajectory)) for stage in stages if stage in cases]
+
+
+def batch_cases(trajectories, stages):
+    """(Stufe, Funktion, Punkte) für viele Würfe - so, wie die Batch-Werkzeuge sie verarbeiten.
+
+    Parsen: ein Log mit allen Blöcken hintereinander; Umkehrpunkte und Filter
+    pro Wurf; Ellipsen und Glättung gebündelt über alle Würfe (offsets);
+    Rendern ein PNG pro Wurf, nur die ersten RENDER_BATCH_THROWS Würfe.
+    """
+    offsets = np.concatenate(([0], np.cumsum([len(t) for t in trajectories])))
+    x = np.concatenate([t.x for t in trajectories])
+    y = np.concatenate([t.y for t in trajectories])
+    candidates = [find_turning_points(t.x) for t in trajectories]
+    detected = [detect_turning_points(t.x, t.y)[0] for t in trajectories]
+    tp_index = np.concatenate([index + offset for index, offset in zip(detected, offsets[:-1])])
+    tp_offsets = np.concatenate(([0], np.cumsum([len(index) for index in detected])))
+    csv = b''.join(format_trajectory_csv(t) for t in trajectories) if 'parse_csv' in stages else b''
+    log = b''.join(log_bytes(format_trajectory_csv(t)) for t in trajectories) if 'parse_log' in stages else b''
+    cases = {
+        'parse_csv': lambda: list(iter_trajectories(io.BytesIO(csv))),
+        'parse_log': lambda: list(iter_trajectories(io.BytesIO(log))),
+        'turning_points': lambda: [find_turning_points(t.x) for t in trajectories],
+        'filter': lambda: [filter_significant_turning_points(*c, t.x, t.y)
+                           for c, t in zip(candidates, trajectories)],
+        'ellipses': lambda: segment_ellipses(x, y, tp_index, tp_offsets=tp_offsets, strategies=['swift']),
+        'smoothing': lambda: gaussian_smooth(np.stack((x, y)), offsets=offsets),
+        'render': lambda: [_render_png(t) for t in rendered],
+    }
+    rendered = trajectories[:RENDER_BATCH_THROWS]
+    points = {'render': sum(len(t) for t in rendered)}
+    return [(stage, cases[stage], points.get(stage, int(offsets[-1]))) for stage in stages if stage in cases]
+
+
+def measure(function, min_seconds=MIN_SECONDS, max_repeats=MAX_REPEATS):
+    """Beste Laufzeit (s) und Peak-Speicher (Bytes) eines Aufrufs."""
+    best = float('inf')
+    total = 0.0
+    repeats = 0
+    while repeats < max_repeats and (total < min_seconds or repeats == 0):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        repeats += 1
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes, batches, stages, min_seconds=MIN_SECONDS, report=print, render_max_points=RENDER_MAX_POINTS):
+    """Alle Fälle messen. Gibt {Fall-Name: {'seconds', 'points', 'peak_bytes'}} zurück."""
+    results = {}
+    workloads = [(f"{n:.0e}".replace('+0', ''), [synthetic_trajectory(n)]) for n in sizes]
+    workloads += [(f"batch{count}", synthetic_throws(count)) for count in batches]
+    for label, trajectories in workloads:
+        is_batch = label.startswith('batch')
+        cases = (batch_cases(trajectories, stages) if is_batch
+                 else single_cases(trajectories[0], stages, render_max_points))
+        for stage, function, points in cases:
+            seconds, peak = measure(function, min_seconds)
+            name = f"{stage}/{label}"
+            results[name] = {'seconds': seconds, 'points': points, 'peak_bytes': peak}
+            report(name, results[name])
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Regressionen gegenüber der Baseline: [(Fall, Metrik, Faktor)]."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            if reference[metric] > 0 and result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append((name, metric, result[metric] / reference[metric]))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') != BASELINE_VERSION:
+        raise ValueError(f"Baseline-Version {data.get('version')} wird nicht unterstützt")
+    return data['results']
+
+
+def save_baseline(path, results):
+    data = {
+        'version': BASELINE_VERSION,
+        'machine': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def _render_png(trajectory):
+    from rendering import render_throw
+    render_throw(trajectory).savefig(io.BytesIO(), format='png', dpi=50)
+
+
+def _format_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+def _format_rate(points_per_second):
+    for unit, scale in (('G', 1e9), ('M', 1e6), ('k', 1e3)):
+        if points_per_second >= scale:
+            return f"{points_per_second / scale:.1f} {unit}"
+    return f"{points_per_second:.0f} "
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Laufzeit und Speicher der Analyse-Stufen messen')
+    parser.add_argument('--min-exponent', type=int, default=2, help='Kleinster Wurf: 10^N Punkte')
+    parser.add_argument('--max-exponent', type=int, default=6, help='Größter Wurf: 10^N Punkte (bis 7)')
+    parser.add_argument('--batch', type=int, nargs='*', default=[1000],
+                        help='Batch-Größen in Würfen (synthetic.py)')
+    parser.add_argument('--stage', choices=STAGES, action='append', help='Nur diese Stufe(n)')
+    parser.add_argument('--min-seconds', type=float, default=MIN_SECONDS, help='Messzeit pro Fall')
+    parser.add_argument('--render-max-points', type=int, default=RENDER_MAX_POINTS,
+                        help='Größere Einzel-Würfe nicht rendern (Standard: 10^4)')
+    parser.add_argument('--baseline', default=None, help='Mit gespeicherter Baseline (JSON) vergleichen')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Erlaubte Verschlechterung (0.25 = 25 %%)')
+    parser.add_argument('--save-baseline', default=None, help='Ergebnisse als Baseline speichern')
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    sizes = [10**e for e in range(args.min_exponent, args.max_exponent + 1)]
+    stages = args.stage or list(STAGES)
+
+    print(f"⏱️  {'Fall':28s} {'Zeit':>11s} {'Punkte/s':>11s} {'Peak':>10s}  Baseline")
+
+    def report(name, result):
+        seconds = result['seconds']
+        line = (f"   {name:28s} {seconds * 1000:8.2f} ms {_format_rate(result['points'] / seconds):>10s} "
+                f"{_format_bytes(result['peak_bytes']):>10s}")
+        reference = baseline.get(name)
+        if reference:
+            change = seconds / reference['seconds'] - 1
+            memory = result['peak_bytes'] / reference['peak_bytes'] - 1 if reference['peak_bytes'] else 0
+            flag = '⚠️ ' if change > args.tolerance or memory > args.tolerance else ''
+            line += f"  {flag}{change:+.0%} Zeit, {memory:+.0%} Speicher"
+        print(line, flush=True)
+
+    results = run(sizes, args.batch, stages, args.min_seconds, report=report,
+                  render_max_points=args.render_max_points)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"💾 Baseline gespeichert: {args.save_baseline}")
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} Regression(en) über {args.tolerance:.0%}:", file=sys.stderr)
+            for name, metric, factor in regressions:
+                print(f"   {name}: {metric} ×{factor:.2f}", file=sys.stderr)
+            return 1
+        print(f"✅ Keine Regression über {args.tolerance:.0%} gegenüber {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
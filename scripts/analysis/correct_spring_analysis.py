@@ -13,9 +13,13 @@ KONZEPT: Wie eine Feder von der Seite betrachtet
 KEINE Schwellwerte, KEINE Heuristiken - nur reine Richtungsänderung!
 """
 
-import matplotlib.pyplot as plt
+import sys
+
 import numpy as np
 
+from trajectory_io import load_trajectory, parse_trajectory
+from turning_points import find_turning_points, turning_point_types
+
 # === DATEN ===
 csv_data = """Frame,X,Y
 0,0.782227,0.399475
@@ -131,242 +135,231 @@ csv_data = """Frame,X,Y
 133,0.050018,0.478851
 134,0.005936,0.578964"""
 
-print("=" * 80)
-print("SCHRITT-FÜR-SCHRITT ANALYSE")
-print("=" * 80)
-
-# === SCHRITT 1: CSV PARSEN & SORTIEREN ===
-print("\n📊 SCHRITT 1: Daten einlesen und sortieren")
-print("-" * 80)
-
-lines = csv_data.strip().split('\n')[1:]
-data_points = []
-
-for line in lines:
-    parts = line.split(',')
-    data_points.append({
-        'frame': int(parts[0]),
-        'x': float(parts[1]),
-        'y': float(parts[2])
-    })
-
-# WICHTIG: Nach Frame sortieren!
-data_points.sort(key=lambda p: p['frame'])
-
-print(f"✅ {len(data_points)} Punkte eingelesen")
-print(f"   Frame-Bereich: {data_points[0]['frame']} → {data_points[-1]['frame']}")
-print(f"   X-Bereich: {min(p['x'] for p in data_points):.3f} → {max(p['x'] for p in data_points):.3f}")
-print(f"   Y-Bereich: {min(p['y'] for p in data_points):.3f} → {max(p['y'] for p in data_points):.3f}")
-
-# === SCHRITT 2: ERSTER PUNKT IST TP0 ===
-print("\n🎯 SCHRITT 2: Erster erkannter Punkt = Umkehrpunkt 0")
-print("-" * 80)
-
-turning_points = []
-
-# Der allererste Punkt ist IMMER TP0
-turning_points.append({
-    'index': 0,
-    'frame': data_points[0]['frame'],
-    'x': data_points[0]['x'],
-    'y': data_points[0]['y'],
-    'type': 'START'
-})
-
-print(f"✅ TP0 (START): Frame {data_points[0]['frame']}")
-print(f"   Position: ({data_points[0]['x']:.6f}, {data_points[0]['y']:.6f})")
-
-# === SCHRITT 3: INITIALE RICHTUNG BESTIMMEN ===
-print("\n🧭 SCHRITT 3: Initiale X-Richtung bestimmen")
-print("-" * 80)
-
-current_direction = None
-
-for i in range(1, len(data_points)):
-    dx = data_points[i]['x'] - data_points[i-1]['x']
-
-    if dx != 0:  # Jede Bewegung zählt, keine Schwellwerte!
-        current_direction = 1 if dx > 0 else -1
-        print(f"✅ Initiale Richtung erkannt bei Frame {data_points[i]['frame']}")
+OUTPUT_PATH = '/Users/merlinhummel/Documents/HammerTrack/correct_spring_analysis.png'
+COLORS = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844', '#88FF44', '#4488FF']
+
+
+def spring_turning_points(trajectory):
+    """Alle Richtungswechsel in einem vektorisierten Durchlauf (keine Schwellwerte!).
+
+    Returns:
+        Liste von Dicts mit index, frame, x, y, type - TP0 ist der erste Punkt
+    """
+    tp_index, tp_is_maximum = find_turning_points(trajectory.x)
+    frames, xs, ys = trajectory.frames.tolist(), trajectory.x.tolist(), trajectory.y.tolist()
+    return [
+        {
+            'index': i,
+            'frame': frames[i],
+            'x': xs[i],
+            'y': ys[i],
+            'type': tp_type
+        }
+        for i, tp_type in zip(tp_index.tolist(), turning_point_types(tp_is_maximum))
+    ]
+
+
+def consecutive_ellipses(turning_points, colors=COLORS):
+    """Eine Ellipse pro konsekutivem Umkehrpunkt-Paar TP(i) → TP(i+1)."""
+    ellipses = []
+    for i in range(len(turning_points) - 1):
+        tp_start = turning_points[i]
+        tp_end = turning_points[i + 1]
+
+        # Winkel berechnen: Von Start zu Ende
+        dx = tp_end['x'] - tp_start['x']
+        dy = tp_end['y'] - tp_start['y']
+
+        angle_rad = np.arctan2(abs(dy), abs(dx))
+        angle_deg = angle_rad * 180.0 / np.pi
+
+        # Richtung: Y=0 ist oben!
+        if tp_start['y'] > tp_end['y']:  # Fällt nach oben
+            angle_deg = angle_deg
+        else:  # Fällt nach unten
+            angle_deg = -angle_deg
+
+        ellipses.append({
+            'number': i + 1,
+            'start_index': tp_start['index'],
+            'end_index': tp_end['index'],
+            'start_frame': tp_start['frame'],
+            'end_frame': tp_end['frame'],
+            'start_x': tp_start['x'],
+            'start_y': tp_start['y'],
+            'end_x': tp_end['x'],
+            'end_y': tp_end['y'],
+            'angle': angle_deg,
+            'color': colors[i % len(colors)]
+        })
+    return ellipses
+
+
+def average_angle(ellipses):
+    return sum(e['angle'] for e in ellipses) / len(ellipses) if ellipses else 0.0
+
+
+def print_report(trajectory, turning_points, ellipses):
+    """Schritte 1-5 als Text."""
+    print("=" * 80)
+    print("SCHRITT-FÜR-SCHRITT ANALYSE")
+    print("=" * 80)
+
+    # === SCHRITT 1: CSV PARSEN & SORTIEREN ===
+    print("\n📊 SCHRITT 1: Daten einlesen und sortieren")
+    print("-" * 80)
+
+    frames, xs, ys = trajectory.frames.tolist(), trajectory.x.tolist(), trajectory.y.tolist()
+    print(f"✅ {len(frames)} Punkte eingelesen")
+    print(f"   Frame-Bereich: {frames[0]} → {frames[-1]}")
+    print(f"   X-Bereich: {min(xs):.3f} → {max(xs):.3f}")
+    print(f"   Y-Bereich: {min(ys):.3f} → {max(ys):.3f}")
+
+    # === SCHRITT 2: ERSTER PUNKT IST TP0 ===
+    print("\n🎯 SCHRITT 2: Erster erkannter Punkt = Umkehrpunkt 0")
+    print("-" * 80)
+
+    print(f"✅ TP0 (START): Frame {frames[0]}")
+    print(f"   Position: ({xs[0]:.6f}, {ys[0]:.6f})")
+
+    # === SCHRITT 3: INITIALE RICHTUNG BESTIMMEN ===
+    print("\n🧭 SCHRITT 3: Initiale X-Richtung bestimmen")
+    print("-" * 80)
+
+    dx_all = np.diff(trajectory.x)
+    moving = np.flatnonzero(dx_all)  # Jede Bewegung zählt, keine Schwellwerte!
+    if len(moving):
+        i = int(moving[0]) + 1
+        dx = dx_all[i - 1]
+        print(f"✅ Initiale Richtung erkannt bei Frame {frames[i]}")
         print(f"   dx = {dx:+.6f}")
-        print(f"   Richtung: {'RECHTS →' if current_direction > 0 else 'LINKS ←'}")
-        break
-
-# === SCHRITT 4: ALLE RICHTUNGSÄNDERUNGEN FINDEN ===
-print("\n🔄 SCHRITT 4: Richtungsänderungen = Umkehrpunkte")
-print("-" * 80)
-
-for i in range(1, len(data_points)):
-    dx = data_points[i]['x'] - data_points[i-1]['x']
-
-    if dx != 0:  # Nur bei tatsächlicher Bewegung
-        new_direction = 1 if dx > 0 else -1
-
-        # Richtungswechsel erkannt?
-        if new_direction != current_direction:
-            tp_index = i - 1  # Der Punkt VOR dem Wechsel ist der Umkehrpunkt
-
-            turning_points.append({
-                'index': tp_index,
-                'frame': data_points[tp_index]['frame'],
-                'x': data_points[tp_index]['x'],
-                'y': data_points[tp_index]['y'],
-                'type': 'MAXIMUM' if current_direction > 0 else 'MINIMUM'
-            })
-
-            print(f"🔄 TP{len(turning_points)-1}: Frame {data_points[tp_index]['frame']}")
-            print(f"   Position: ({data_points[tp_index]['x']:.6f}, {data_points[tp_index]['y']:.6f})")
-            print(f"   Wechsel: {'RECHTS→LINKS' if current_direction > 0 else 'LINKS→RECHTS'}")
-            print(f"   Typ: {'MAXIMUM' if current_direction > 0 else 'MINIMUM'}")
-            print()
-
-            current_direction = new_direction
-
-print(f"✅ Insgesamt {len(turning_points)} Umkehrpunkte gefunden")
-
-# === SCHRITT 5: ELLIPSEN ERSTELLEN (KONSEKUTIVE PAARE) ===
-print("\n📐 SCHRITT 5: Ellipsen aus konsekutiven Umkehrpunkt-Paaren")
-print("-" * 80)
-
-ellipses = []
-colors = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844', '#88FF44', '#4488FF']
-
-for i in range(len(turning_points) - 1):
-    tp_start = turning_points[i]
-    tp_end = turning_points[i + 1]
-
-    # Winkel berechnen: Von Start zu Ende
-    dx = tp_end['x'] - tp_start['x']
-    dy = tp_end['y'] - tp_start['y']
-
-    angle_rad = np.arctan2(abs(dy), abs(dx))
-    angle_deg = angle_rad * 180.0 / np.pi
-
-    # Richtung: Y=0 ist oben!
-    if tp_start['y'] > tp_end['y']:  # Fällt nach oben
-        angle_deg = angle_deg
-    else:  # Fällt nach unten
-        angle_deg = -angle_deg
-
-    ellipse = {
-        'number': i + 1,
-        'start_index': tp_start['index'],
-        'end_index': tp_end['index'],
-        'start_frame': tp_start['frame'],
-        'end_frame': tp_end['frame'],
-        'start_x': tp_start['x'],
-        'start_y': tp_start['y'],
-        'end_x': tp_end['x'],
-        'end_y': tp_end['y'],
-        'angle': angle_deg,
-        'color': colors[i % len(colors)]
-    }
-
-    ellipses.append(ellipse)
-
-    print(f"📐 Ellipse {i+1}:")
-    print(f"   TP{i} → TP{i+1}")
-    print(f"   Frame {tp_start['frame']} → {tp_end['frame']}")
-    print(f"   Position: ({tp_start['x']:.3f}, {tp_start['y']:.3f}) → ({tp_end['x']:.3f}, {tp_end['y']:.3f})")
-    print(f"   Winkel: {angle_deg:.2f}°")
-    print()
-
-avg_angle = sum(e['angle'] for e in ellipses) / len(ellipses)
-print(f"✅ {len(ellipses)} Ellipsen erstellt")
-print(f"📊 Durchschnittlicher Winkel: {avg_angle:.2f}°")
-
-# === SCHRITT 6: VISUALISIERUNG ===
-print("\n🎨 SCHRITT 6: Visualisierung erstellen")
-print("-" * 80)
-
-fig, ax = plt.subplots(figsize=(18, 11))
-
-frames = [p['frame'] for p in data_points]
-x_coords = [p['x'] for p in data_points]
-y_coords = [1 - p['y'] for p in data_points]  # Y-Flip
-
-# Zeichne jede Ellipse
-for ellipse in ellipses:
-    ellipse_x = []
-    ellipse_y = []
-
-    for idx, p in enumerate(data_points):
-        if ellipse['start_index'] <= idx <= ellipse['end_index']:
-            ellipse_x.append(p['x'])
-            ellipse_y.append(1 - p['y'])
-
-    # Ellipsen-Bahn
-    ax.plot(ellipse_x, ellipse_y, color=ellipse['color'], linewidth=5, alpha=0.85, zorder=4,
-            label=f"Ellipse {ellipse['number']}: {ellipse['angle']:.2f}°")
-
-    # Punkte
-    ax.scatter(ellipse_x, ellipse_y, s=70, color=ellipse['color'], alpha=0.8,
-               edgecolors='black', linewidth=1.5, zorder=5)
-
-    # Winkel-Linie (gepunktet)
-    ax.plot([ellipse['start_x'], ellipse['end_x']],
-            [1 - ellipse['start_y'], 1 - ellipse['end_y']],
-            color=ellipse['color'], linewidth=2, linestyle=':', alpha=0.6, zorder=3)
-
-# Umkehrpunkte markieren
-for i, tp in enumerate(turning_points):
-    if tp['type'] == 'START':
-        color = '#FFD700'
-        marker = 'o'
-        size = 600
-    elif tp['type'] == 'MAXIMUM':
-        color = '#FF1493'
-        marker = '^'
-        size = 450
-    else:  # MINIMUM
-        color = '#00CED1'
-        marker = 'v'
-        size = 450
-
-    ax.scatter(tp['x'], 1 - tp['y'], s=size, color=color, marker=marker,
-               edgecolors='black', linewidth=3, zorder=10, alpha=0.95)
-
-    # Label
-    offset = -0.07 if i % 2 == 0 else 0.07
-    va = 'top' if i % 2 == 0 else 'bottom'
-
-    ax.text(tp['x'], 1 - tp['y'] + offset, f"TP{i}\nF{tp['frame']}",
-            ha='center', va=va, fontsize=11, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.6', facecolor='white', alpha=0.95,
-                     edgecolor='black', linewidth=2), zorder=11)
-
-# Layout
-ax.set_xlim(-0.05, 1.05)
-ax.set_ylim(-0.05, 1.05)
-ax.set_xlabel('X-Position (normalisiert)', fontsize=14, fontweight='bold')
-ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=14, fontweight='bold')
-ax.set_title(f'HammerTrack: Korrekte Federungs-Analyse\n{len(data_points)} Frames • {len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
-             fontsize=16, fontweight='bold', pad=20)
-ax.grid(True, alpha=0.3, linestyle='--')
-ax.set_aspect('equal')
-ax.legend(loc='upper right', fontsize=10, framealpha=0.95, edgecolor='black', ncol=2)
-
-# Info-Box
-info_text = f"""FEDERUNGS-LOGIK:
-• Fokus: Nur X-Achse
-• Richtungswechsel = Umkehrpunkt
-• {len(turning_points)} Umkehrpunkte
-• {len(ellipses)} Ellipsen (konsekutiv)
-• Jede Ellipse: TP(i) → TP(i+1)
-• Winkel: Start → Ende
-• ∅ Winkel: {avg_angle:.2f}°
-• Gepunktete Linien = Winkelmessung"""
-
-ax.text(0.02, 0.98, info_text, transform=ax.transAxes, fontsize=10,
-        verticalalignment='top',
-        bbox=dict(boxstyle='round,pad=1', facecolor='lightgreen', alpha=0.9,
-                 edgecolor='black', linewidth=2), family='monospace')
-
-plt.tight_layout()
-output_path = '/Users/merlinhummel/Documents/HammerTrack/correct_spring_analysis.png'
-plt.savefig(output_path, dpi=150, bbox_inches='tight')
-
-print(f"✅ Visualisierung gespeichert: {output_path}")
-print("\n" + "=" * 80)
-print("ANALYSE ABGESCHLOSSEN")
-print("=" * 80)
+        print(f"   Richtung: {'RECHTS →' if dx > 0 else 'LINKS ←'}")
+
+    # === SCHRITT 4: ALLE RICHTUNGSÄNDERUNGEN FINDEN ===
+    print("\n🔄 SCHRITT 4: Richtungsänderungen = Umkehrpunkte")
+    print("-" * 80)
+
+    for number, tp in enumerate(turning_points[1:], start=1):
+        is_maximum = tp['type'] == 'MAXIMUM'
+        print(f"🔄 TP{number}: Frame {tp['frame']}")
+        print(f"   Position: ({tp['x']:.6f}, {tp['y']:.6f})")
+        print(f"   Wechsel: {'RECHTS→LINKS' if is_maximum else 'LINKS→RECHTS'}")
+        print(f"   Typ: {tp['type']}")
+        print()
+
+    print(f"✅ Insgesamt {len(turning_points)} Umkehrpunkte gefunden")
+
+    # === SCHRITT 5: ELLIPSEN ERSTELLEN (KONSEKUTIVE PAARE) ===
+    print("\n📐 SCHRITT 5: Ellipsen aus konsekutiven Umkehrpunkt-Paaren")
+    print("-" * 80)
+
+    for i, ellipse in enumerate(ellipses):
+        print(f"📐 Ellipse {i+1}:")
+        print(f"   TP{i} → TP{i+1}")
+        print(f"   Frame {ellipse['start_frame']} → {ellipse['end_frame']}")
+        print(f"   Position: ({ellipse['start_x']:.3f}, {ellipse['start_y']:.3f}) → "
+              f"({ellipse['end_x']:.3f}, {ellipse['end_y']:.3f})")
+        print(f"   Winkel: {ellipse['angle']:.2f}°")
+        print()
+
+    print(f"✅ {len(ellipses)} Ellipsen erstellt")
+    print(f"📊 Durchschnittlicher Winkel: {average_angle(ellipses):.2f}°")
+
+
+def render_figure(trajectory, turning_points, ellipses):
+    """Baut die Figure - wird bei einem Cache-Treffer nicht aufgerufen."""
+    from rendering import (draw_angle_lines, draw_segment_points, draw_segments, draw_turning_points,
+                           new_figure, segment_legend_handles)
+
+    fig, ax = new_figure((18, 11))
+    avg_angle = average_angle(ellipses)
+
+    x_flipped = trajectory.x
+    y_flipped = 1 - trajectory.y  # Y-Flip
+    colors = [e['color'] for e in ellipses]
+    start = [e['start_index'] for e in ellipses]
+    end = [e['end_index'] for e in ellipses]
+
+    # Alle Ellipsen-Bahnen, Punkte und Winkel-Linien (gepunktet) - je ein Artist
+    draw_segments(ax, x_flipped, y_flipped, start, end, colors, linewidth=5, alpha=0.85, zorder=4)
+    draw_segment_points(ax, x_flipped, y_flipped, start, end, colors, s=70, alpha=0.8, zorder=5)
+    draw_angle_lines(ax, [e['start_x'] for e in ellipses], [1 - e['start_y'] for e in ellipses],
+                     [e['end_x'] for e in ellipses], [1 - e['end_y'] for e in ellipses], colors)
+
+    # Umkehrpunkte markieren
+    draw_turning_points(ax, [tp['x'] for tp in turning_points], [1 - tp['y'] for tp in turning_points],
+                        [tp['type'] for tp in turning_points], size=450, start_size=600)
+
+    for i, tp in enumerate(turning_points):
+        # Label
+        offset = -0.07 if i % 2 == 0 else 0.07
+        va = 'top' if i % 2 == 0 else 'bottom'
+
+        ax.text(tp['x'], 1 - tp['y'] + offset, f"TP{i}\nF{tp['frame']}",
+                ha='center', va=va, fontsize=11, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.6', facecolor='white', alpha=0.95,
+                         edgecolor='black', linewidth=2), zorder=11)
+
+    # Layout
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+    ax.set_xlabel('X-Position (normalisiert)', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=14, fontweight='bold')
+    ax.set_title(f'HammerTrack: Korrekte Federungs-Analyse\n{len(trajectory)} Frames • {len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
+                 fontsize=16, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_aspect('equal')
+    ax.legend(handles=segment_legend_handles(
+                  colors, [f"Ellipse {e['number']}: {e['angle']:.2f}°" for e in ellipses], alpha=0.85),
+              loc='upper right', fontsize=10, framealpha=0.95, edgecolor='black', ncol=2)
+
+    # Info-Box
+    info_text = f"""FEDERUNGS-LOGIK:
+    • Fokus: Nur X-Achse
+    • Richtungswechsel = Umkehrpunkt
+    • {len(turning_points)} Umkehrpunkte
+    • {len(ellipses)} Ellipsen (konsekutiv)
+    • Jede Ellipse: TP(i) → TP(i+1)
+    • Winkel: Start → Ende
+    • ∅ Winkel: {avg_angle:.2f}°
+    • Gepunktete Linien = Winkelmessung"""
+
+    ax.text(0.02, 0.98, info_text, transform=ax.transAxes, fontsize=10,
+            verticalalignment='top',
+            bbox=dict(boxstyle='round,pad=1', facecolor='lightgreen', alpha=0.9,
+                     edgecolor='black', linewidth=2), family='monospace')
+
+    fig.tight_layout()
+    return fig
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Datei, Xcode-Log oder '-' (stdin) als Argument - sonst die eingebetteten Daten
+    trajectory = load_trajectory(argv[0]) if argv else parse_trajectory(csv_data)
+    turning_points = spring_turning_points(trajectory)
+    ellipses = consecutive_ellipses(turning_points)
+    print_report(trajectory, turning_points, ellipses)
+
+    # === SCHRITT 6: VISUALISIERUNG ===
+    print("\n🎨 SCHRITT 6: Visualisierung erstellen")
+    print("-" * 80)
+
+    import rendering
+    from render_cache import render_cached
+
+    cached = render_cached(OUTPUT_PATH, lambda: render_figure(trajectory, turning_points, ellipses),
+                           arrays=(trajectory.frames, trajectory.x, trajectory.y),
+                           params={'turning_points': turning_points, 'ellipses': ellipses,
+                                   'style': rendering.STYLE_PARAMS},
+                           style_sources=(render_figure, *rendering.STYLE_SOURCES), dpi=150, bbox_inches='tight')
+
+    print(f"✅ Visualisierung gespeichert: {OUTPUT_PATH}{' (aus Cache)' if cached else ''}")
+    print("\n" + "=" * 80)
+    print("ANALYSE ABGESCHLOSSEN")
+    print("=" * 80)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
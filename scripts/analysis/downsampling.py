@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Downsampling langer Trajektorien für die Darstellung
+====================================================
+Reduziert Millionen Punkte auf ein festes Budget, ohne die Form der Bahn
+zu verlieren. Beide Verfahren arbeiten auf der Punkt-REIHENFOLGE (die Bahn
+ist eine Kurve in X/Y, keine Funktion von X) und liefern sortierte Indizes:
+
+- 'lttb':   Largest-Triangle-Three-Buckets - pro Bucket der Punkt mit der
+            größten Dreiecksfläche zum vorigen Auswahlpunkt und zum
+            Mittelwert des nächsten Buckets
+- 'minmax': pro Bucket min/max von X und Y (voll vektorisiert, 4 Punkte
+            pro Bucket) - erhält Ausreißer und Umkehrpunkte der Bahn
+
+`keep` (z.B. Umkehrpunkt-Indizes) wird IMMER übernommen.
+"""
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+
+def downsample(x, y, threshold, method='minmax', keep=None):
+    """Indizes von höchstens ~threshold Punkten (+ keep), aufsteigend sortiert."""
+    if method == 'lttb':
+        return lttb_indices(x, y, threshold, keep=keep)
+    if method == 'minmax':
+        return minmax_indices(x, y, threshold, keep=keep)
+    raise ValueError(f"Unbekanntes Downsampling: {method!r} (erlaubt: {', '.join(METHODS)})")
+
+
+def lttb_indices(x, y, threshold, keep=None):
+    """Largest-Triangle-Three-Buckets. Erster und letzter Punkt bleiben immer."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return _with_keep(np.arange(n), keep)
+
+    # Bucket-Grenzen der inneren Punkte 1..n-2 (wie im Original-Algorithmus)
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.arange(threshold - 1) * every).astype(np.intp) + 1
+    bounds[-1] = n - 1
+
+    # Mittelwert jedes Buckets - unabhängig von der Auswahl, daher vorab
+    mean_x = np.add.reduceat(x[:n - 1], bounds[:-1]) / np.diff(bounds)
+    mean_y = np.add.reduceat(y[:n - 1], bounds[:-1]) / np.diff(bounds)
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        lo, hi = bounds[bucket], bounds[bucket + 1]
+        next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return _with_keep(selected, keep)
+
+
+def minmax_indices(x, y, threshold, keep=None):
+    """Pro Bucket die Punkte mit min/max X und min/max Y (≤ 4 pro Bucket)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    buckets = max(threshold // 4, 1)
+    if threshold >= n:
+        return _with_keep(np.arange(n), keep)
+
+    size = -(-n // buckets)
+    padded = size * buckets - n
+    selected = [np.array([0, n - 1])]
+    for values in (x, y):
+        low = np.pad(values, (0, padded), constant_values=np.inf).reshape(buckets, size)
+        high = np.pad(values, (0, padded), constant_values=-np.inf).reshape(buckets, size)
+        offsets = np.arange(buckets) * size
+        selected += [offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)]
+    return _with_keep(np.minimum(np.concatenate(selected), n - 1), keep)
+
+
+def _with_keep(selected, keep):
+    if keep is not None and len(keep):
+        selected = np.concatenate((selected, np.asarray(keep, dtype=np.intp)))
+    return np.unique(selected)
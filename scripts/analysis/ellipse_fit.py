@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Echte Ellipsen-Fits pro Drehung
+===============================
+calculateEllipseAngleWithPythagoras (und ellipses.py) misst den
+"Ellipsen-Winkel" nur zwischen zwei Umkehrpunkten - alle Punkte dazwischen
+bleiben unberücksichtigt. Hier wird durch jede Drehung (Segment TP(i) bis
+TP(i+2) wie createEllipsesFromThreePoints) eine Ellipse gelegt:
+Direct-Least-Squares-Fit (Fitzgibbon) in der numerisch stabilen Form von
+Halír & Flusser.
+
+- Alle Segmente aller Würfe auf einmal: pro Segment werden die Punkte
+  zentriert und skaliert, die 6×6-Streumatrix DᵀD entsteht aus 15
+  Monom-Summen (np.add.reduceat) - keine Schleife über Segmente
+- Ein einziger np.linalg.eig-Aufruf über den (Segmente × 3 × 3)-Stapel
+  (bei sehr großen Archiven einer pro FIT_CHUNK_POINTS Punkte)
+- Pro Drehung: Mittelpunkt, große/kleine Halbachse, Kippwinkel der großen
+  Achse (Grad, Bildkoordinaten mit Y nach unten, in (-90°, 90°]) und das
+  RMS der Sampson-Abstände als Residuum
+- Segmente mit weniger als MIN_POINTS Punkten, ohne Ellipsen-Lösung oder
+  mit entarteter Ellipse (kleine/große Halbachse unter MIN_AXIS_RATIO, z.B.
+  Punkte auf einer Linie, oder Residuum über MAX_RESIDUAL_RATIO × kleine
+  Halbachse) sind NaN (valid = False)
+
+Verwendung:
+    from ellipse_fit import fit_turns
+    fits = fit_turns(x, y, tp_index)       # EllipseFits, eine Zeile pro Drehung
+    fits.tilt, fits.residual
+    python ellipse_fit.py saison.htarch -o ellipsen.npz -j 4
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ellipses import segment_ellipses
+from trajectory_archive import TrajectoryArchive
+from trajectory_io import collect_files, is_archive, iter_trajectories
+from turning_points import MIN_DISTANCE, MIN_FRAMES, detect_turning_points
+
+MIN_POINTS = 6                  # 5 Punkte bestimmen einen Kegelschnitt, ab 6 gibt es ein Residuum
+MIN_AXIS_RATIO = 0.05           # kleine/große Halbachse - echte Drehungen liegen über 0.15
+MAX_RESIDUAL_RATIO = 0.5        # Residuum höchstens halb so groß wie die kleine Halbachse
+FIT_CHUNK_POINTS = 1 << 20      # Punkte pro eig-Aufruf (begrenzt den Speicher)
+ARCHIVE_CHUNK = 256             # Würfe pro Job bei .htarch-Archiven
+
+# Spalten der Design-Matrix D: x², xy, y², x, y, 1 als Exponenten (x, y)
+_DESIGN = ((2, 0), (1, 1), (0, 2), (1, 0), (0, 1), (0, 0))
+_MONOMIALS = [(a, b) for a in range(5) for b in range(5 - a)]
+# DᵀD[i, j] = Σ x^(ai+aj) · y^(bi+bj) → Index in _MONOMIALS
+_SCATTER_INDEX = np.array([[_MONOMIALS.index((ai + aj, bi + bj)) for aj, bj in _DESIGN] for ai, bi in _DESIGN])
+
+COLUMNS = [
+    ('source', object),
+    ('block', np.int32),
+    ('turn', np.int32),
+    ('start_frame', np.int32),
+    ('end_frame', np.int32),
+    ('points', np.int32),
+    ('center_x', np.float64),
+    ('center_y', np.float64),
+    ('major', np.float64),
+    ('minor', np.float64),
+    ('tilt', np.float64),
+    ('residual', np.float64),
+    ('tp_angle', np.float64),   # Winkel wie createEllipsesFromThreePoints, zum Vergleich
+]
+
+
+@dataclass(frozen=True)
+class EllipseFits:
+    """Ein Ellipsen-Fit pro Segment - Längen in normalisierten Bildkoordinaten."""
+    throw: np.ndarray      # Wurf-Nummer (0 ohne tp_offsets)
+    start: np.ndarray      # erster Punkt des Segments
+    end: np.ndarray        # letzter Punkt des Segments (inklusive)
+    center_x: np.ndarray
+    center_y: np.ndarray
+    major: np.ndarray      # große Halbachse
+    minor: np.ndarray      # kleine Halbachse
+    tilt: np.ndarray       # Kippwinkel der großen Achse in Grad
+    residual: np.ndarray   # RMS der Sampson-Abstände
+    valid: np.ndarray      # bool
+
+    def __len__(self):
+        return len(self.start)
+
+
+def fit_ellipses(x, y, start, end):
+    """Direct-Least-Squares-Ellipse durch die Punkte start[k] … end[k] jedes Segments.
+
+    Returns:
+        (center_x, center_y, major, minor, tilt, residual, valid) - je (Segmente,)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    start = np.asarray(start, dtype=np.intp)
+    end = np.asarray(end, dtype=np.intp)
+    results = [np.full(len(start), np.nan) for _ in range(6)] + [np.zeros(len(start), dtype=bool)]
+    lengths = end - start + 1
+    first = 0
+    while first < len(start):  # Blöcke zu höchstens FIT_CHUNK_POINTS Punkten (mindestens ein Segment)
+        last = first + max(1, int(np.searchsorted(np.cumsum(lengths[first:]), FIT_CHUNK_POINTS, side='right')))
+        for column, values in zip(results, _fit_chunk(x, y, start[first:last], lengths[first:last])):
+            column[first:last] = values
+        first = last
+    return tuple(results)
+
+
+def _fit_chunk(x, y, start, lengths):
+    count = len(start)
+    segment = np.repeat(np.arange(count), lengths)
+    rows = np.repeat(start - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    bounds = np.cumsum(lengths) - lengths
+
+    # Pro Segment zentrieren und auf mittleren Abstand √2 skalieren (Konditionierung)
+    mean_x = np.add.reduceat(x[rows], bounds) / lengths
+    mean_y = np.add.reduceat(y[rows], bounds) / lengths
+    u = x[rows] - mean_x[segment]
+    v = y[rows] - mean_y[segment]
+    scale = np.sqrt(np.add.reduceat(u * u + v * v, bounds) / (2 * lengths))
+    valid = (lengths >= MIN_POINTS) & (scale > 0)
+    scale = np.where(valid, scale, 1.0)
+    u /= scale[segment]
+    v /= scale[segment]
+
+    powers_u = np.stack([u ** a for a in range(5)])
+    powers_v = np.stack([v ** b for b in range(5)])
+    sums = np.stack([np.add.reduceat(powers_u[a] * powers_v[b], bounds) for a, b in _MONOMIALS], axis=1)
+    scatter = sums[:, _SCATTER_INDEX]
+    scatter[~valid] = np.eye(6)  # Platzhalter, damit eig über den ganzen Stapel läuft
+
+    # Halír & Flusser: quadratischer Teil a1 = (a, b, c), linearer Teil a2 = T·a1
+    s1, s2, s3 = scatter[:, :3, :3], scatter[:, :3, 3:], scatter[:, 3:, 3:]
+    t = -np.linalg.pinv(s3) @ np.swapaxes(s2, 1, 2)
+    m = s1 + s2 @ t
+    m = np.stack((m[:, 2] / 2, -m[:, 1], m[:, 0] / 2), axis=1)   # C1⁻¹·M
+    _, vectors = np.linalg.eig(m)
+    vectors = vectors.real
+    condition = 4 * vectors[:, 0] * vectors[:, 2] - vectors[:, 1] ** 2   # 4ac - b² > 0 ⇔ Ellipse
+    choice = np.argmax(condition, axis=1)
+    valid &= condition[np.arange(count), choice] > 0
+    a1 = vectors[np.arange(count), :, choice]
+    a2 = (t @ a1[:, :, None])[:, :, 0]
+    a, b, c = a1.T
+    d, e, f = a2.T
+
+    # Mittelpunkt, Halbachsen und Kippwinkel der quadratischen Form
+    with np.errstate(invalid='ignore', divide='ignore'):
+        determinant = 4 * a * c - b * b
+        center_u = (b * e - 2 * c * d) / determinant
+        center_v = (b * d - 2 * a * e) / determinant
+        offset = f + (d * center_u + e * center_v) / 2
+        half_sum = (a + c) / 2
+        half_diff = np.hypot((a - c) / 2, b / 2)
+        sign = np.sign(half_sum)
+        axis_small = np.sqrt(-offset * sign / (half_sum * sign + half_diff))
+        axis_large = np.sqrt(-offset * sign / (half_sum * sign - half_diff))
+        tilt = np.degrees(0.5 * np.arctan2(b * sign, (a - c) * sign)) + 90.0
+        tilt = np.where(tilt > 90.0, tilt - 180.0, tilt)
+
+        value = a[segment] * u * u + b[segment] * u * v + c[segment] * v * v + d[segment] * u + e[segment] * v + f[segment]
+        grad_u = 2 * a[segment] * u + b[segment] * v + d[segment]
+        grad_v = b[segment] * u + 2 * c[segment] * v + e[segment]
+        sampson = value * value / (grad_u * grad_u + grad_v * grad_v)
+        residual = np.sqrt(np.add.reduceat(sampson, bounds) / lengths) * scale
+
+    valid &= np.isfinite(axis_large) & np.isfinite(axis_small) & np.isfinite(residual)
+    with np.errstate(invalid='ignore'):
+        valid &= (axis_small >= MIN_AXIS_RATIO * axis_large) & (residual <= MAX_RESIDUAL_RATIO * axis_small * scale)
+    return tuple(np.where(valid, values, np.nan) for values in (
+        center_u * scale + mean_x, center_v * scale + mean_y, axis_large * scale, axis_small * scale,
+        tilt, residual)) + (valid,)
+
+
+def fit_turns(x, y, tp_index, tp_offsets=None, strategy='swift'):
+    """Eine Ellipse pro Drehung - Segmente wie segment_ellipses (auch über mehrere Würfe)."""
+    segments = segment_ellipses(x, y, tp_index, tp_offsets, strategies=[strategy])[strategy]
+    center_x, center_y, major, minor, tilt, residual, valid = fit_ellipses(x, y, segments.start, segments.end)
+    return EllipseFits(segments.throw, segments.start, segments.end, center_x, center_y, major, minor,
+                       tilt, residual, valid), segments
+
+
+def fit_file(path, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES, throws=None):
+    """Alle Drehungen aller Würfe einer Datei mit EINEM fit_turns-Aufruf. Returns Spalten-Dict (COLUMNS)."""
+    if throws is None:
+        blocks = list(enumerate(iter_trajectories(path)))
+    else:
+        archive = TrajectoryArchive(path)
+        blocks = [(i, archive[i]) for i in range(*throws)]
+
+    xs, ys, frames, tps = [], [], [], []
+    points = 0
+    for _, trajectory in blocks:
+        tp_index, _ = detect_turning_points(trajectory.x, trajectory.y, min_distance=min_distance, min_frames=min_frames)
+        xs.append(np.asarray(trajectory.x, dtype=np.float64))
+        ys.append(np.asarray(trajectory.y, dtype=np.float64))
+        frames.append(np.asarray(trajectory.frames))
+        tps.append(tp_index + points)
+        points += len(trajectory)
+    if not blocks:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+
+    tp_offsets = np.concatenate(([0], np.cumsum([len(t) for t in tps])))
+    frames = np.concatenate(frames)
+    fits, segments = fit_turns(np.concatenate(xs), np.concatenate(ys), np.concatenate(tps), tp_offsets)
+    counts = np.bincount(fits.throw, minlength=len(blocks))
+    return {
+        'source': np.full(len(fits), str(path), dtype=object),
+        'block': np.array([block for block, _ in blocks], dtype=np.int32)[fits.throw],
+        'turn': (np.arange(len(fits)) - np.repeat(np.cumsum(counts) - counts, counts)).astype(np.int32),
+        'start_frame': frames[fits.start].astype(np.int32),
+        'end_frame': frames[fits.end].astype(np.int32),
+        'points': (fits.end - fits.start + 1).astype(np.int32),
+        'center_x': fits.center_x,
+        'center_y': fits.center_y,
+        'major': fits.major,
+        'minor': fits.minor,
+        'tilt': fits.tilt,
+        'residual': fits.residual,
+        'tp_angle': segments.angles,
+    }
+
+
+def _fit_file_args(args):
+    return fit_file(*args)
+
+
+def _jobs(files, min_distance, min_frames):
+    """Ein Job pro Datei; Archive werden in Blöcke zu ARCHIVE_CHUNK Würfen geteilt."""
+    for path in files:
+        if not is_archive(path):
+            yield path, min_distance, min_frames, None
+            continue
+        count = len(TrajectoryArchive(path))
+        for start in range(0, count, ARCHIVE_CHUNK):
+            yield path, min_distance, min_frames, (start, min(start + ARCHIVE_CHUNK, count))
+
+
+def fit_batch(files, workers=None, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Verteilt die Dateien auf einen Prozess-Pool. Gibt die Tabelle (eine Zeile pro Drehung) zurück."""
+    jobs = list(_jobs(files, min_distance, min_frames))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 8))
+
+    tables = []
+    if workers == 1:
+        tables = [_fit_file_args(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(_fit_file_args, jobs, chunksize=chunksize))
+    return {name: np.concatenate([table[name] for table in tables]) if tables else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS}
+
+
+def write_table(table, output):
+    """Schreibt die Tabelle als .csv oder .npz (je nach Dateiendung)."""
+    output = Path(output)
+    if output.suffix == '.npz':
+        np.savez(output, **{name: column.astype(str) if column.dtype == object else column
+                            for name, column in table.items()})
+        return
+
+    names = [name for name, _ in COLUMNS]
+    with open(output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(table[name].tolist() for name in names)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ellipsen-Fit (Least Squares) für jede Drehung aller Würfe')
+    parser.add_argument('inputs', nargs='+', help='Archive, CSV-Dateien, Xcode-Logs oder Verzeichnisse')
+    parser.add_argument('-o', '--output', default=None, help='Tabelle pro Drehung (.csv oder .npz)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Anzahl Prozesse (Standard: alle Kerne)')
+    parser.add_argument('--min-distance', type=float, default=MIN_DISTANCE)
+    parser.add_argument('--min-frames', type=int, default=MIN_FRAMES)
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if not files:
+        print('❌ Keine Wurf-Dateien gefunden', file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    table = fit_batch(files, args.workers, args.min_distance, args.min_frames)
+    valid = ~np.isnan(table['tilt'])
+    print(f"✅ {len(valid)} Drehungen aus {len(files)} Dateien in {time.perf_counter() - start:.2f} s, "
+          f"{int(valid.sum())} mit Ellipse")
+    if valid.any():
+        print(f"📊 Kippwinkel ∅ {table['tilt'][valid].mean():.2f}°, Halbachsen ∅ {table['major'][valid].mean():.3f} / "
+              f"{table['minor'][valid].mean():.3f}, Residuum ∅ {table['residual'][valid].mean():.4f}")
+    if len(valid) <= 20:
+        for row in range(len(valid)):
+            print(f"   #{table['block'][row]} Drehung {table['turn'][row] + 1}: Mitte ({table['center_x'][row]:.3f}, "
+                  f"{table['center_y'][row]:.3f}), Achsen {table['major'][row]:.3f}/{table['minor'][row]:.3f}, "
+                  f"Kippung {table['tilt'][row]:+.2f}° (TP-Winkel {table['tp_angle'][row]:+.2f}°), "
+                  f"Residuum {table['residual'][row]:.4f}")
+    if args.output:
+        write_table(table, args.output)
+        print(f"💾 Gespeichert: {args.output}")
+    return 0 if valid.any() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
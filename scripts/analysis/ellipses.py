@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Ellipsen & Ellipsen-Winkel
+==========================
+Port von HammerTracker.createEllipsesFromThreePoints und
+HammerTracker.calculateEllipseAngleWithPythagoras.
+
+Vorzeichen wie im Swift-Code (Vision/UIKit: Y=0 ist OBEN):
+- Erster Punkt höher (start_y < end_y)   → fällt nach LINKS  → positiver Winkel
+- Erster Punkt niedriger (start_y >= end_y) → fällt nach RECHTS → negativer Winkel
+- Bewegung <= 0.001 in X UND Y → 0°
+
+Segmentierungs-Strategien (alle mit diesem Vorzeichen):
+- 'swift':   TP(0,1,2), (2,3,4), ... - Winkel TP(i) → TP(i+1)
+             (createEllipsesFromThreePoints)
+- 'stride2': dieselben Segmente - Winkel TP(i) → TP(i+2)
+             (analyze_correct_ellipses.py)
+- 'pairs':   TP(i) → TP(i+1), jedes Paar eine Ellipse
+             (correct_spring_analysis.py)
+Weitere Strategien: SegmentationStrategy in STRATEGIES eintragen.
+
+Verwendung:
+    segments = segment_ellipses(x, y, tp_index)
+    segments['swift'].angles
+    python ellipses.py saison.htarch      # Strategien über alle Würfe vergleichen
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from trajectory_io import collect_files, iter_trajectories
+from turning_points import MIN_DISTANCE, MIN_FRAMES, detect_turning_points
+
+MIN_MOVEMENT = 0.001  # Prüfung auf minimale Bewegung
+
+
+def ellipse_angle(start_x, start_y, end_x, end_y):
+    """Signierter Winkel in Grad - funktioniert für Skalare und ganze Arrays."""
+    start_x, start_y, end_x, end_y = (np.asarray(v, dtype=np.float64)
+                                      for v in (start_x, start_y, end_x, end_y))
+    dx = end_x - start_x
+    dy = end_y - start_y
+
+    angle = np.arctan2(np.abs(dy), np.abs(dx)) * 180.0 / np.pi
+    angle = np.where(start_y < end_y, angle, -angle)
+    moved = (np.abs(dx) > MIN_MOVEMENT) | (np.abs(dy) > MIN_MOVEMENT)
+    return np.where(moved, angle, 0.0)
+
+
+def three_point_ellipses(tp_index):
+    """Ellipsen wie createEllipsesFromThreePoints: TP(0,1,2), (2,3,4), (4,5,6), ...
+
+    Der 3. Punkt einer Ellipse ist zugleich der 1. Punkt der nächsten.
+
+    Returns:
+        (start, mid, end) - Punkt-Indizes pro Ellipse
+    """
+    tp_index = np.asarray(tp_index)
+    count = max((len(tp_index) - 1) // 2, 0)
+    start = tp_index[0:2 * count:2]
+    mid = tp_index[1:2 * count:2]
+    end = tp_index[2:2 * count + 1:2]
+    return start, mid, end
+
+
+def three_point_ellipse_angles(x, y, tp_index):
+    """Winkel aller 3-Punkt-Ellipsen - gemessen von TP(i) zu TP(i+1) wie im Swift-Code."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    start, mid, _ = three_point_ellipses(tp_index)
+    return ellipse_angle(x[start], y[start], x[mid], y[mid])
+
+
+@dataclass(frozen=True)
+class SegmentationStrategy:
+    """Ellipse k umfasst TP(k·stride) bis TP(k·stride + span).
+
+    Der Winkel wird von TP(k·stride + angle_from) zu TP(k·stride + angle_to) gemessen.
+    """
+    stride: int
+    span: int
+    angle_from: int
+    angle_to: int
+    description: str = ''
+
+    def count(self, tp_count):
+        """Anzahl Ellipsen bei `tp_count` Umkehrpunkten (auch als Array)."""
+        return np.maximum((np.asarray(tp_count) - 1 - self.span) // self.stride + 1, 0)
+
+
+STRATEGIES = {
+    'swift': SegmentationStrategy(2, 2, 0, 1, 'createEllipsesFromThreePoints: TP(i) → TP(i+1)'),
+    'stride2': SegmentationStrategy(2, 2, 0, 2, 'analyze_correct_ellipses.py: TP(i) → TP(i+2)'),
+    'pairs': SegmentationStrategy(1, 1, 0, 1, 'correct_spring_analysis.py: konsekutive Paare'),
+}
+
+
+@dataclass(frozen=True)
+class EllipseSegments:
+    """Ellipsen einer Strategie - alle Indizes sind Punkt-Indizes."""
+    throw: np.ndarray        # Wurf-Nummer (0 ohne tp_offsets)
+    start: np.ndarray        # erster Punkt der Ellipse
+    end: np.ndarray          # letzter Punkt der Ellipse
+    angle_start: np.ndarray  # Winkel wird von diesem Punkt ...
+    angle_end: np.ndarray    # ... zu diesem Punkt gemessen
+    angles: np.ndarray       # signierter Winkel in Grad
+
+    def __len__(self):
+        return len(self.angles)
+
+
+def segment_ellipses(x, y, tp_index, tp_offsets=None, strategies=None):
+    """Segmente und Winkel ALLER Strategien in einem Durchlauf.
+
+    Args:
+        tp_index: Punkt-Indizes der Umkehrpunkte
+        tp_offsets: mehrere Würfe hintereinander - die Umkehrpunkte von Wurf
+            i liegen in tp_index[tp_offsets[i]:tp_offsets[i+1]]; Ellipsen
+            laufen nie über Wurfgrenzen
+        strategies: Namen aus STRATEGIES (Standard: alle)
+
+    Returns:
+        {Strategie-Name: EllipseSegments}
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    tp_index = np.asarray(tp_index, dtype=np.intp)
+    if tp_offsets is None:
+        tp_offsets = np.array([0, len(tp_index)])
+    tp_offsets = np.asarray(tp_offsets, dtype=np.intp)
+    tp_counts = np.diff(tp_offsets)
+    names = list(STRATEGIES) if strategies is None else list(strategies)
+
+    segments = {}
+    for name in names:
+        strategy = STRATEGIES[name]
+        counts = strategy.count(tp_counts)
+        throw = np.repeat(np.arange(len(counts)), counts)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        first = tp_offsets[:-1][throw] + k * strategy.stride
+        segments[name] = (throw, first, strategy)
+
+    # Ein einziger ellipse_angle-Aufruf für alle Strategien
+    angle_start = [tp_index[first + strategy.angle_from] for _, first, strategy in segments.values()]
+    angle_end = [tp_index[first + strategy.angle_to] for _, first, strategy in segments.values()]
+    starts = np.concatenate(angle_start) if angle_start else np.empty(0, dtype=np.intp)
+    ends = np.concatenate(angle_end) if angle_end else np.empty(0, dtype=np.intp)
+    angles = ellipse_angle(x[starts], y[starts], x[ends], y[ends])
+    split = np.cumsum([len(a) for a in angle_start])[:-1]
+
+    return {
+        name: EllipseSegments(
+            throw=throw,
+            start=tp_index[first],
+            end=tp_index[first + strategy.span],
+            angle_start=a_start,
+            angle_end=a_end,
+            angles=a,
+        )
+        for (name, (throw, first, strategy)), a_start, a_end, a
+        in zip(segments.items(), angle_start, angle_end, np.split(angles, split))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ellipsen-Definitionen über viele Würfe vergleichen')
+    parser.add_argument('inputs', nargs='+', help='Archiv, CSV-Dateien, Xcode-Logs oder Verzeichnisse')
+    parser.add_argument('--min-distance', type=float, default=MIN_DISTANCE)
+    parser.add_argument('--min-frames', type=int, default=MIN_FRAMES)
+    args = parser.parse_args(argv)
+
+    xs, ys, tps = [], [], []
+    points = 0
+    for path in collect_files(args.inputs):
+        for trajectory in iter_trajectories(path):
+            tp_index, _ = detect_turning_points(trajectory.x, trajectory.y,
+                                                min_distance=args.min_distance, min_frames=args.min_frames)
+            xs.append(trajectory.x)
+            ys.append(trajectory.y)
+            tps.append(tp_index + points)
+            points += len(trajectory)
+    if not tps:
+        print('❌ Keine Würfe gefunden', file=sys.stderr)
+        return 1
+
+    tp_offsets = np.concatenate(([0], np.cumsum([len(t) for t in tps])))
+    segments = segment_ellipses(np.concatenate(xs), np.concatenate(ys), np.concatenate(tps), tp_offsets)
+
+    print(f"📂 {len(tps)} Würfe, {points} Punkte, {tp_offsets[-1]} Umkehrpunkte")
+    for name, result in segments.items():
+        if len(result):
+            stats = f"∅ {result.angles.mean():7.2f}°  σ {result.angles.std():6.2f}°"
+        else:
+            stats = '-'
+        print(f"   {name:8s} {len(result):8d} Ellipsen  {stats}   ({STRATEGIES[name].description})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
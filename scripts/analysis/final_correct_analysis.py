@@ -7,8 +7,11 @@ Wie eine Feder von der Seite betrachtet:
 - Jeder Umkehrpunkt ist Ende UND Start
 """
 
-import matplotlib.pyplot as plt
+import sys
+
 import numpy as np
+from trajectory_io import load_trajectory, parse_trajectory
+from turning_points import detect_turning_points, turning_point_types
 
 # === DATEN ===
 csv_data = """Frame,X,Y
@@ -125,145 +128,122 @@ csv_data = """Frame,X,Y
 133,0.050018,0.478851
 134,0.005936,0.578964"""
 
-# Parse & Sort
-lines = csv_data.strip().split('\n')[1:]
-data_points = []
-for line in lines:
-    parts = line.split(',')
-    data_points.append({
-        'frame': int(parts[0]),
-        'x': float(parts[1]),
-        'y': float(parts[2])
-    })
-data_points.sort(key=lambda p: p['frame'])
-
-# === VERWENDE ORIGINAL UMKEHRPUNKTE AUS IOS-LOG ===
-# Diese wurden vom Swift-Code gefunden!
-original_turning_points = [
-    {"frame": 0, "x": 0.782, "y": 0.399, "type": "START"},
-    {"frame": 16, "x": 0.242, "y": 0.648, "type": "MINIMUM"},
-    {"frame": 32, "x": 0.914, "y": 0.393, "type": "MAXIMUM"},
-    {"frame": 47, "x": 0.313, "y": 0.650, "type": "MINIMUM"},
-    {"frame": 62, "x": 0.237, "y": 0.517, "type": "MAXIMUM"},
-    {"frame": 78, "x": 0.067, "y": 0.597, "type": "MINIMUM"},
-    {"frame": 96, "x": 0.977, "y": 0.546, "type": "MAXIMUM"},
-]
-
-# Finde Index in data_points für jeden Umkehrpunkt
-turning_points = []
-for otp in original_turning_points:
-    # Finde den Punkt mit diesem Frame
-    for i, p in enumerate(data_points):
-        if p['frame'] == otp['frame']:
-            turning_points.append({
-                'index': i,
-                'frame': p['frame'],
-                'x': p['x'],
-                'y': p['y'],
-                'type': otp['type']
-            })
-            break
-
-print(f"🎯 {len(turning_points)} Umkehrpunkte (aus iOS-Log)\n")
-
-# === ELLIPSEN: Jeder Umkehrpunkt(i) → Umkehrpunkt(i+1) ===
-ellipses = []
-colors = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844']
-
-for i in range(len(turning_points) - 1):
-    start_tp = turning_points[i]
-    end_tp = turning_points[i + 1]
-
-    # Winkel berechnen
-    dx = end_tp['x'] - start_tp['x']
-    dy = end_tp['y'] - start_tp['y']
-
-    angle_rad = np.arctan2(abs(dy), abs(dx))
-    angle_deg = angle_rad * 180.0 / np.pi
-
-    if start_tp['y'] > end_tp['y']:
-        angle_deg = angle_deg
-    else:
-        angle_deg = -angle_deg
-
-    ellipses.append({
-        'number': i + 1,
-        'start_idx': start_tp['index'],
-        'end_idx': end_tp['index'],
-        'start_frame': start_tp['frame'],
-        'end_frame': end_tp['frame'],
-        'start_x': start_tp['x'],
-        'start_y': start_tp['y'],
-        'end_x': end_tp['x'],
-        'end_y': end_tp['y'],
-        'angle': angle_deg,
-        'color': colors[i % len(colors)]
-    })
-
-    print(f"📐 Ellipse {i+1}: TP{i} → TP{i+1}")
-    print(f"   Frame {start_tp['frame']} → {end_tp['frame']}")
-    print(f"   Winkel: {angle_deg:.2f}°\n")
-
-avg_angle = sum(e['angle'] for e in ellipses) / len(ellipses)
-print(f"✅ {len(ellipses)} Ellipsen | Durchschnitt: {avg_angle:.2f}°\n")
-
-# === VISUALISIERUNG ===
-fig, ax = plt.subplots(figsize=(16, 10))
-
-frames = [p['frame'] for p in data_points]
-x_coords = [p['x'] for p in data_points]
-y_coords = [1 - p['y'] for p in data_points]
-
-# Zeichne jede Ellipse
-for ellipse in ellipses:
-    ellipse_x = []
-    ellipse_y = []
-
-    for i, p in enumerate(data_points):
-        if ellipse['start_idx'] <= i <= ellipse['end_idx']:
-            ellipse_x.append(p['x'])
-            ellipse_y.append(1 - p['y'])
-
-    # Bahn
-    ax.plot(ellipse_x, ellipse_y, color=ellipse['color'], linewidth=5, alpha=0.8, zorder=4,
-            label=f"Ellipse {ellipse['number']}: {ellipse['angle']:.2f}°")
-
-    # Punkte
-    ax.scatter(ellipse_x, ellipse_y, s=70, color=ellipse['color'], alpha=0.8,
-               edgecolors='black', linewidth=1.5, zorder=5)
-
-    # Winkel-Linie (gepunktet)
-    ax.plot([ellipse['start_x'], ellipse['end_x']],
-            [1 - ellipse['start_y'], 1 - ellipse['end_y']],
-            color=ellipse['color'], linewidth=2, linestyle=':', alpha=0.6, zorder=3)
-
-# Umkehrpunkte
-for i, tp in enumerate(turning_points):
-    color = '#FFD700' if tp['type'] == 'START' else '#FF1493' if tp['type'] == 'MAX' else '#00CED1'
-    marker = 'o' if tp['type'] == 'START' else '^' if tp['type'] == 'MAX' else 'v'
-    size = 500 if tp['type'] == 'START' else 400
-
-    ax.scatter(tp['x'], 1 - tp['y'], s=size, color=color, marker=marker,
-               edgecolors='black', linewidth=3, zorder=10, alpha=0.95)
-
-    offset = -0.07 if i % 2 == 0 else 0.07
-    va = 'top' if i % 2 == 0 else 'bottom'
-    ax.text(tp['x'], 1 - tp['y'] + offset, f"TP{i}\nF{tp['frame']}",
-            ha='center', va=va, fontsize=10, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.95,
-                     edgecolor='black', linewidth=2), zorder=11)
-
-ax.set_xlim(-0.05, 1.05)
-ax.set_ylim(-0.05, 1.05)
-ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
-ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
-ax.set_title(f'HammerTrack: Feder-Ellipsen (Jeder TP ist Ende & Start)\n{len(data_points)} Frames • {len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
-             fontsize=15, fontweight='bold', pad=20)
-ax.grid(True, alpha=0.3, linestyle='--')
-ax.set_aspect('equal')
-ax.legend(loc='upper right', fontsize=11, framealpha=0.95, edgecolor='black')
-
-info_text = f"""Feder-Ellipsen:
+COLORS = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844']
+OUTPUT_PATH = '/Users/merlinhummel/Documents/HammerTrack/spring_ellipses.png'
+
+
+def swift_turning_points(trajectory):
+    """Umkehrpunkte mit der gleichen Logik wie der Swift-Code.
+
+    findTurningPoints + filterSignificantTurningPoints (minDistance 0.08, minFrames 5)
+    """
+    tp_index, tp_is_maximum = detect_turning_points(trajectory.x, trajectory.y)
+    frames, xs, ys = trajectory.frames.tolist(), trajectory.x.tolist(), trajectory.y.tolist()
+    return [
+        {
+            'index': i,
+            'frame': frames[i],
+            'x': xs[i],
+            'y': ys[i],
+            'type': tp_type
+        }
+        for i, tp_type in zip(tp_index.tolist(), turning_point_types(tp_is_maximum))
+    ]
+
+
+def spring_ellipses(turning_points, colors=COLORS):
+    """Jeder Umkehrpunkt(i) → Umkehrpunkt(i+1) ist eine Ellipse."""
+    ellipses = []
+    for i in range(len(turning_points) - 1):
+        start_tp = turning_points[i]
+        end_tp = turning_points[i + 1]
+
+        # Winkel berechnen
+        dx = end_tp['x'] - start_tp['x']
+        dy = end_tp['y'] - start_tp['y']
+
+        angle_rad = np.arctan2(abs(dy), abs(dx))
+        angle_deg = angle_rad * 180.0 / np.pi
+
+        if start_tp['y'] > end_tp['y']:
+            angle_deg = angle_deg
+        else:
+            angle_deg = -angle_deg
+
+        ellipses.append({
+            'number': i + 1,
+            'start_idx': start_tp['index'],
+            'end_idx': end_tp['index'],
+            'start_frame': start_tp['frame'],
+            'end_frame': end_tp['frame'],
+            'start_x': start_tp['x'],
+            'start_y': start_tp['y'],
+            'end_x': end_tp['x'],
+            'end_y': end_tp['y'],
+            'angle': angle_deg,
+            'color': colors[i % len(colors)]
+        })
+    return ellipses
+
+
+def average_angle(ellipses):
+    return sum(e['angle'] for e in ellipses) / len(ellipses) if ellipses else 0.0
+
+
+def print_report(turning_points, ellipses):
+    print(f"🎯 {len(turning_points)} Umkehrpunkte (wie HammerTracker.findTurningPoints)\n")
+    for i, e in enumerate(ellipses):
+        print(f"📐 Ellipse {i+1}: TP{i} → TP{i+1}")
+        print(f"   Frame {e['start_frame']} → {e['end_frame']}")
+        print(f"   Winkel: {e['angle']:.2f}°\n")
+    print(f"✅ {len(ellipses)} Ellipsen | Durchschnitt: {average_angle(ellipses):.2f}°\n")
+
+
+def render_figure(trajectory, turning_points, ellipses):
+    """Feder-Ellipsen, Umkehrpunkte und Winkel-Linien als Figure."""
+    from rendering import (draw_angle_lines, draw_segment_points, draw_segments, draw_turning_points,
+                           new_figure, segment_legend_handles)
+
+    avg_angle = average_angle(ellipses)
+    fig, ax = new_figure((16, 10))
+
+    x_flipped = trajectory.x
+    y_flipped = 1 - trajectory.y
+    colors = [e['color'] for e in ellipses]
+    start = [e['start_idx'] for e in ellipses]
+    end = [e['end_idx'] for e in ellipses]
+
+    # Alle Ellipsen: Bahn, Punkte, Winkel-Linie (gepunktet) - je ein Artist
+    draw_segments(ax, x_flipped, y_flipped, start, end, colors, linewidth=5, alpha=0.8, zorder=4)
+    draw_segment_points(ax, x_flipped, y_flipped, start, end, colors, s=70, alpha=0.8, zorder=5)
+    draw_angle_lines(ax, [e['start_x'] for e in ellipses], [1 - e['start_y'] for e in ellipses],
+                     [e['end_x'] for e in ellipses], [1 - e['end_y'] for e in ellipses], colors)
+
+    # Umkehrpunkte
+    draw_turning_points(ax, [tp['x'] for tp in turning_points], [1 - tp['y'] for tp in turning_points],
+                        [tp['type'] for tp in turning_points], size=400, start_size=500)
+
+    for i, tp in enumerate(turning_points):
+        offset = -0.07 if i % 2 == 0 else 0.07
+        va = 'top' if i % 2 == 0 else 'bottom'
+        ax.text(tp['x'], 1 - tp['y'] + offset, f"TP{i}\nF{tp['frame']}",
+                ha='center', va=va, fontsize=10, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.95,
+                         edgecolor='black', linewidth=2), zorder=11)
+
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+    ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
+    ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
+    ax.set_title(f'HammerTrack: Feder-Ellipsen (Jeder TP ist Ende & Start)\n{len(trajectory)} Frames • {len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
+                 fontsize=15, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_aspect('equal')
+    ax.legend(handles=segment_legend_handles(
+                  colors, [f"Ellipse {e['number']}: {e['angle']:.2f}°" for e in ellipses], alpha=0.8),
+              loc='upper right', fontsize=11, framealpha=0.95, edgecolor='black')
+
+    info_text = f"""Feder-Ellipsen:
 • {len(turning_points)} Umkehrpunkte
 • {len(ellipses)} Ellipsen
 • Jede Ellipse: TP(i) → TP(i+1)
@@ -271,12 +251,27 @@ info_text = f"""Feder-Ellipsen:
 • Durchschnitt: {avg_angle:.2f}°
 • Gepunktete Linien = Winkelmessung"""
 
-ax.text(0.02, 0.98, info_text, transform=ax.transAxes, fontsize=11,
-        verticalalignment='top',
-        bbox=dict(boxstyle='round,pad=1', facecolor='lightgreen', alpha=0.9,
-                 edgecolor='black', linewidth=2), family='monospace')
+    ax.text(0.02, 0.98, info_text, transform=ax.transAxes, fontsize=11,
+            verticalalignment='top',
+            bbox=dict(boxstyle='round,pad=1', facecolor='lightgreen', alpha=0.9,
+                     edgecolor='black', linewidth=2), family='monospace')
+
+    fig.tight_layout()
+    return fig
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Datei, Xcode-Log oder '-' (stdin) als Argument - sonst die eingebetteten Daten
+    trajectory = load_trajectory(argv[0]) if argv else parse_trajectory(csv_data)
+    turning_points = swift_turning_points(trajectory)
+    ellipses = spring_ellipses(turning_points)
+    print_report(turning_points, ellipses)
+
+    render_figure(trajectory, turning_points, ellipses).savefig(OUTPUT_PATH, dpi=150, bbox_inches='tight')
+    print(f"✅ Visualisierung: {OUTPUT_PATH}")
+    return 0
+
 
-plt.tight_layout()
-output_path = '/Users/merlinhummel/Documents/HammerTrack/spring_ellipses.png'
-plt.savefig(output_path, dpi=150, bbox_inches='tight')
-print(f"✅ Visualisierung: {output_path}")
+if __name__ == '__main__':
+    sys.exit(main())
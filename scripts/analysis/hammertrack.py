@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+hammertrack - gemeinsamer Einstieg für alle Analyse-Werkzeuge
+=============================================================
+Ein Befehl mit Unterbefehlen statt einzelner Skripte:
+
+    hammertrack analyze wurf.csv            # Text-Zusammenfassung (ohne matplotlib/plotly)
+    hammertrack plot wurf.csv -o wurf.png   # Standard-Plot eines Wurfs (matplotlib, Cache)
+    hammertrack interactive session.csv     # Zoombare HTML-Ansicht (plotly)
+    hammertrack batch wuerfe/ -o summary.csv
+    hammertrack video videos/ --model best.onnx -o saison.htarch
+    hammertrack icons --source logo.png
+
+Schwere Abhängigkeiten werden erst im Unterbefehl geladen, der sie braucht:
+`analyze` importiert nur numpy und die Analyse-Module, matplotlib bzw.
+plotly kommen erst mit `plot` bzw. `interactive`. interactive, batch,
+video und icons reichen ihre Argumente unverändert an das jeweilige Skript weiter
+(`hammertrack batch --help`).
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+STRATEGY = 'swift'
+
+# Unterbefehle, die ein bestehendes Skript aufrufen: (Modul, Hilfe-Text)
+DELEGATED = {
+    'interactive': ('interactive_view', 'Zoombare HTML-Ansicht (plotly, WebGL, Level of Detail)'),
+    'batch': ('batch_analysis', 'Ganze Verzeichnisse parallel analysieren, eine Zeile pro Wurf'),
+    'video': ('video_tracking', 'Hammer in Videos erkennen (ffmpeg, ONNX-Modell oder Replay)'),
+    'icons': ('generate_app_icons', 'App-Icons für den Xcode-Asset-Katalog erzeugen'),
+}
+
+
+def analyze(args):
+    """Text-Zusammenfassung pro Wurf: Umkehrpunkte, Ellipsen, Winkel."""
+    from ellipses import STRATEGIES, segment_ellipses
+    from trajectory_io import collect_files, iter_trajectories, load_trajectory, parse_trajectory
+    from turning_points import MIN_DISTANCE, MIN_FRAMES, detect_turning_points
+
+    if args.strategy not in STRATEGIES:
+        print(f"❌ Unbekannte Strategie: {args.strategy} (erlaubt: {', '.join(STRATEGIES)})", file=sys.stderr)
+        return 2
+
+    if not args.inputs:
+        from correct_spring_analysis import csv_data
+        throws = [('Beispielwurf', 0, parse_trajectory(csv_data))]
+    elif args.throw is not None:
+        throws = ((source, args.throw, load_trajectory(source, throw=args.throw)) for source in args.inputs)
+    else:
+        sources = [path for item in args.inputs for path in (['-'] if item == '-' else collect_files([item]))]
+        throws = ((source, block, trajectory) for source in sources
+                  for block, trajectory in enumerate(iter_trajectories(source)))
+
+    count = 0
+    for source, block, trajectory in throws:
+        count += 1
+        name = os.path.basename(source) if isinstance(source, (str, os.PathLike)) else source
+        if not len(trajectory):
+            print(f"📂 {name} #{block}: keine Punkte")
+            continue
+        tp_index, _ = detect_turning_points(
+            trajectory.x, trajectory.y,
+            min_distance=MIN_DISTANCE if args.min_distance is None else args.min_distance,
+            min_frames=MIN_FRAMES if args.min_frames is None else args.min_frames)
+        segments = segment_ellipses(trajectory.x, trajectory.y, tp_index, strategies=[args.strategy])[args.strategy]
+        print(f"📂 {name} #{block}: {len(trajectory)} Punkte (Frame {trajectory.frames[0]} → "
+              f"{trajectory.frames[-1]}), {len(tp_index)} Umkehrpunkte, {len(segments)} Ellipsen")
+        if len(segments):
+            angles = ', '.join(f"{angle:.2f}°" for angle in segments.angles)
+            print(f"   Winkel: {angles} | ∅ {segments.angles.mean():.2f}°")
+
+    if not count:
+        print('❌ Keine Würfe gefunden', file=sys.stderr)
+        return 1
+    return 0
+
+
+def plot(args):
+    """Standard-Plot eines Wurfs als PNG (über den Render-Cache)."""
+    from render_cache import RenderCache
+    from rendering import render_throw_cached
+    from trajectory_io import load_trajectory
+
+    trajectory = load_trajectory(args.input, throw=args.throw)
+    output = args.output or f"{os.path.splitext(os.path.basename(args.input))[0]}_{args.throw}.png"
+    title = f"{os.path.basename(args.input)} #{args.throw}"
+    cached = render_throw_cached(output, trajectory, strategy=args.strategy, title=title,
+                                 cache=RenderCache(args.cache), dpi=args.dpi)
+    print(f"✅ Visualisierung gespeichert: {output}{' (aus Cache)' if cached else ''}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='hammertrack', description='HammerTrack Offline-Analyse')
+    commands = parser.add_subparsers(dest='command', metavar='BEFEHL', required=True)
+
+    parser_analyze = commands.add_parser('analyze', help='Text-Zusammenfassung (schnell, ohne Plot-Bibliotheken)')
+    parser_analyze.add_argument('inputs', nargs='*',
+                                help="Archiv, CSV-Dateien, Xcode-Logs, Verzeichnisse oder '-' (Standard: Beispielwurf)")
+    parser_analyze.add_argument('--throw', type=int, default=None, help='Nur diesen Wurf pro Datei')
+    parser_analyze.add_argument('--strategy', default=STRATEGY, help='Ellipsen-Strategie (siehe ellipses.py)')
+    parser_analyze.add_argument('--min-distance', type=float, default=None, help='Standard: wie HammerTracker (0.08)')
+    parser_analyze.add_argument('--min-frames', type=int, default=None, help='Standard: wie HammerTracker (5)')
+    parser_analyze.set_defaults(run=analyze)
+
+    parser_plot = commands.add_parser('plot', help='Standard-Plot eines Wurfs als PNG (matplotlib)')
+    parser_plot.add_argument('input', help="CSV-Datei, Xcode-Log, .htarch-Archiv oder '-' (stdin)")
+    parser_plot.add_argument('--throw', type=int, default=0, help='Wurf-Nummer')
+    parser_plot.add_argument('-o', '--output', default=None, help='Ziel-PNG (Standard: <name>_<wurf>.png)')
+    parser_plot.add_argument('--strategy', default=STRATEGY, help='Ellipsen-Strategie (siehe ellipses.py)')
+    parser_plot.add_argument('--dpi', type=int, default=100)
+    parser_plot.add_argument('--cache', default=None, help='Render-Cache-Verzeichnis (Standard: siehe render_cache.py)')
+    parser_plot.set_defaults(run=plot)
+
+    for name, (_, help_text) in DELEGATED.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def run_delegated(name, argv):
+    """Ruft main(argv) des zugehörigen Skripts auf - erst hier wird es importiert."""
+    module_name = DELEGATED[name][0]
+    if module_name == 'generate_app_icons':
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return importlib.import_module(module_name).main(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in DELEGATED:
+        return run_delegated(argv[0], argv[1:])
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
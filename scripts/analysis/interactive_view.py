@@ -2,11 +2,102 @@
 """
 Interaktives, zoombares Koordinatensystem für HammerTrack-Analyse
 Zeigt ALLE detektierten Punkte und Umkehrpunkte
+
+Lange Sessions (viele tausend Würfe):
+- WebGL (Scattergl) statt SVG, automatisch ab WEBGL_POINTS Punkten
+- Alle Umkehrpunkte in EINEM Trace
+- Level of Detail: höchstens --max-points Punkte pro Ansicht (LTTB oder
+  min/max), Umkehrpunkte bleiben immer erhalten; beim Zoomen wird der
+  sichtbare Ausschnitt im Browser aus allen Punkten neu ausgedünnt
+
+Verwendung:
+    python interactive_view.py [wurf.csv | log | saison.htarch] [wurf-nummer]
+    python interactive_view.py session.csv --webgl --max-points 20000 --lod lttb
 """
 
-import plotly.graph_objects as go
+import argparse
+import base64
+import json
+import sys
+
 import numpy as np
 
+from downsampling import METHODS, downsample
+from trajectory_io import load_trajectory, parse_trajectory
+from turning_points import detect_turning_points, turning_point_types
+
+OUTPUT_PATH = '/Users/merlinhummel/Documents/HammerTrack/interactive_analysis.html'
+WEBGL_POINTS = 10_000  # ab hier Scattergl
+MAX_POINTS = 50_000    # Punkte-Budget pro Ansicht
+
+# Nachladen beim Zoomen: sichtbare Punkte (plus Nachbarn) per min/max
+# ausdünnen - dieselbe Logik wie downsampling.minmax_indices
+ZOOM_SCRIPT = """
+(function () {
+    var gd = document.getElementById('{plot_id}');
+    function decode(b64, Type) {
+        var raw = atob(b64), bytes = new Uint8Array(raw.length);
+        for (var i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+        return new Type(bytes.buffer);
+    }
+    var data = %(data)s;
+    var x = decode(data.x, Float32Array), y = decode(data.y, Float32Array);
+    var frames = decode(data.frames, Int32Array), keep = decode(data.keep, Int32Array);
+    var n = x.length, budget = data.budget;
+
+    function resample(x0, x1, y0, y1) {
+        // Sichtbare Punkte plus ihre Nachbarn (damit Linien aus dem Bild heraus erhalten bleiben)
+        var inside = new Uint8Array(n + 2), visible = [];
+        for (var i = 0; i < n; i++) inside[i + 1] = x[i] >= x0 && x[i] <= x1 && y[i] >= y0 && y[i] <= y1;
+        for (var i = 0; i < n; i++) if (inside[i] || inside[i + 1] || inside[i + 2]) visible.push(i);
+        var selected = new Set();
+        if (visible.length <= budget) {
+            visible.forEach(function (i) { selected.add(i); });
+        } else {
+            var buckets = Math.max(Math.floor(budget / 4), 1), size = Math.ceil(visible.length / buckets);
+            for (var b = 0; b < visible.length; b += size) {
+                var lx = visible[b], hx = lx, ly = lx, hy = lx;
+                for (var j = b; j < Math.min(b + size, visible.length); j++) {
+                    var k = visible[j];
+                    if (x[k] < x[lx]) lx = k; if (x[k] > x[hx]) hx = k;
+                    if (y[k] < y[ly]) ly = k; if (y[k] > y[hy]) hy = k;
+                }
+                [lx, hx, ly, hy].forEach(function (k) { selected.add(k); });
+            }
+        }
+        keep.forEach(function (k) { selected.add(k); });
+        var index = Array.from(selected).sort(function (a, b) { return a - b; });
+        return {
+            x: [index.map(function (k) { return x[k]; })],
+            y: [index.map(function (k) { return y[k]; })],
+            customdata: [index.map(function (k) { return frames[k]; })]
+        };
+    }
+
+    gd.on('plotly_relayout', function () {
+        var xr = gd.layout.xaxis.range, yr = gd.layout.yaxis.range;
+        Plotly.restyle(gd, resample(Math.min.apply(null, xr), Math.max.apply(null, xr),
+                                    Math.min.apply(null, yr), Math.max.apply(null, yr)), [0]);
+    });
+})();
+"""
+
+
+def zoom_resample_script(x, y, frames, keep, budget):
+    """JavaScript für write_html(post_script=...) mit allen Punkten als Base64-Arrays."""
+    def encode(values, dtype):
+        return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+    data = {
+        'x': encode(x, '<f4'),
+        'y': encode(y, '<f4'),
+        'frames': encode(frames, '<i4'),
+        'keep': encode(np.asarray(keep, dtype=np.int32), '<i4'),
+        'budget': int(budget),
+    }
+    return ZOOM_SCRIPT % {'data': json.dumps(data)}
+
+
 # === DATEN AUS DEM LOG ===
 csv_data = """Frame,X,Y
 0,0.782227,0.399475
@@ -122,124 +213,171 @@ csv_data = """Frame,X,Y
 133,0.050018,0.478851
 134,0.005936,0.578964"""
 
-# Umkehrpunkte aus dem Log
-turning_points = [
-    {"frame": 0, "x": 0.782, "y": 0.399, "type": "START"},
-    {"frame": 16, "x": 0.242, "y": 0.648, "type": "MINIMUM"},
-    {"frame": 32, "x": 0.914, "y": 0.393, "type": "MAXIMUM"},
-    {"frame": 47, "x": 0.313, "y": 0.650, "type": "MINIMUM"},
-    {"frame": 62, "x": 0.237, "y": 0.517, "type": "MAXIMUM"},
-    {"frame": 78, "x": 0.067, "y": 0.597, "type": "MINIMUM"},
-    {"frame": 96, "x": 0.977, "y": 0.546, "type": "MAXIMUM"},
-]
-
-# === CSV PARSEN ===
-lines = csv_data.strip().split('\n')[1:]
-data_points = []
-
-for line in lines:
-    parts = line.split(',')
-    frame = int(parts[0])
-    x = float(parts[1])
-    y = float(parts[2])
-    data_points.append({'frame': frame, 'x': x, 'y': y})
-
-# Nach Frame sortieren
-data_points.sort(key=lambda p: p['frame'])
-
-# Extrahiere Arrays
-frames = [p['frame'] for p in data_points]
-x_coords = [p['x'] for p in data_points]
-y_coords = [1 - p['y'] for p in data_points]  # Y-Flip
-
-print(f"📊 {len(data_points)} Punkte geladen")
-
-# === PLOTLY INTERAKTIVES DIAGRAMM ===
-fig = go.Figure()
-
-# Alle Punkte als Linie
-fig.add_trace(go.Scatter(
-    x=x_coords,
-    y=y_coords,
-    mode='lines+markers',
-    name='Trajektorie',
-    line=dict(color='lightgray', width=2),
-    marker=dict(size=6, color='lightblue', line=dict(width=1, color='gray')),
-    text=[f"Frame {f}" for f in frames],
-    hovertemplate='<b>Frame %{text}</b><br>X: %{x:.3f}<br>Y: %{y:.3f}<extra></extra>'
-))
-
-# Umkehrpunkte
-tp_colors = {'START': 'gold', 'MINIMUM': 'cyan', 'MAXIMUM': 'magenta'}
-tp_symbols = {'START': 'circle', 'MINIMUM': 'triangle-down', 'MAXIMUM': 'triangle-up'}
-
-for i, tp in enumerate(turning_points):
-    fig.add_trace(go.Scatter(
-        x=[tp['x']],
-        y=[1 - tp['y']],
+
+def detected_turning_points(trajectory):
+    """Umkehrpunkte direkt aus der geladenen Trajektorie (mit Zeilen-Index für das Level of Detail)."""
+    tp_index, tp_is_maximum = detect_turning_points(trajectory.x, trajectory.y)
+    return [
+        {"frame": int(trajectory.frames[i]), "x": float(trajectory.x[i]), "y": float(trajectory.y[i]),
+         "type": tp_type, "index": int(i)}
+        for i, tp_type in zip(tp_index.tolist(), turning_point_types(tp_is_maximum))
+    ]
+
+
+def build_figure(trajectory, turning_points, shown=slice(None), webgl=False):
+    """Plotly-Figure als Dict, bereit für pio.write_html(..., validate=False).
+
+    Args:
+        shown: Indizes (oder Slice) der angezeigten Bahn-Punkte
+        webgl: Scattergl statt Scatter
+    """
+    import plotly.graph_objects as go
+
+    # Arrays (Y-Flip)
+    frames = trajectory.frames
+    x_coords = trajectory.x
+    y_coords = 1 - trajectory.y
+    Scatter = go.Scattergl if webgl else go.Scatter
+
+    # === PLOTLY INTERAKTIVES DIAGRAMM ===
+    fig = go.Figure()
+
+    # Alle Punkte als Linie
+    fig.add_trace(Scatter(
+        x=x_coords[shown],
+        y=y_coords[shown],
+        mode='lines+markers',
+        name='Trajektorie',
+        line=dict(color='lightgray', width=2),
+        marker=dict(size=6, color='lightblue', line=dict(width=1, color='gray')),
+        customdata=frames[shown],
+        hovertemplate='<b>Frame %{customdata}</b><br>X: %{x:.3f}<br>Y: %{y:.3f}<extra></extra>'
+    ))
+
+    # Umkehrpunkte - EIN Trace für alle (Farbe/Symbol als Zahlencodes: schnell auch bei 100k Punkten)
+    tp_kinds = ['START', 'MAXIMUM', 'MINIMUM']
+    tp_colors = ['gold', 'magenta', 'cyan']
+    tp_symbols = np.array([0, 5, 6])  # circle, triangle-up, triangle-down
+    tp_kind = np.array([tp_kinds.index(tp['type']) for tp in turning_points], dtype=np.int8)
+    tp_frames = np.array([tp['frame'] for tp in turning_points])
+
+    fig.add_trace(Scatter(
+        x=np.array([tp['x'] for tp in turning_points]),
+        y=1 - np.array([tp['y'] for tp in turning_points]),
         mode='markers',
-        name=f"TP{i} ({tp['type']})",
+        name=f"Umkehrpunkte ({len(turning_points)})",
         marker=dict(
             size=20,
-            color=tp_colors[tp['type']],
-            symbol=tp_symbols[tp['type']],
+            color=tp_kind,
+            colorscale=[[0.0, tp_colors[0]], [0.5, tp_colors[1]], [1.0, tp_colors[2]]],
+            cmin=0,
+            cmax=2,
             line=dict(width=2, color='black')
         ),
-        text=f"TP{i}<br>Frame {tp['frame']}<br>{tp['type']}",
-        hovertemplate='<b>%{text}</b><br>X: %{x:.3f}<br>Y: %{y:.3f}<extra></extra>'
+        customdata=np.column_stack((np.arange(len(turning_points)), tp_frames, tp_kind)),
+        text=np.array(tp_kinds)[tp_kind],
+        hovertemplate='<b>TP%{customdata[0]}<br>Frame %{customdata[1]}<br>%{text}</b>'
+                      '<br>X: %{x:.3f}<br>Y: %{y:.3f}<extra></extra>'
     ))
 
-# Layout
-fig.update_layout(
-    title={
-        'text': 'HammerTrack: Interaktive Analyse<br><sub>Zoomen: Mausrad | Verschieben: Linke Maustaste | Zurücksetzen: Doppelklick</sub>',
-        'x': 0.5,
-        'xanchor': 'center',
-        'font': {'size': 18}
-    },
-    xaxis_title='X-Position (normalisiert)',
-    yaxis_title='Y-Position (normalisiert, geflippt)',
-    xaxis=dict(
-        range=[-0.05, 1.05],
-        constrain='domain',
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='lightgray'
-    ),
-    yaxis=dict(
-        range=[-0.05, 1.05],
-        scaleanchor='x',
-        scaleratio=1,
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='lightgray'
-    ),
-    width=1400,
-    height=1000,
-    hovermode='closest',
-    legend=dict(
-        yanchor='top',
-        y=0.99,
-        xanchor='right',
-        x=0.99,
-        bgcolor='rgba(255,255,255,0.9)',
-        bordercolor='black',
-        borderwidth=1
-    ),
-    plot_bgcolor='white'
-)
-
-# Speichern als HTML
-output_path = '/Users/merlinhummel/Documents/HammerTrack/interactive_analysis.html'
-fig.write_html(output_path)
-
-print(f"✅ Interaktive Visualisierung gespeichert: {output_path}")
-print(f"📍 {len(turning_points)} Umkehrpunkte markiert")
-print("\n🔍 ANLEITUNG:")
-print("   • Öffne die HTML-Datei im Browser")
-print("   • Mausrad: Zoomen")
-print("   • Linke Maustaste + Ziehen: Verschieben")
-print("   • Doppelklick: Zurücksetzen")
-print("   • Hover über Punkte: Details anzeigen")
-print("\n💬 Bitte erkläre mir nun anhand dieser Visualisierung,")
-print("   wie genau die Ellipsen gebildet werden sollen!")
+    # Layout
+    fig.update_layout(
+        title={
+            'text': 'HammerTrack: Interaktive Analyse<br><sub>Zoomen: Mausrad | Verschieben: Linke Maustaste | Zurücksetzen: Doppelklick</sub>',
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 18}
+        },
+        xaxis_title='X-Position (normalisiert)',
+        yaxis_title='Y-Position (normalisiert, geflippt)',
+        xaxis=dict(
+            range=[-0.05, 1.05],
+            constrain='domain',
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='lightgray'
+        ),
+        yaxis=dict(
+            range=[-0.05, 1.05],
+            scaleanchor='x',
+            scaleratio=1,
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='lightgray'
+        ),
+        width=1400,
+        height=1000,
+        hovermode='closest',
+        legend=dict(
+            yanchor='top',
+            y=0.99,
+            xanchor='right',
+            x=0.99,
+            bgcolor='rgba(255,255,255,0.9)',
+            bordercolor='black',
+            borderwidth=1
+        ),
+        plot_bgcolor='white'
+    )
+
+    # Symbol pro Umkehrpunkt erst im Figure-Dict setzen: plotly prüft Symbol-Arrays Element für
+    # Element (Sekunden bei 100k Umkehrpunkten), die Zahlencodes sind hier immer gültig
+    figure = fig.to_dict()
+    figure['data'][1]['marker']['symbol'] = tp_symbols[tp_kind]
+    return figure
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Interaktive HammerTrack-Ansicht (HTML)')
+    parser.add_argument('input', nargs='?', help="CSV-Datei, Xcode-Log, .htarch-Archiv oder '-' (stdin)")
+    parser.add_argument('throw', nargs='?', default='0', help='Wurf-Nummer (oder Name im Archiv)')
+    parser.add_argument('--webgl', action=argparse.BooleanOptionalAction, default=None,
+                        help=f'WebGL (Scattergl) - Standard: ab {WEBGL_POINTS} Punkten')
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS,
+                        help='Punkte-Budget pro Ansicht (Level of Detail, 0 = alle)')
+    parser.add_argument('--lod', choices=METHODS, default='minmax', help='Downsampling-Verfahren')
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH, help='Ziel-HTML')
+    args = parser.parse_args(argv)
+
+    # Datei, Xcode-Log, .htarch-Archiv oder '-' (stdin) als Argument - sonst die eingebetteten Daten
+    if args.input:
+        throw = int(args.throw) if args.throw.isdigit() else args.throw
+        trajectory = load_trajectory(args.input, throw=throw)
+    else:
+        trajectory = parse_trajectory(csv_data)
+    tps = detected_turning_points(trajectory)
+
+    print(f"📊 {len(trajectory)} Punkte geladen")
+
+    webgl = args.webgl if args.webgl is not None else len(trajectory) >= WEBGL_POINTS
+
+    # Level of Detail: Umkehrpunkte bleiben immer in der Bahn
+    x_coords, y_coords = trajectory.x, 1 - trajectory.y
+    keep = [tp['index'] for tp in tps]
+    lod = 0 < args.max_points < len(trajectory)
+    shown = downsample(x_coords, y_coords, args.max_points, args.lod, keep=keep) if lod else slice(None)
+    if lod:
+        print(f"🔬 {len(shown)} von {len(trajectory)} Punkten angezeigt ({args.lod}, Nachladen beim Zoomen)")
+
+    # Speichern als HTML - bei Level of Detail mit allen Punkten für das Nachladen beim Zoomen
+    import plotly.io as pio
+
+    pio.write_html(build_figure(trajectory, tps, shown, webgl), args.output, validate=False,
+                   post_script=zoom_resample_script(x_coords, y_coords, trajectory.frames, keep, args.max_points)
+                   if lod else None)
+
+    print(f"✅ Interaktive Visualisierung gespeichert: {args.output}")
+    print(f"📍 {len(tps)} Umkehrpunkte markiert")
+    print("\n🔍 ANLEITUNG:")
+    print("   • Öffne die HTML-Datei im Browser")
+    print("   • Mausrad: Zoomen")
+    print("   • Linke Maustaste + Ziehen: Verschieben")
+    print("   • Doppelklick: Zurücksetzen")
+    print("   • Hover über Punkte: Details anzeigen")
+    print("\n💬 Bitte erkläre mir nun anhand dieser Visualisierung,")
+    print("   wie genau die Ellipsen gebildet werden sollen!")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Kalman-Filter für die Hammer-Position
+=====================================
+Fehlende Detektionen verschwinden bisher einfach aus trackedFrames - die
+Richtungswechsel-Logik sieht dann Sprünge statt der Bewegung dazwischen.
+Hier schätzt ein Kalman-Filter mit konstanter Beschleunigung (Zustand
+Position, Geschwindigkeit, Beschleunigung je Achse, Zeiteinheit 1 Frame)
+die Position auch für Frames ohne Detektion.
+
+- Messrauschen pro Detektion: measurement_noise² / confidence - unsichere
+  Detektionen ziehen die Schätzung weniger
+- X und Y haben dasselbe Modell und dieselbe Messgenauigkeit, teilen sich
+  also die Kovarianz (3 × 3 statt 6 × 6)
+- Offline (kalman_filter, bridge_gaps): viele Würfe gleichzeitig als
+  (Würfe × Frames)-Arrays, Schleife nur über die Frames; mit `smooth`
+  zusätzlich Rauch-Tung-Striebel-Glättung rückwärts (nutzt auch die
+  Detektionen nach einer Lücke)
+- Live (KalmanTracker): ein Schritt pro Detektion, predict() für beliebige
+  Frames - in video_tracking.py platziert er das Detektions-Fenster (--roi);
+  die Schrittweite (AdaptiveStride) nutzt ihn nicht
+
+Verwendung:
+    from kalman import KalmanTracker, bridge_gaps
+    filled, interpolated = bridge_gaps(trajectory, max_gap=8)
+    python kalman.py wurf.csv --max-gap 8 -o ueberbrueckt.csv
+"""
+
+import argparse
+import math
+import sys
+from dataclasses import replace
+
+import numpy as np
+
+from trajectory_io import load_trajectory, write_trajectory_csv
+
+PROCESS_NOISE = 1e-4        # Varianz der Beschleunigungs-Änderung pro Frame (weißer Ruck)
+MEASUREMENT_NOISE = 0.005   # Standardabweichung einer Detektion bei confidence 1 (normalisiert)
+INITIAL_VELOCITY = 0.05     # Start-Unsicherheit der Geschwindigkeit pro Frame ...
+INITIAL_ACCELERATION = 0.01  # ... und der Beschleunigung
+MIN_CONFIDENCE = 0.05       # Untergrenze beim Gewichten (confidence 0 → unendliches Rauschen)
+BATCH_THROWS = 1024         # Würfe pro Block (begrenzt den Speicher der Glättung)
+
+
+def transition(frames):
+    """Zustandsübergang über `frames` Frames (auch negativ: zurückrechnen)."""
+    k = float(frames)
+    return np.array([[1.0, k, k * k / 2], [0.0, 1.0, k], [0.0, 0.0, 1.0]])
+
+
+def process_noise(frames, density=PROCESS_NOISE):
+    """Prozessrauschen für weißen Ruck über |frames| Frames."""
+    k = abs(float(frames))
+    return density * np.array([[k ** 5 / 20, k ** 4 / 8, k ** 3 / 6],
+                               [k ** 4 / 8, k ** 3 / 3, k ** 2 / 2],
+                               [k ** 3 / 6, k ** 2 / 2, k]])
+
+
+def initial_covariance(measurement_noise=MEASUREMENT_NOISE):
+    return np.diag([measurement_noise ** 2, INITIAL_VELOCITY ** 2, INITIAL_ACCELERATION ** 2])
+
+
+class KalmanTracker:
+    """Ein Filter Schritt für Schritt, z.B. live neben dem Detektor.
+
+    update() nimmt Detektionen in aufsteigender Frame-Reihenfolge; Lücken
+    dazwischen werden in einem Schritt überbrückt. predict() rechnet vom
+    letzten Stand zu einem beliebigen Frame, ohne ihn zu verändern.
+    """
+
+    def __init__(self, process_noise=PROCESS_NOISE, measurement_noise=MEASUREMENT_NOISE):
+        self.density = process_noise
+        self.measurement_noise = measurement_noise
+        self.frame = None
+        self.updates = 0
+        self.state = np.zeros((2, 3))   # je Achse: Position, Geschwindigkeit, Beschleunigung
+        self.covariance = initial_covariance(measurement_noise)
+
+    def predict(self, frame):
+        """(x, y, Standardabweichung der Position) bei `frame` oder None vor der ersten Detektion."""
+        if self.frame is None:
+            return None
+        gap = frame - self.frame
+        state, covariance = self._propagate(gap)
+        return state[0, 0], state[1, 0], math.sqrt(max(covariance[0, 0], 0.0))
+
+    def update(self, frame, x, y, confidence=1.0):
+        """Detektion einarbeiten. Returns gefilterte (x, y)."""
+        if self.frame is None:
+            self.state[:, 0] = (x, y)
+        else:
+            if frame < self.frame:
+                raise ValueError(f"Frame {frame} liegt vor dem letzten ({self.frame})")
+            self.state, self.covariance = self._propagate(frame - self.frame)
+            noise = self.measurement_noise ** 2 / max(confidence, MIN_CONFIDENCE)
+            gain = self.covariance[:, 0] / (self.covariance[0, 0] + noise)
+            self.state += np.outer((x, y) - self.state[:, 0], gain)
+            self.covariance -= np.outer(gain, self.covariance[0])
+        self.frame = frame
+        self.updates += 1
+        return self.state[0, 0], self.state[1, 0]
+
+    @property
+    def velocity(self):
+        """(vx, vy) pro Frame beim letzten Stand."""
+        return self.state[0, 1], self.state[1, 1]
+
+    def _propagate(self, gap):
+        move = transition(gap)
+        return self.state @ move.T, move @ self.covariance @ move.T + process_noise(gap, self.density)
+
+
+def kalman_filter(trajectory, offsets=None, smooth=True, process_noise=PROCESS_NOISE,
+                  measurement_noise=MEASUREMENT_NOISE, batch_throws=BATCH_THROWS):
+    """Filtert Würfe auf dem lückenlosen Frame-Raster erster → letzter Frame.
+
+    Doppelte Frames werden auf das erste Sample reduziert. Ohne
+    confidence-Spalte zählt jede Detektion gleich (1.0).
+
+    Args:
+        offsets: Wurf i liegt in [offsets[i], offsets[i+1]) (wie im Archiv)
+        smooth: Rauch-Tung-Striebel-Glättung rückwärts (offline), sonst nur
+            der vorwärts laufende Filter (wie live)
+
+    Returns:
+        (Trajektorie auf dem Raster mit geschätzten x/y, interpolated-Maske,
+        offsets der Würfe auf dem Raster)
+    """
+    offsets = np.array([0, len(trajectory)]) if offsets is None else np.asarray(offsets, dtype=np.intp)
+    throws = [_grid_throw(trajectory, start, end) for start, end in zip(offsets[:-1], offsets[1:])]
+    estimates = []
+    for first in range(0, len(throws), batch_throws):
+        block = throws[first:first + batch_throws]
+        estimates.extend(_filter_batch(block, smooth, process_noise, measurement_noise))
+
+    sizes = [len(grid) for grid, *_ in throws]
+    grid_offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+    if not throws:
+        return replace(trajectory, frames=trajectory.frames[:0]), np.zeros(0, dtype=bool), grid_offsets
+    columns = {
+        'frames': np.concatenate([grid for grid, *_ in throws]).astype(np.int32),
+        'x': np.concatenate([xy[0] for xy in estimates]),
+        'y': np.concatenate([xy[1] for xy in estimates]),
+    }
+    interpolated = np.concatenate([~observed for _, _, observed, _ in throws])
+    for name in ('confidence', 'timestamp'):
+        if getattr(trajectory, name) is not None:
+            columns[name] = np.concatenate([
+                np.interp(grid, grid[observed], getattr(trajectory, name)[index])
+                for grid, _, observed, index in throws])
+    if trajectory.torso_angle is not None:
+        torso = []
+        for grid, _, observed, index in throws:
+            values = np.full(len(grid), np.nan)
+            values[observed] = trajectory.torso_angle[index]
+            torso.append(values)
+        columns['torso_angle'] = np.concatenate(torso)
+    return replace(trajectory, **columns), interpolated, grid_offsets
+
+
+def bridge_gaps(trajectory, offsets=None, max_gap=None, **options):
+    """Wie kalman_filter, aber Detektionen bleiben unverändert - nur Lücken werden gefüllt.
+
+    Lücken mit mehr als `max_gap` fehlenden Frames bleiben Lücken (z.B.
+    Hammer außerhalb des Bildes).
+
+    Returns:
+        (Trajektorie, interpolated-Maske) bzw. mit `offsets` zusätzlich die
+        neuen offsets
+    """
+    estimated, interpolated, grid_offsets = kalman_filter(trajectory, offsets, **options)
+    x = estimated.x.copy()
+    y = estimated.y.copy()
+    detected = ~interpolated
+    x[detected], y[detected] = _unique_columns(trajectory, offsets)
+    keep = np.ones(len(x), dtype=bool)
+    if max_gap is not None:
+        # Lückenlänge pro geschätztem Frame: Abstand zwischen den umgebenden Detektionen
+        index = np.arange(len(x))
+        before = np.maximum.accumulate(np.where(detected, index, -1))
+        after = np.minimum.accumulate(np.where(detected, index, len(x))[::-1])[::-1]
+        keep = detected | ((after - before - 1) <= max_gap)
+    throw = np.repeat(np.arange(len(grid_offsets) - 1), np.diff(grid_offsets))
+    columns = {name: getattr(estimated, name)[keep] for name in
+               ('frames', 'confidence', 'timestamp', 'torso_angle') if getattr(estimated, name) is not None}
+    result = replace(estimated, x=x[keep], y=y[keep], **columns)
+    if offsets is None:
+        return result, interpolated[keep]
+    sizes = np.bincount(throw[keep], minlength=len(grid_offsets) - 1)
+    return result, interpolated[keep], np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+
+
+def _grid_throw(trajectory, start, end):
+    """(Raster-Frames, Messungen (2, n), observed-Maske, Index der Messungen in der Trajektorie)."""
+    frames, first = np.unique(trajectory.frames[start:end], return_index=True)
+    index = start + first
+    if not len(frames):
+        return np.empty(0, dtype=np.int64), np.empty((3, 0)), np.zeros(0, dtype=bool), index
+    grid = np.arange(frames[0], frames[-1] + 1)
+    observed = np.zeros(len(grid), dtype=bool)
+    observed[frames - frames[0]] = True
+    confidence = np.ones(len(frames)) if trajectory.confidence is None else trajectory.confidence[index]
+    measurements = np.full((3, len(grid)), np.nan)
+    measurements[:, frames - frames[0]] = (trajectory.x[index], trajectory.y[index], confidence)
+    return grid, measurements, observed, index
+
+
+def _unique_columns(trajectory, offsets):
+    offsets = np.array([0, len(trajectory)]) if offsets is None else np.asarray(offsets, dtype=np.intp)
+    index = np.concatenate([start + np.unique(trajectory.frames[start:end], return_index=True)[1]
+                            for start, end in zip(offsets[:-1], offsets[1:])] or [np.empty(0, dtype=np.intp)])
+    return trajectory.x[index], trajectory.y[index]
+
+
+def _filter_batch(throws, smooth, density, measurement_noise):
+    """Vorwärts-Filter (+ RTS) für einen Block Würfe, gepolstert auf die längste Dauer."""
+    count = len(throws)
+    length = max((len(grid) for grid, *_ in throws), default=0)
+    if not length:
+        return [np.empty((2, 0)) for _ in throws]
+    measured = np.full((count, 3, length), np.nan)
+    for row, (grid, measurements, _, _) in enumerate(throws):
+        measured[row, :, :len(grid)] = measurements
+    observed = ~np.isnan(measured[:, 0])                      # (Würfe, Frames)
+    noise = measurement_noise ** 2 / np.maximum(np.nan_to_num(measured[:, 2]), MIN_CONFIDENCE)
+
+    move = transition(1)
+    added = process_noise(1, density)
+    state = np.zeros((count, 2, 3))
+    state[:, :, 0] = measured[:, :2, 0]
+    covariance = np.broadcast_to(initial_covariance(measurement_noise), (count, 3, 3)).copy()
+    filtered = np.empty((length, count, 2, 3))
+    filtered_cov = np.empty((length, count, 3, 3))
+    predicted = np.empty_like(filtered)
+    predicted_cov = np.empty_like(filtered_cov)
+    filtered[0], filtered_cov[0] = state, covariance
+    predicted[0], predicted_cov[0] = state, covariance
+
+    for t in range(1, length):
+        state = state @ move.T
+        covariance = move @ covariance @ move.T + added
+        predicted[t], predicted_cov[t] = state, covariance
+        hit = observed[:, t]
+        if hit.any():
+            gain = covariance[:, :, 0] / (covariance[:, 0, 0] + noise[:, t])[:, None]   # (Würfe, 3)
+            innovation = np.where(hit[:, None], measured[:, :2, t] - state[:, :, 0], 0.0)
+            state = state + innovation[:, :, None] * gain[:, None, :]
+            correction = gain[:, :, None] * covariance[:, None, 0, :]
+            covariance = covariance - np.where(hit[:, None, None], correction, 0.0)
+        filtered[t], filtered_cov[t] = state, covariance
+
+    if smooth:
+        for t in range(length - 2, -1, -1):
+            # C = P_f[t] Fᵀ P_p[t+1]⁻¹ (P symmetrisch → lösen statt invertieren)
+            cross = filtered_cov[t] @ move.T
+            gain = np.linalg.solve(predicted_cov[t + 1], cross.transpose(0, 2, 1)).transpose(0, 2, 1)
+            filtered[t] += (filtered[t + 1] - predicted[t + 1]) @ gain.transpose(0, 2, 1)
+            filtered_cov[t] += gain @ (filtered_cov[t + 1] - predicted_cov[t + 1]) @ gain.transpose(0, 2, 1)
+
+    positions = filtered[:, :, :, 0].transpose(1, 2, 0)      # (Würfe, 2, Frames)
+    return [positions[row, :, :len(grid)] for row, (grid, *_) in enumerate(throws)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detektions-Lücken mit einem Kalman-Filter überbrücken')
+    parser.add_argument('input', help='CSV-Datei, Xcode-Log, Archiv oder - (stdin)')
+    parser.add_argument('--throw', type=int, default=0, help='Wurf-Nummer')
+    parser.add_argument('--max-gap', type=int, default=None, help='Längere Lücken nicht füllen')
+    parser.add_argument('--filter', action='store_true', help='Alle Positionen filtern statt nur Lücken füllen')
+    parser.add_argument('--forward', action='store_true', help='Nur vorwärts filtern (wie live), ohne Glättung')
+    parser.add_argument('--process-noise', type=float, default=PROCESS_NOISE)
+    parser.add_argument('--measurement-noise', type=float, default=MEASUREMENT_NOISE)
+    parser.add_argument('-o', '--output', default=None, help='Ergebnis als Frame,X,Y-CSV')
+    args = parser.parse_args(argv)
+
+    trajectory = load_trajectory(args.input, throw=args.throw)
+    if not len(trajectory):
+        print('❌ Keine Punkte gefunden', file=sys.stderr)
+        return 1
+    options = {'smooth': not args.forward, 'process_noise': args.process_noise,
+               'measurement_noise': args.measurement_noise}
+    if args.filter:
+        result, interpolated, _ = kalman_filter(trajectory, **options)
+        moved = np.hypot(result.x[~interpolated] - trajectory.x, result.y[~interpolated] - trajectory.y)
+        detail = f", Detektionen ∅ {moved.mean():.5f} verschoben"
+    else:
+        result, interpolated = bridge_gaps(trajectory, max_gap=args.max_gap, **options)
+        detail = ''
+    print(f"✅ {len(trajectory)} Detektionen → {len(result)} Punkte, {interpolated.sum()} geschätzt{detail}")
+    if args.output:
+        write_trajectory_csv(result, args.output)
+        print(f"💾 Gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Live-Analyse: Umkehrpunkte und Ellipsen Frame für Frame
+=======================================================
+Inkrementelle Variante von HammerTracker.analyzeTrajectory für Live-Sessions
+und das Abspielen langer Trainings-Logs.
+
+- push() nimmt EIN Sample (frame, x, y, confidence, torsoAngle) entgegen
+- Konstanter Aufwand pro Frame - die Historie wird nie erneut durchsucht
+- Gespeichert werden nur: letztes Sample, letzte 3 akzeptierte Umkehrpunkte
+  und ein Ringpuffer fester Größe (für die Frames einer Ellipse)
+- Ein Umkehrpunkt ist bestätigt, sobald der nächste Richtungswechsel in X
+  kommt; der Signifikanz-Filter (minDistance / minFrames) ist kausal und
+  wird sofort angewendet
+- Eine Ellipse ist fertig, sobald ihr 3. Umkehrpunkt akzeptiert ist
+  (wie createEllipsesFromThreePoints: (0,1,2), (2,3,4), ...)
+
+Das Ergebnis ist identisch mit detect_turning_points() auf dem kompletten Array.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from ellipses import ellipse_angle
+from turning_points import MIN_DISTANCE, MIN_FRAMES
+
+CONFIDENCE_THRESHOLD = 0.3  # wie HammerTracker.confidenceThreshold
+BUFFER_SIZE = 512           # Ringpuffer-Größe in Samples
+
+SAMPLE_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('x', np.float64),
+    ('y', np.float64),
+    ('confidence', np.float32),
+    ('torso_angle', np.float64),  # NaN = kein Torso-Winkel
+])
+
+
+@dataclass(frozen=True)
+class TurningPointEvent:
+    number: int          # TP-Nummer nach Filterung (TP0 = START)
+    sample_index: int    # Index im Sample-Strom (wie TurningPoint.frameIndex)
+    frame: int
+    x: float
+    y: float
+    is_maximum: bool
+    is_start: bool
+    torso_angle: float   # NaN = kein Torso-Winkel
+
+
+@dataclass(frozen=True)
+class EllipseEvent:
+    number: int
+    start: TurningPointEvent
+    mid: TurningPointEvent
+    end: TurningPointEvent
+    angle: float                        # Winkel start → mid (wie Swift)
+    torso_angle_at_second_point: float  # NaN = kein Torso-Winkel
+    samples: np.ndarray                 # SAMPLE_DTYPE, start → end; None wenn nicht mehr im Puffer
+
+
+class LiveEllipseDetector:
+    """Streaming-Detektor für Umkehrpunkte und 3-Punkt-Ellipsen."""
+
+    def __init__(self, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES,
+                 min_confidence=CONFIDENCE_THRESHOLD, buffer_size=BUFFER_SIZE):
+        self.min_distance = min_distance
+        self.min_frames = min_frames
+        self.min_confidence = min_confidence
+
+        self._buffer = np.zeros(buffer_size, dtype=SAMPLE_DTYPE)
+        self._recent = deque(maxlen=3)  # letzte akzeptierte Umkehrpunkte
+        self.reset()
+
+    def reset(self):
+        self.sample_count = 0
+        self.turning_point_count = 0
+        self.ellipse_count = 0
+        self._angle_sum = 0.0
+        self._direction = None
+        self._previous = None
+        self._recent.clear()
+
+    @property
+    def last_turning_point(self):
+        """Zuletzt akzeptierter Umkehrpunkt (TurningPointEvent) oder None."""
+        return self._recent[-1] if self._recent else None
+
+    @property
+    def average_angle(self):
+        """Laufender Durchschnittswinkel aller bisherigen Ellipsen."""
+        return self._angle_sum / self.ellipse_count if self.ellipse_count else 0.0
+
+    def push(self, frame, x, y, confidence=1.0, torso_angle=None):
+        """Verarbeitet ein Sample. Gibt die neu bestätigten Events zurück."""
+        if confidence < self.min_confidence:
+            return []  # wie detectHammer: zu unsichere Detektion wird verworfen
+
+        torso = np.nan if torso_angle is None else float(torso_angle)
+        index = self.sample_count
+        self.sample_count += 1
+        self._buffer[index % len(self._buffer)] = (frame, x, y, confidence, torso)
+        current = (index, frame, x, y, torso)
+
+        events = []
+        if index == 0:
+            # Erster erkannter Punkt ist IMMER TP0
+            self._accept(current, is_maximum=False, events=events)
+        else:
+            dx = x - self._previous[2]
+            if dx != 0:  # Nur bei tatsächlicher Bewegung prüfen
+                new_direction = 1 if dx > 0 else -1
+                if self._direction is not None and new_direction != self._direction:
+                    self._consider(self._previous, is_maximum=self._direction > 0, events=events)
+                self._direction = new_direction
+
+        self._previous = current
+        return events
+
+    def replay(self, frames, x, y, confidence=None, torso_angle=None):
+        """Spielt komplette Arrays Sample für Sample ab und liefert alle Events."""
+        n = len(frames)
+        confidence = np.ones(n) if confidence is None else confidence
+        torso_angle = np.full(n, np.nan) if torso_angle is None else torso_angle
+        for sample in zip(np.asarray(frames).tolist(), np.asarray(x).tolist(), np.asarray(y).tolist(),
+                          np.asarray(confidence).tolist(), np.asarray(torso_angle).tolist()):
+            yield from self.push(*sample)
+
+    def _consider(self, candidate, is_maximum, events):
+        """Signifikanz-Filter gegen den zuletzt akzeptierten Umkehrpunkt."""
+        last = self._recent[-1]
+        dx = candidate[2] - last.x
+        dy = candidate[3] - last.y
+        frame_diff = candidate[0] - last.sample_index
+        if frame_diff >= self.min_frames and math.sqrt(dx * dx + dy * dy) >= self.min_distance:
+            self._accept(candidate, is_maximum, events)
+
+    def _accept(self, sample, is_maximum, events):
+        index, frame, x, y, torso = sample
+        tp = TurningPointEvent(
+            number=self.turning_point_count,
+            sample_index=index,
+            frame=frame,
+            x=x,
+            y=y,
+            is_maximum=is_maximum,
+            is_start=self.turning_point_count == 0,
+            torso_angle=torso,
+        )
+        self.turning_point_count += 1
+        self._recent.append(tp)
+        events.append(tp)
+
+        # Ellipse bei TP2, TP4, TP6, ... abschließen
+        if tp.number >= 2 and tp.number % 2 == 0:
+            events.append(self._close_ellipse())
+
+    def _close_ellipse(self):
+        start, mid, end = self._recent
+        angle = float(ellipse_angle(start.x, start.y, mid.x, mid.y))
+
+        self.ellipse_count += 1
+        self._angle_sum += angle
+        return EllipseEvent(
+            number=self.ellipse_count,
+            start=start,
+            mid=mid,
+            end=end,
+            angle=angle,
+            torso_angle_at_second_point=mid.torso_angle,
+            samples=self._span(start.sample_index, end.sample_index),
+        )
+
+    def _span(self, first, last):
+        """Samples first..last aus dem Ringpuffer (Kopie), falls noch vorhanden."""
+        if self.sample_count - first > len(self._buffer):
+            return None
+        return self._buffer.take(np.arange(first, last + 1), mode='wrap')
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Xcode-Log-Scraper für "ALLE DETEKTIERTEN PUNKTE"
+================================================
+Holt jede Analyse, die HammerTracker.analyzeTrajectory ins Geräte-Log
+schreibt, strukturiert aus beliebig großen Logs - ohne Copy & Paste.
+
+- Die Datei wird per mmap gelesen, NIE komplett als Python-String geladen
+- Marker werden mit einer Byte-Suche (mmap.find) lokalisiert
+- Die Datei wird in Byte-Bereiche aufgeteilt, jeder Prozess scannt seinen
+  Bereich (ein Block gehört zu dem Bereich, in dem sein Marker beginnt)
+- Kopiert werden nur der Punkte-Block und der kurze Abschnitt davor mit
+  den Umkehrpunkt- und Ellipsen-Zeilen
+
+Pro Analyse-Block:
+- Punkte (Frame,X,Y)
+- Gefilterte Umkehrpunkte ("  TP0: Frame 0, (0.782, 0.399), MIN")
+- Ellipsen-Winkel ("  Ellipse 1: -24.73° ↙ links")
+- Durchschnittlicher Winkel
+
+Verwendung:
+    python log_scraper.py device.log -o wuerfe/
+"""
+
+import argparse
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from trajectory_io import Trajectory, read_block_at, write_trajectory_csv
+
+MARKER = 'ALLE DETEKTIERTEN PUNKTE'.encode('utf-8')
+FILTER_HEADER = 'bedeutende Umkehrpunkte (nach Filterung)'.encode('utf-8')
+MAX_SECTION_BYTES = 1 << 20  # so weit wird vor einem Marker nach TP/Ellipsen-Zeilen gesucht
+MIN_RANGE_BYTES = 64 << 20   # kleinere Dateien werden nicht aufgeteilt
+
+_TP_RE = re.compile(rb'^  TP(\d+): Frame (-?\d+), \(([-0-9.]+), ([-0-9.]+)\), (MAX|MIN)', re.MULTILINE)
+_ELLIPSE_RE = re.compile(rb'^  Ellipse (\d+): ([-0-9.]+)\xc2\xb0', re.MULTILINE)
+_AVERAGE_RE = re.compile(rb'^Durchschnittlicher Winkel: ([-0-9.]+)', re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class LoggedAnalysis:
+    """Eine im Log gefundene Analyse."""
+    offset: int                 # Byte-Offset des Markers im Log
+    trajectory: Trajectory      # ALLE DETEKTIERTEN PUNKTE
+    tp_frames: np.ndarray       # Gefilterte Umkehrpunkte (Video-Framenummer)
+    tp_x: np.ndarray
+    tp_y: np.ndarray
+    tp_is_maximum: np.ndarray
+    ellipse_angles: np.ndarray
+    average_angle: float        # NaN, wenn nicht im Log
+
+
+def scrape_log(path, workers=None):
+    """Alle Analyse-Blöcke eines Logs, nach Offset sortiert."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    count = max(1, min(workers, size // MIN_RANGE_BYTES))
+    bounds = np.linspace(0, size, count + 1, dtype=np.int64).tolist()
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+
+    if count == 1:
+        return scrape_range(path, 0, size)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=count) as pool:
+        for blocks in pool.map(scrape_range, [path] * count, *zip(*ranges)):
+            results.extend(blocks)
+    return results
+
+
+def scrape_range(path, start, stop):
+    """Alle Blöcke, deren Marker im Byte-Bereich [start, stop) beginnt."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        blocks = []
+        pos = mm.find(MARKER, start, stop + len(MARKER) - 1)
+        while 0 <= pos < stop:
+            try:
+                block, end = _read_analysis(mm, pos)
+            except ValueError as error:  # Zahlen-ähnliche, aber kaputte Zeile (z.B. "1,0.2.5,0.3")
+                print(f"⚠️  {path}: Block bei Byte {pos} übersprungen: {error}", file=sys.stderr)
+                block, end = None, pos + len(MARKER)
+            if block is not None:
+                blocks.append(block)
+            pos = mm.find(MARKER, max(end, pos + 1), stop + len(MARKER) - 1)
+        return blocks
+
+
+def _read_analysis(mm, marker):
+    """Liest Punkte-Block nach und Analyse-Zeilen vor dem Marker."""
+    line_end = mm.find(b'\n', marker)
+    if line_end < 0:
+        return None, marker + len(MARKER)
+
+    # Header muss direkt in der nächsten Zeile stehen
+    next_line_end = mm.find(b'\n', line_end + 1)
+    header_before = len(mm) if next_line_end < 0 else next_line_end + 1
+    trajectory, end = read_block_at(mm, line_end + 1, header_before=header_before)
+    if trajectory is None:
+        return None, line_end + 1
+
+    # Abschnitt davor: ab dem letzten Marker bzw. "bedeutende Umkehrpunkte"
+    window_start = max(0, marker - MAX_SECTION_BYTES)
+    section_start = max(window_start, mm.rfind(MARKER, window_start, marker) + 1)
+    filter_header = mm.rfind(FILTER_HEADER, section_start, marker)
+    if filter_header >= 0:
+        section_start = filter_header
+    section = mm[section_start:marker]
+
+    tps = _TP_RE.findall(section)
+    angles = [float(m) for _, m in _ELLIPSE_RE.findall(section)]
+    averages = _AVERAGE_RE.findall(section)
+
+    block = LoggedAnalysis(
+        offset=marker,
+        trajectory=trajectory,
+        tp_frames=np.array([int(tp[1]) for tp in tps], dtype=np.int32),
+        tp_x=np.array([float(tp[2]) for tp in tps], dtype=np.float64),
+        tp_y=np.array([float(tp[3]) for tp in tps], dtype=np.float64),
+        tp_is_maximum=np.array([tp[4] == b'MAX' for tp in tps], dtype=bool),
+        ellipse_angles=np.array(angles, dtype=np.float64),
+        average_angle=float(averages[-1]) if averages else np.nan,
+    )
+    return block, end
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyse-Blöcke aus Xcode-Logs extrahieren')
+    parser.add_argument('logs', nargs='+', help='Geräte-Logs')
+    parser.add_argument('-o', '--output', default=None, help='Verzeichnis für eine CSV pro Block')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Anzahl Prozesse (Standard: alle Kerne)')
+    args = parser.parse_args(argv)
+
+    if args.output:
+        Path(args.output).mkdir(parents=True, exist_ok=True)
+
+    total = 0
+    for log in args.logs:
+        blocks = scrape_log(log, workers=args.workers)
+        print(f"📄 {log}: {len(blocks)} Analyse-Blöcke")
+        for number, block in enumerate(blocks):
+            print(f"   Block {number}: {len(block.trajectory)} Punkte, "
+                  f"{len(block.tp_frames)} Umkehrpunkte, {len(block.ellipse_angles)} Ellipsen, "
+                  f"∅ {block.average_angle:.2f}°")
+            if args.output:
+                write_trajectory_csv(block.trajectory, Path(args.output) / f"{Path(log).stem}_{number:04d}.csv")
+        total += len(blocks)
+
+    print(f"✅ {total} Blöcke gefunden")
+    if args.output:
+        print(f"💾 CSV-Dateien gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
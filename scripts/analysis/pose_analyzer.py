@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+PoseAnalyzer für ganze Sessions
+===============================
+Python-Gegenstück zu PoseAnalyzer.swift: Kniewinkel links/rechts,
+arm-raised-Flag und Gesamt-Konfidenz - aber über Spalten-Arrays für
+tausende Frames auf einmal statt einer Observation nach der anderen.
+
+- Winkel über Skalar- und Kreuzprodukte (pose_angles.joint_angle), alle
+  Frames in einem Durchlauf
+- Die Confidence-Grenze 0.3 pro Joint wirkt als Maske: ungültige
+  Kniewinkel sind NaN (Swift: nil)
+- PoseAnalyzer (Streaming) sammelt Frames wie poseResults - einzeln
+  (process, z.B. beim Abspielen eines Live-Logs) oder blockweise
+  (process_batch) - und liefert dieselben Auswertungen wie
+  getAverageKneeAngles / getMinMaxKneeAngles / formatKneeAngleResults
+- Über viele Dumps: python pose_analyzer.py dumps/ -o saison.csv
+
+Verwendung:
+    from pose_analyzer import analyze_poses, PoseAnalyzer
+    results = analyze_poses(keypoints, frames, timestamps)   # PoseAnalysis (Spalten)
+    analyzer = PoseAnalyzer(); analyzer.process(keypoints[i], i, i / 30)
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from pose_angles import as_keypoints, joint, knee_angle, load_keypoints
+
+MIN_CONFIDENCE = 0.3  # PoseAnalyzer: confidence > 0.3
+# calculateConfidence: Mittel über diese Joints
+CONFIDENCE_JOINTS = ('left_hip', 'left_knee', 'left_ankle', 'right_hip', 'right_knee', 'right_ankle',
+                     'right_wrist', 'right_elbow', 'right_shoulder')
+DUMP_PATTERNS = ('*.npy', '*.npz')
+SUMMARY_HEADER = 'Datei,Frames,Knie links ∅,links min,links max,Knie rechts ∅,rechts min,rechts max,Arm oben,Konfidenz ∅'
+
+
+@dataclass(frozen=True)
+class PoseAnalysisResult:
+    """Ein Frame wie PoseAnalysisResult in PoseAnalyzer.swift (Winkel None = nil)."""
+    frame_number: int
+    timestamp: float
+    left_knee_angle: float = None
+    right_knee_angle: float = None
+    arm_raised: bool = False
+    confidence: float = 0.0
+
+
+@dataclass(frozen=True)
+class PoseAnalysis:
+    """PoseAnalysisResult als Spalten-Arrays, ein Eintrag pro Frame."""
+    frames: np.ndarray          # int64, Frame-Nummer
+    timestamp: np.ndarray       # Sekunden
+    left_knee: np.ndarray       # Grad, NaN = nil
+    right_knee: np.ndarray      # Grad, NaN = nil
+    arm_raised: np.ndarray      # bool
+    confidence: np.ndarray      # float32, wie Float im Swift-Code
+
+    def __len__(self):
+        return len(self.frames)
+
+    def average_knee_angles(self):
+        """(links, rechts) wie getAverageKneeAngles - None ohne gültigen Winkel."""
+        return _reduce(self.left_knee, np.mean), _reduce(self.right_knee, np.mean)
+
+    def min_max_knee_angles(self):
+        """(links min, links max, rechts min, rechts max) wie getMinMaxKneeAngles."""
+        return (_reduce(self.left_knee, np.min), _reduce(self.left_knee, np.max),
+                _reduce(self.right_knee, np.min), _reduce(self.right_knee, np.max))
+
+    def format_knee_angle_results(self):
+        """Text wie formatKneeAngleResults."""
+        left_average, right_average = self.average_knee_angles()
+        left_min, left_max, right_min, right_max = self.min_max_knee_angles()
+        results = 'Kniewinkel-Analyse:\n\n'
+        if left_average is not None:
+            results += 'Linkes Knie:\n'
+            results += f"  Durchschnitt: {left_average:.1f}°\n"
+            results += f"  Bereich: {left_min:.1f}° - {left_max:.1f}°\n\n"
+        if right_average is not None:
+            results += 'Rechtes Knie:\n'
+            results += f"  Durchschnitt: {right_average:.1f}°\n"
+            results += f"  Bereich: {right_min:.1f}° - {right_max:.1f}°\n"
+        if left_average is None and right_average is None:
+            results += 'Keine Kniewinkel erkannt. Stelle sicher, dass die Knie sichtbar sind.'
+        return results
+
+
+def analyze_poses(keypoints, frames=None, timestamps=None, min_confidence=MIN_CONFIDENCE):
+    """processPoseObservation für alle Frames auf einmal.
+
+    Args:
+        keypoints: (Frames × Joints × 3), siehe pose_angles.JOINTS
+        frames / timestamps: Standard 0, 1, 2 … bzw. NaN
+    """
+    keypoints = as_keypoints(keypoints)
+    count = len(keypoints)
+    frames = np.arange(count) if frames is None else np.asarray(frames)
+    timestamps = np.full(count, np.nan) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+
+    wrist, elbow, shoulder = (joint(keypoints, f'right_{name}') for name in ('wrist', 'elbow', 'shoulder'))
+    # checkArmRaised wörtlich: wrist.y < elbow.y < shoulder.y, Gate nur auf dem Handgelenk
+    arm_raised = (wrist[:, 1] < elbow[:, 1]) & (elbow[:, 1] < shoulder[:, 1]) & (wrist[:, 2] > min_confidence)
+    confidence = np.stack([joint(keypoints, name)[:, 2] for name in CONFIDENCE_JOINTS], axis=1)
+
+    return PoseAnalysis(
+        frames=frames.astype(np.int64),
+        timestamp=timestamps,
+        left_knee=knee_angle(keypoints, 'left', min_confidence),
+        right_knee=knee_angle(keypoints, 'right', min_confidence),
+        arm_raised=arm_raised,
+        confidence=confidence.astype(np.float32).mean(axis=1, dtype=np.float32),
+    )
+
+
+class PoseAnalyzer:
+    """Streaming-Variante: sammelt Ergebnisse wie poseResults in PoseAnalyzer.swift.
+
+    process() rechnet einen Frame, process_batch() einen Block - beide über
+    analyze_poses, also mit identischen Ergebnissen. `results` fasst alles
+    bisher Gesammelte als PoseAnalysis zusammen.
+    """
+
+    def __init__(self, min_confidence=MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._blocks = []
+        self._results = None
+
+    def process(self, keypoints, frame_number, timestamp):
+        """Ein Frame (Joints × 3) wie processPoseObservation. Returns PoseAnalysisResult."""
+        block = self.process_batch(np.asarray(keypoints)[None], [frame_number], [timestamp])
+        left, right = (None if np.isnan(value[0]) else float(value[0]) for value in (block.left_knee, block.right_knee))
+        return PoseAnalysisResult(frame_number, timestamp, left, right, bool(block.arm_raised[0]),
+                                  float(block.confidence[0]))
+
+    def process_batch(self, keypoints, frames, timestamps):
+        """Ein Block Frames (Frames × Joints × 3). Returns die PoseAnalysis des Blocks."""
+        block = analyze_poses(keypoints, frames, timestamps, self.min_confidence)
+        self._blocks.append(block)
+        self._results = None
+        return block
+
+    @property
+    def results(self):
+        if self._results is None:
+            if len(self._blocks) == 1:
+                self._results = self._blocks[0]
+            else:
+                self._results = PoseAnalysis(*(
+                    np.concatenate([getattr(block, name) for block in self._blocks]) if self._blocks
+                    else np.empty(0, dtype=dtype)
+                    for name, dtype in (('frames', np.int64), ('timestamp', np.float64), ('left_knee', np.float64),
+                                        ('right_knee', np.float64), ('arm_raised', bool),
+                                        ('confidence', np.float32))))
+                self._blocks = [self._results] if self._blocks else []
+        return self._results
+
+    def average_knee_angles(self):
+        return self.results.average_knee_angles()
+
+    def min_max_knee_angles(self):
+        return self.results.min_max_knee_angles()
+
+    def format_knee_angle_results(self):
+        return self.results.format_knee_angle_results()
+
+    def reset(self):
+        self._blocks = []
+        self._results = None
+
+
+def _reduce(values, function):
+    valid = values[~np.isnan(values)]
+    return float(function(valid)) if len(valid) else None
+
+
+def _summary_row(name, analysis):
+    def cell(value):
+        return '' if value is None else f"{value:.2f}"
+
+    left_average, right_average = analysis.average_knee_angles()
+    left_min, left_max, right_min, right_max = analysis.min_max_knee_angles()
+    values = (left_average, left_min, left_max, right_average, right_min, right_max)
+    return (f"{name},{len(analysis)}," + ','.join(cell(value) for value in values)
+            + f",{int(analysis.arm_raised.sum())},{cell(float(analysis.confidence.mean()) if len(analysis) else None)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PoseAnalyzer über ganze Pose-Dumps (Kniewinkel, Arm, Konfidenz)')
+    parser.add_argument('inputs', nargs='+', help='Pose-Dumps (.npy/.npz) oder Verzeichnisse')
+    parser.add_argument('--fps', type=float, default=30.0, help='Für Zeitstempel: Frame / fps')
+    parser.add_argument('-o', '--output', default=None, help='Eine Zusammenfassungs-Zeile pro Dump als CSV')
+    args = parser.parse_args(argv)
+
+    paths = sorted({path for item in map(Path, args.inputs)
+                    for path in ([p for pattern in DUMP_PATTERNS for p in item.rglob(pattern)]
+                                 if item.is_dir() else [item])})
+    if not paths:
+        print('❌ Keine Pose-Dumps gefunden', file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    rows = []
+    frames_total = 0
+    for path in paths:
+        try:
+            keypoints, frames = load_keypoints(path)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"⚠️  {path.name}: {error}", file=sys.stderr)
+            continue
+        analysis = analyze_poses(keypoints, frames, frames / args.fps)
+        frames_total += len(analysis)
+        rows.append(_summary_row(path.name, analysis))
+        if len(paths) == 1:
+            print(analysis.format_knee_angle_results())
+
+    print(f"✅ {len(rows)} Dumps, {frames_total} Frames in {time.perf_counter() - start:.2f} s")
+    if args.output:
+        Path(args.output).write_text('\n'.join([SUMMARY_HEADER, *rows]) + '\n')
+        print(f"💾 Gespeichert: {args.output}")
+    return 0 if rows else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
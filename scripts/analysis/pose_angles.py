@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Körperwinkel aus Pose-Keypoint-Zeitreihen
+=========================================
+NumPy-Port der Winkel aus LiveView.swift (CameraManager) und
+PoseAnalyzer.swift - für jeden Frame statt nur jeden 10.
+(torsoAngleLogInterval).
+
+Eingabe: Keypoints als (Frames × Joints × 3)-Array mit (x, y, confidence)
+pro Joint, Koordinaten normalisiert wie VNRecognizedPoint.location
+(Ursprung unten links). Joint-Reihenfolge: JOINTS (wie
+VNHumanBodyPoseObservation.JointName); nicht erkannte Joints haben
+confidence 0.
+
+- torso_angle: wie calculateTorsoAngle (root → neck, 0° = aufrecht,
+  positiv = nach vorne gebeugt), nur ab confidence > 0.2
+- upper_arm_angle: wie calculateUpperArmAngle (Schulter → Ellenbogen,
+  0° = hängt, 90° = zur Seite, auf 0-180° geklemmt), nur ab confidence > 0.2
+- knee_angle: Winkel Hüfte-Knie-Knöchel wie PoseAnalyzer.calculateAngle,
+  nur ab confidence > 0.3
+- Ungültige Frames (Confidence zu klein, bei Torso/Oberarm auch Joints
+  aufeinander) sind NaN - Masken statt Verzweigungen, ein Durchlauf über
+  alle Frames
+
+Verwendung:
+    from pose_angles import posture_angles
+    angles = posture_angles(keypoints)          # {'torso': (n,), 'left_knee': (n,), ...}
+    python pose_angles.py pose_dump.npy -o winkel.csv
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+# VNHumanBodyPoseObservation.JointName in dieser Reihenfolge im Dump
+JOINTS = (
+    'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
+    'left_shoulder', 'right_shoulder', 'neck',
+    'left_elbow', 'right_elbow', 'left_wrist', 'right_wrist',
+    'left_hip', 'right_hip', 'root',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle',
+)
+JOINT_INDEX = {name: index for index, name in enumerate(JOINTS)}
+
+MIN_CONFIDENCE = 0.2        # calculateTorsoAngle / calculateUpperArmAngle
+KNEE_MIN_CONFIDENCE = 0.3   # PoseAnalyzer: hip/knee/ankle.confidence > 0.3
+MIN_MOVEMENT = 0.001        # guard dx > 0.001 || dy > 0.001
+ANGLES = ('torso', 'left_upper_arm', 'right_upper_arm', 'left_knee', 'right_knee')
+
+
+def joint(keypoints, name):
+    """(…, 3)-Spalte eines Joints: x, y, confidence."""
+    return keypoints[..., JOINT_INDEX[name], :]
+
+
+def torso_angle(keypoints, min_confidence=MIN_CONFIDENCE):
+    """Oberkörper-Neigung pro Frame wie calculateTorsoAngle (Grad, NaN wenn ungültig)."""
+    root = joint(keypoints, 'root')
+    neck = joint(keypoints, 'neck')
+    dx = neck[..., 0] - root[..., 0]
+    dy = neck[..., 1] - root[..., 1]
+    valid = ((root[..., 2] > min_confidence) & (neck[..., 2] > min_confidence)
+             & ((np.abs(dx) > MIN_MOVEMENT) | (np.abs(dy) > MIN_MOVEMENT)))
+    return np.where(valid, 90.0 - np.degrees(np.arctan2(dx, dy)), np.nan)
+
+
+def upper_arm_angle(keypoints, side='right', min_confidence=MIN_CONFIDENCE):
+    """Oberarm zur Vertikalen wie calculateUpperArmAngle (Grad in [0, 180], NaN wenn ungültig)."""
+    shoulder = joint(keypoints, f'{side}_shoulder')
+    elbow = joint(keypoints, f'{side}_elbow')
+    dx = np.abs(elbow[..., 0] - shoulder[..., 0])
+    dy = elbow[..., 1] - shoulder[..., 1]
+    valid = ((shoulder[..., 2] > min_confidence) & (elbow[..., 2] > min_confidence)
+             & ((dx > MIN_MOVEMENT) | (np.abs(dy) > MIN_MOVEMENT)))
+    return np.where(valid, np.clip(np.degrees(np.arctan2(dx, -dy)), 0.0, 180.0), np.nan)
+
+
+def joint_angle(first, middle, last):
+    """Winkel am mittleren Joint in Grad wie PoseAnalyzer.calculateAngle, vektorisiert.
+
+    atan2(|Kreuzprodukt|, Skalarprodukt) statt acos - gleiches Ergebnis,
+    aber auch nahe 0° und 180° genau. Fallen Joints aufeinander, ist der
+    Winkel 0 (wie `guard magnitude > 0 else { return 0 }`).
+    """
+    ax = first[..., 0] - middle[..., 0]
+    ay = first[..., 1] - middle[..., 1]
+    bx = last[..., 0] - middle[..., 0]
+    by = last[..., 1] - middle[..., 1]
+    angle = np.degrees(np.arctan2(np.abs(ax * by - ay * bx), ax * bx + ay * by))
+    degenerate = ((ax == 0) & (ay == 0)) | ((bx == 0) & (by == 0))   # atan2(0, -0) wäre 180°
+    return np.where(degenerate, 0.0, angle)
+
+
+def knee_angle(keypoints, side='right', min_confidence=KNEE_MIN_CONFIDENCE):
+    """Kniewinkel Hüfte-Knie-Knöchel wie calculateLeft/RightKneeAngle (Grad, NaN wenn ungültig)."""
+    hip, knee, ankle = (joint(keypoints, f'{side}_{name}') for name in ('hip', 'knee', 'ankle'))
+    valid = (hip[..., 2] > min_confidence) & (knee[..., 2] > min_confidence) & (ankle[..., 2] > min_confidence)
+    return np.where(valid, joint_angle(hip, knee, ankle), np.nan)
+
+
+def posture_angles(keypoints):
+    """Alle Winkel (ANGLES) für alle Frames: {Name: (Frames,)-Array}."""
+    keypoints = as_keypoints(keypoints)
+    return {
+        'torso': torso_angle(keypoints),
+        'left_upper_arm': upper_arm_angle(keypoints, 'left'),
+        'right_upper_arm': upper_arm_angle(keypoints, 'right'),
+        'left_knee': knee_angle(keypoints, 'left'),
+        'right_knee': knee_angle(keypoints, 'right'),
+    }
+
+
+def as_keypoints(keypoints):
+    """Prüft die Form (…, Joints, 3) und rechnet in float64."""
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    if keypoints.ndim < 2 or keypoints.shape[-2:] != (len(JOINTS), 3):
+        raise ValueError(f"Keypoints brauchen die Form (Frames, {len(JOINTS)}, 3), nicht {keypoints.shape}")
+    return keypoints
+
+
+def load_keypoints(path):
+    """Pose-Dump laden: .npy (Frames × Joints × 3) oder .npz mit 'keypoints' (+ optional 'frames').
+
+    Returns:
+        (keypoints, Frame-Nummern)
+    """
+    data = np.load(path)
+    if isinstance(data, np.lib.npyio.NpzFile):
+        with data:
+            keypoints = data['keypoints']
+            frames = data['frames'] if 'frames' in data.files else np.arange(len(keypoints))
+    else:
+        keypoints, frames = data, np.arange(len(data))
+    return as_keypoints(keypoints), np.asarray(frames)
+
+
+def format_angles_csv(frames, angles):
+    """Frame + eine Spalte pro Winkel, leere Zellen für NaN."""
+    table = np.column_stack([angles[name] for name in ANGLES])
+    lines = ['Frame,' + ','.join(ANGLES)]
+    for frame, row in zip(frames, table):
+        lines.append(f"{frame}," + ','.join('' if np.isnan(value) else f"{value:.2f}" for value in row))
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Körperwinkel für jeden Frame eines Pose-Dumps')
+    parser.add_argument('input', help='Pose-Dump (.npy oder .npz, Frames × Joints × 3)')
+    parser.add_argument('-o', '--output', default=None, help='Winkel pro Frame als CSV')
+    args = parser.parse_args(argv)
+
+    try:
+        keypoints, frames = load_keypoints(args.input)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    angles = posture_angles(keypoints)
+    print(f"📊 {len(keypoints)} Frames")
+    for name in ANGLES:
+        values = angles[name]
+        valid = values[~np.isnan(values)]
+        if len(valid):
+            print(f"   {name:16s} {len(valid):6d} gültig   ∅ {valid.mean():7.1f}°   "
+                  f"{valid.min():7.1f}° … {valid.max():7.1f}°")
+        else:
+            print(f"   {name:16s}      0 gültig")
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(format_angles_csv(frames, angles))
+        print(f"💾 Gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Inhalts-adressierter Cache für gerenderte Analyse-Bilder
+========================================================
+Ein PNG wird nur neu gerendert, wenn sich etwas geändert hat, das es
+beeinflusst. Der Schlüssel ist ein SHA-256 über:
+
+- die Eingabe-Arrays (Bytes + dtype + shape)
+- die Analyse-Ergebnisse/Parameter (kanonisches JSON)
+- den Plot-Stil: Quelltext der Render-Funktion und der Zeichen-Funktionen
+  (z.B. rendering.STYLE_SOURCES), dpi, savefig-Optionen, matplotlib-Version
+
+Bei einem Treffer wird die gecachte Datei nur kopiert - keine Figure,
+kein savefig. Der Cache liegt auf der Platte (zweistufig nach Hash-Präfix),
+ist in der Größe begrenzt und verdrängt die am längsten nicht benutzten
+Einträge (LRU über die mtime, die bei jedem Treffer erneuert wird).
+
+Verzeichnis: $HAMMERTRACK_CACHE_DIR oder ~/.cache/hammertrack/renders
+Abschalten: HAMMERTRACK_CACHE_DIR=off
+
+Verwendung:
+    render_cached(output_path, render_figure, arrays=(t.frames, t.x, t.y),
+                  params={'ellipses': ellipses}, style_sources=rendering.STYLE_SOURCES,
+                  dpi=150, bbox_inches='tight')
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+
+CACHE_VERSION = 1
+MAX_BYTES = 512 << 20  # 512 MB
+DEFAULT_DIRECTORY = Path.home() / '.cache' / 'hammertrack' / 'renders'
+
+
+class RenderCache:
+    """Größenbegrenzter LRU-Cache für gerenderte Dateien."""
+
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = Path(directory or os.environ.get('HAMMERTRACK_CACHE_DIR') or DEFAULT_DIRECTORY)
+        self.max_bytes = max_bytes
+        self._entries = None  # {Pfad: (mtime, Größe)}, erst bei Bedarf eingelesen
+
+    def key(self, arrays=(), params=None, style=None):
+        """Hex-Schlüssel aus Eingabe-Arrays, Parametern und Stil."""
+        digest = hashlib.sha256(f"hammertrack-render-{CACHE_VERSION}".encode())
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(memoryview(array).cast('B'))
+        for part in (params, style):
+            digest.update(json.dumps(part, sort_keys=True, default=_jsonable).encode())
+        return digest.hexdigest()
+
+    def path_for(self, key, suffix='.png'):
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    def lookup(self, key, suffix='.png'):
+        """Pfad der gecachten Datei oder None. Ein Treffer erneuert die mtime (LRU)."""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        if self._entries is not None:
+            self._entries[path] = (path.stat().st_mtime, self._entries.get(path, (0, 0))[1])
+        return path
+
+    def store(self, key, write, suffix='.png'):
+        """Legt einen Eintrag an: write(temp_pfad) schreibt die Datei. Gibt den Cache-Pfad zurück."""
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, partial = tempfile.mkstemp(prefix='.partial-', suffix=suffix, dir=path.parent)
+        os.close(fd)
+        try:
+            write(partial)
+            os.replace(partial, path)
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(partial)
+            raise
+
+        entries = self._load_entries()
+        stat = path.stat()
+        entries[path] = (stat.st_mtime, stat.st_size)
+        self._evict()
+        return path
+
+    def total_bytes(self):
+        return sum(size for _, size in self._load_entries().values())
+
+    def _load_entries(self):
+        if self._entries is None:
+            self._entries = {}
+            if self.directory.is_dir():
+                for path in self.directory.glob('??/*'):
+                    if path.name.startswith('.partial-'):
+                        continue
+                    with suppress(FileNotFoundError):
+                        stat = path.stat()
+                        self._entries[path] = (stat.st_mtime, stat.st_size)
+        return self._entries
+
+    def _evict(self):
+        """Älteste Einträge löschen, bis der Cache wieder unter max_bytes liegt."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        for path, (_, size) in sorted(self._entries.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            with suppress(FileNotFoundError):
+                path.unlink()
+            del self._entries[path]
+            total -= size
+
+
+def style_fingerprint(*sources, **settings):
+    """Stil-Teil des Schlüssels: Quelltext der Render-Funktionen/Module + Einstellungen."""
+    texts = []
+    for source in sources:
+        try:
+            texts.append(inspect.getsource(source))
+        except (OSError, TypeError):
+            texts.append(source.__code__.co_code.hex())
+    return {'sources': texts, 'matplotlib': matplotlib.__version__, **settings}
+
+
+def render_cached(output_path, render, arrays=(), params=None, style_sources=(), cache=None,
+                  **savefig_kwargs):
+    """Speichert render() als `output_path` - bei unverändertem Schlüssel aus dem Cache.
+
+    Args:
+        render: baut und liefert die Figure (wird bei einem Treffer nie aufgerufen)
+        arrays: Eingabe-Arrays, params: Analyse-Ergebnisse/Parameter (JSON-fähig)
+        style_sources: weitere Funktionen/Module, deren Quelltext den Stil bestimmt
+        savefig_kwargs: dpi, bbox_inches, ... (gehören zum Schlüssel)
+
+    Returns:
+        True bei einem Cache-Treffer
+    """
+    if os.environ.get('HAMMERTRACK_CACHE_DIR', '').lower() == 'off':
+        render().savefig(output_path, **savefig_kwargs)
+        return False
+
+    cache = cache or RenderCache()
+    suffix = Path(output_path).suffix or '.png'
+    key = cache.key(arrays, params, style_fingerprint(render, *style_sources, suffix=suffix, **savefig_kwargs))
+
+    cached = cache.lookup(key, suffix)
+    hit = cached is not None
+    if not hit:
+        figure = render()
+        cached = cache.store(key, lambda partial: figure.savefig(partial, **savefig_kwargs), suffix)
+    shutil.copyfile(cached, output_path)
+    return hit
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"Nicht im Cache-Schlüssel verwendbar: {type(value).__name__}")
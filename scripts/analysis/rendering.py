@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer Renderer für Trajektorien-Plots
+===========================================
+Zeichnet alle Ellipsen eines Wurfs mit einer festen Anzahl Artists statt
+einem ax.plot/ax.scatter pro Ellipse:
+
+- Ellipsen-Bahnen: EINE LineCollection (Slices der sortierten Arrays,
+  kein Durchsuchen aller Punkte pro Ellipse)
+- Ellipsen-Punkte: EINE PathCollection (Farben pro Punkt)
+- Winkel-Linien: EINE LineCollection
+- Umkehrpunkte: EINE PathCollection (Marker-Form pro Punkt)
+- Figuren ohne pyplot direkt auf dem Agg-Canvas → läuft headless und ohne
+  globalen Figuren-Zustand (wichtig für Tausende Würfe im Nightly-Report)
+
+Verwendung:
+    fig, ax = new_figure((16, 10))
+    draw_segments(ax, x, 1 - y, start, end, colors)
+    python rendering.py saison.htarch -o report/   # unveränderte Würfe kommen aus dem Cache
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.markers import MarkerStyle
+
+from ellipses import segment_ellipses
+from render_cache import RenderCache, render_cached
+from trajectory_io import collect_files, iter_trajectories
+from turning_points import MIN_DISTANCE, MIN_FRAMES, TP_MAXIMUM, TP_START, detect_turning_points, turning_point_types
+
+ELLIPSE_COLORS = ['#FF4444', '#44FF44', '#4444FF', '#FF44FF', '#44FFFF', '#FFFF44', '#FF8844']
+
+# Umkehrpunkt-Stil: (Farbe, Marker)
+TP_STYLE = {
+    TP_START: ('#FFD700', 'o'),
+    TP_MAXIMUM: ('#FF1493', '^'),
+}
+TP_STYLE_MINIMUM = ('#00CED1', 'v')
+
+
+def new_figure(figsize):
+    """Figure + Axes direkt auf dem Agg-Canvas (kein pyplot, kein GUI-Backend)."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def ellipse_colors(count, palette=ELLIPSE_COLORS):
+    """Farbe pro Ellipse, zyklisch aus der Palette."""
+    return [palette[i % len(palette)] for i in range(count)]
+
+
+def segment_indices(start, end):
+    """Alle Punkt-Indizes start..end (inklusive) aller Segmente, hintereinander.
+
+    Returns:
+        (Indizes, Segment-Nummer pro Index)
+    """
+    start = np.asarray(start, dtype=np.intp)
+    lengths = np.maximum(np.asarray(end, dtype=np.intp) - start + 1, 0)
+    segment = np.repeat(np.arange(len(start)), lengths)
+    first = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) - first[segment] + start[segment], segment
+
+
+def draw_segments(ax, x, y, start, end, colors, linewidth=5, alpha=0.85, zorder=4, **kwargs):
+    """Alle Ellipsen-Bahnen (Punkte start..end) als eine LineCollection."""
+    xy = np.column_stack((x, y))
+    lines = [xy[s:e + 1] for s, e in zip(np.asarray(start).tolist(), np.asarray(end).tolist())]
+    collection = LineCollection(lines, colors=list(colors), linewidths=linewidth, alpha=alpha,
+                                zorder=zorder, **kwargs)
+    ax.add_collection(collection)
+    return collection
+
+
+def draw_segment_points(ax, x, y, start, end, colors, s=70, alpha=0.8, edgecolors='black',
+                        linewidth=1.5, zorder=5):
+    """Alle Punkte aller Ellipsen als eine PathCollection, gefärbt nach Ellipse."""
+    index, segment = segment_indices(start, end)
+    colors = np.asarray(list(colors), dtype=object)
+    return ax.scatter(np.asarray(x)[index], np.asarray(y)[index], s=s, c=list(colors[segment]),
+                      alpha=alpha, edgecolors=edgecolors, linewidth=linewidth, zorder=zorder)
+
+
+def draw_angle_lines(ax, start_x, start_y, end_x, end_y, colors, linewidth=2, linestyle=':',
+                     alpha=0.6, zorder=3):
+    """Winkel-Linien (Start → Ende) aller Ellipsen als eine LineCollection."""
+    lines = np.stack((np.column_stack((start_x, start_y)), np.column_stack((end_x, end_y))), axis=1)
+    collection = LineCollection(lines, colors=list(colors), linewidths=linewidth, linestyles=linestyle,
+                                alpha=alpha, zorder=zorder)
+    ax.add_collection(collection)
+    return collection
+
+
+def draw_turning_points(ax, x, y, types, size=400, start_size=500, linewidth=3, alpha=0.95, zorder=10):
+    """Alle Umkehrpunkte als eine PathCollection - Farbe und Marker-Form pro Punkt."""
+    types = list(types)
+    styles = [TP_STYLE.get(t, TP_STYLE_MINIMUM) for t in types]
+    sizes = [start_size if t == TP_START else size for t in types]
+    collection = ax.scatter(x, y, s=sizes, c=[color for color, _ in styles], edgecolors='black',
+                            linewidth=linewidth, zorder=zorder, alpha=alpha)
+    collection.set_paths([_marker_path(marker) for _, marker in styles])
+    return collection
+
+
+def segment_legend_handles(colors, labels, linewidth=5, alpha=0.85):
+    """Legenden-Einträge für die Ellipsen einer LineCollection (werden nicht gezeichnet)."""
+    return [Line2D([0], [0], color=color, linewidth=linewidth, alpha=alpha, label=label)
+            for color, label in zip(colors, labels)]
+
+
+def turning_point_legend_handles(markersize=13):
+    """Legenden-Einträge Start / Maximum / Minimum."""
+    entries = [('Start (TP0)', *TP_STYLE[TP_START]), ('Maximum', *TP_STYLE[TP_MAXIMUM]),
+               ('Minimum', *TP_STYLE_MINIMUM)]
+    return [Line2D([0], [0], marker=marker, color='w', markerfacecolor=color, markersize=markersize,
+                   label=label, markeredgecolor='black', markeredgewidth=2)
+            for label, color, marker in entries]
+
+
+def analyze_throw(trajectory, strategy='swift', min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Umkehrpunkte und Ellipsen für den Standard-Plot: (tp_index, tp_is_maximum, segments)."""
+    tp_index, tp_is_maximum = detect_turning_points(trajectory.x, trajectory.y,
+                                                    min_distance=min_distance, min_frames=min_frames)
+    segments = segment_ellipses(trajectory.x, trajectory.y, tp_index, strategies=[strategy])[strategy]
+    return tp_index, tp_is_maximum, segments
+
+
+def render_throw(trajectory, strategy='swift', title=None, figsize=(16, 10), analysis=None):
+    """Standard-Plot eines Wurfs: Bahn, Ellipsen, Winkel-Linien, Umkehrpunkte.
+
+    `analysis` ist das Ergebnis von analyze_throw (Standard: hier berechnet).
+    """
+    x = np.asarray(trajectory.x, dtype=np.float64)
+    y = 1 - np.asarray(trajectory.y, dtype=np.float64)  # Y-Flip
+    tp_index, tp_is_maximum, segments = analysis or analyze_throw(trajectory, strategy)
+    colors = ellipse_colors(len(segments))
+
+    fig, ax = new_figure(figsize)
+    ax.plot(x, y, color='#CCCCCC', linewidth=2.5, alpha=0.4, zorder=2)
+    draw_segments(ax, x, y, segments.start, segments.end, colors)
+    draw_segment_points(ax, x, y, segments.start, segments.end, colors)
+    draw_angle_lines(ax, x[segments.angle_start], y[segments.angle_start],
+                     x[segments.angle_end], y[segments.angle_end], colors)
+    draw_turning_points(ax, x[tp_index], y[tp_index], turning_point_types(tp_is_maximum))
+
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+    ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
+    ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
+    average = f" • ∅ {segments.angles.mean():.2f}°" if len(segments) else ''
+    ax.set_title(f"{title or 'HammerTrack'}\n{len(trajectory)} Frames • {len(segments)} Ellipsen • "
+                 f"{len(tp_index)} Umkehrpunkte{average}", fontsize=15, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.set_aspect('equal')
+    labels = [f"Ellipse {i + 1}: {angle:.2f}°" for i, angle in enumerate(segments.angles)]
+    ax.legend(handles=segment_legend_handles(colors, labels) + turning_point_legend_handles(),
+              loc='upper right', fontsize=10, framealpha=0.95, edgecolor='black', ncol=2)
+    fig.tight_layout()
+    return fig
+
+
+def _marker_path(marker):
+    style = MarkerStyle(marker)
+    return style.get_path().transformed(style.get_transform())
+
+
+# Stil-Teil des Render-Cache-Schlüssels: nur die Zeichen-Funktionen und ihre
+# Konstanten - Änderungen an CLI oder Hilfetexten leeren den Cache nicht
+STYLE_SOURCES = (new_figure, ellipse_colors, segment_indices, draw_segments, draw_segment_points, draw_angle_lines,
+                 draw_turning_points, segment_legend_handles, turning_point_legend_handles, _marker_path)
+STYLE_PARAMS = {'ellipse_colors': ELLIPSE_COLORS, 'tp_style': TP_STYLE, 'tp_style_minimum': TP_STYLE_MINIMUM}
+
+
+def render_throw_cached(output_path, trajectory, strategy='swift', title=None, cache=None, dpi=100,
+                        min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """render_throw über den Render-Cache. Returns True bei einem Cache-Treffer.
+
+    Der Schlüssel enthält die erkannten Umkehrpunkte und Winkel - Änderungen
+    an turning_points.py oder ellipses.py rendern neu.
+    """
+    analysis = analyze_throw(trajectory, strategy, min_distance, min_frames)
+    tp_index, _, segments = analysis
+    return render_cached(output_path, lambda: render_throw(trajectory, strategy, title, analysis=analysis),
+                         arrays=(trajectory.frames, trajectory.x, trajectory.y),
+                         params={'strategy': strategy, 'title': title, 'min_distance': min_distance,
+                                 'min_frames': min_frames, 'turning_points': tp_index.tolist(),
+                                 'angles': segments.angles.tolist(), 'style': STYLE_PARAMS},
+                         style_sources=(render_throw, *STYLE_SOURCES), cache=cache, dpi=dpi)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ein PNG pro Wurf rendern (headless)')
+    parser.add_argument('inputs', nargs='+', help='Archiv, CSV-Dateien, Xcode-Logs oder Verzeichnisse')
+    parser.add_argument('-o', '--output', default='report', help='Ausgabe-Verzeichnis')
+    parser.add_argument('--strategy', default='swift', help='Ellipsen-Strategie (siehe ellipses.py)')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--cache', default=None, help='Render-Cache-Verzeichnis (Standard: siehe render_cache.py)')
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    cache = RenderCache(args.cache)
+    count = cached = 0
+    for path in collect_files(args.inputs):
+        for block, trajectory in enumerate(iter_trajectories(path)):
+            title = f"{path.name} #{block}"
+            cached += render_throw_cached(output / f"{path.stem}_{block:04d}.png", trajectory,
+                                          strategy=args.strategy, title=title, cache=cache, dpi=args.dpi)
+            count += 1
+    print(f"✅ {count} Würfe gerendert ({cached} aus dem Cache): {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Gleichmäßiges Frame-Raster trotz Detektions-Lücken
+=================================================
+Fällt die Hammer-Detektion aus, fehlen im Log ganze Frames (im
+eingebetteten Beispielwurf z.B. 3→9, 43→48, 116→120). Die Ellipsen-Logik
+behandelt aufeinanderfolgende Zeilen trotzdem als aufeinanderfolgende
+Frames. Hier wird jeder Wurf auf ein festes Raster (Schrittweite `step`
+Frames) gelegt:
+
+- 'linear': np.interp
+- 'cubic': kubische Hermite-Interpolation (Tangenten aus den Nachbar-
+  Steigungen, auch bei ungleichen Abständen) - vektorisiert, ohne scipy
+- Echte Samples bleiben exakt erhalten, `interpolated` markiert die neuen
+- `max_gap`: Lücken mit mehr als N fehlenden Frames werden abgelehnt
+
+Danach ist Zeilen-Index = (Frame - erster Frame) / step, jede weitere
+Stufe kann also mit reinen Array-Operationen statt Frame-Suchen arbeiten.
+
+Verwendung:
+    python resampling.py wurf.csv --method cubic --max-gap 8 -o gleichmaessig.csv
+"""
+
+import argparse
+import sys
+from dataclasses import replace
+
+import numpy as np
+
+from trajectory_io import load_trajectory, write_trajectory_csv
+
+METHODS = ('linear', 'cubic')
+
+
+def find_gaps(frames, step=1):
+    """Lücken im Frame-Raster. Gibt (Frame davor, Frame danach, fehlende Frames) zurück."""
+    frames = np.asarray(frames)
+    missing = np.diff(frames) // step - 1
+    gap = np.flatnonzero(missing > 0)
+    return frames[gap], frames[gap + 1], missing[gap]
+
+
+def resample_uniform(trajectory, step=1, method='linear', max_gap=None):
+    """Legt eine Trajektorie auf das Raster erster Frame, +step, ..., letzter Frame.
+
+    Doppelte Frames werden auf das erste Sample reduziert. confidence und
+    timestamp werden linear interpoliert, torso_angle ist an neuen Samples NaN.
+
+    Returns:
+        (Trajektorie auf dem Raster, interpolated-Maske)
+
+    Raises:
+        ValueError: unbekannte Methode oder Lücke länger als `max_gap` Frames
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Interpolation: {method!r} (erlaubt: {', '.join(METHODS)})")
+
+    frames, first = np.unique(trajectory.frames, return_index=True)
+    if len(frames) == 0:
+        return trajectory, np.zeros(0, dtype=bool)
+
+    if max_gap is not None:
+        before, after, missing = find_gaps(frames, step)
+        too_long = np.flatnonzero(missing > max_gap)
+        if len(too_long):
+            k = too_long[0]
+            raise ValueError(f"{len(too_long)} Lücke(n) länger als {max_gap} Frames, "
+                             f"z.B. Frame {before[k]} → {after[k]} ({missing[k]} fehlen)")
+
+    grid = np.arange(frames[0], frames[-1] + 1, step, dtype=np.int32)
+    original = np.searchsorted(grid, frames)
+    on_grid = grid[np.minimum(original, len(grid) - 1)] == frames
+    interpolated = np.ones(len(grid), dtype=bool)
+    interpolated[original[on_grid]] = False
+
+    xy = np.stack((trajectory.x[first], trajectory.y[first])).astype(np.float64)
+    if method == 'cubic':
+        x, y = cubic_interpolate(grid, frames, xy)
+    else:
+        x, y = (np.interp(grid, frames, values) for values in xy)
+
+    columns = {'frames': grid, 'x': x, 'y': y}
+    for name in ('confidence', 'timestamp'):
+        values = getattr(trajectory, name)
+        if values is not None:
+            columns[name] = np.interp(grid, frames, values[first])
+    if trajectory.torso_angle is not None:
+        torso = np.full(len(grid), np.nan)
+        torso[original[on_grid]] = trajectory.torso_angle[first][on_grid]
+        columns['torso_angle'] = torso
+    return replace(trajectory, **columns), interpolated
+
+
+def cubic_interpolate(t_new, t, values):
+    """Kubische Hermite-Interpolation entlang der letzten Achse.
+
+    Tangente am Stützpunkt k: nach Abstand gewichtetes Mittel der Steigungen
+    links und rechts (an den Enden die einseitige Steigung). Geht exakt
+    durch alle Stützpunkte; Werte außerhalb werden auf den Rand geklemmt.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    t_new = np.clip(np.asarray(t_new, dtype=np.float64), t[0], t[-1])
+    if len(t) < 2:
+        return np.broadcast_to(values[..., :1], values.shape[:-1] + t_new.shape).copy()
+
+    h = np.diff(t)
+    slope = np.diff(values) / h
+    tangent = np.empty_like(values)
+    tangent[..., 0] = slope[..., 0]
+    tangent[..., -1] = slope[..., -1]
+    tangent[..., 1:-1] = (slope[..., :-1] * h[1:] + slope[..., 1:] * h[:-1]) / (h[:-1] + h[1:])
+
+    k = np.clip(np.searchsorted(t, t_new, side='right') - 1, 0, len(t) - 2)
+    s = (t_new - t[k]) / h[k]
+    s2 = s * s
+    s3 = s2 * s
+    return ((2 * s3 - 3 * s2 + 1) * values[..., k]
+            + (s3 - 2 * s2 + s) * h[k] * tangent[..., k]
+            + (-2 * s3 + 3 * s2) * values[..., k + 1]
+            + (s3 - s2) * h[k] * tangent[..., k + 1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Wurf auf ein gleichmäßiges Frame-Raster legen')
+    parser.add_argument('input', help='CSV-Datei, Xcode-Log, Archiv oder - (stdin)')
+    parser.add_argument('--method', choices=METHODS, default='linear')
+    parser.add_argument('--step', type=int, default=1, help='Raster-Schrittweite in Frames')
+    parser.add_argument('--max-gap', type=int, default=None, help='Längere Lücken ablehnen')
+    parser.add_argument('-o', '--output', default=None, help='Ergebnis als Frame,X,Y-CSV')
+    args = parser.parse_args(argv)
+
+    trajectory = load_trajectory(args.input)
+    before, after, missing = find_gaps(trajectory.frames, args.step)
+    print(f"📊 {len(trajectory)} Punkte, {len(missing)} Lücken, {missing.sum()} fehlende Frames")
+    for b, a, m in zip(before, after, missing):
+        print(f"   Frame {b} → {a}: {m} fehlen")
+
+    try:
+        resampled, interpolated = resample_uniform(trajectory, step=args.step, method=args.method,
+                                                   max_gap=args.max_gap)
+    except ValueError as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    print(f"✅ {len(resampled)} Punkte auf dem Raster, davon {interpolated.sum()} interpoliert ({args.method})")
+    if args.output:
+        write_trajectory_csv(resampled, args.output)
+        print(f"💾 Gespeichert: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
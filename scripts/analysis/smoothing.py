@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Glättung von Trajektorien
+=========================
+NumPy-Port von Trajectory.gaussianSmooth (HammerTracker.swift) plus
+Savitzky-Golay als Alternative.
+
+- Gauß wie im Swift-Code: Fenster = ceil(3σ)·2 + 1, Kernel normiert, am
+  Rand wird nur über die vorhandenen Nachbarn gewichtet und durch deren
+  Gewichtssumme geteilt (Summationsreihenfolge identisch → bitgleich)
+- Vektorisiert: eine Array-Operation pro Kernel-Gewicht, nie pro Punkt
+- Gebündelt: beliebig viele gleich lange Würfe als (Würfe × Punkte)-Array
+  oder viele verschieden lange Würfe hintereinander + `offsets` (wie die
+  Spalten eines .htarch-Archivs) - der Kernel läuft nie über Wurfgrenzen
+
+Verwendung:
+    from smoothing import smoothed_points
+    sx, sy = smoothed_points(traj.x, traj.y)            # wie smoothedPoints
+    gaussian_smooth(archive.columns['x'], 1.0, offsets=archive.offsets)
+    python smoothing.py saison.htarch --sigma 0.5 1 1.5
+"""
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from trajectory_io import collect_files, is_archive, iter_trajectories
+
+SIGMA = 0.5           # smoothedPoints: "Reduced from 1.5 to 0.5 for light smoothing"
+MIN_POINTS = 5        # smoothedPoints: guard points.count > 5
+SAVGOL_WINDOW = 7
+SAVGOL_POLYORDER = 2
+
+
+def gaussian_kernel(sigma=SIGMA):
+    """Normierter Gauß-Kernel wie in gaussianSmooth."""
+    window = int(math.ceil(sigma * 3)) * 2 + 1
+    center = window // 2
+    kernel = [math.exp(-((i - center) ** 2) / (2 * sigma * sigma)) for i in range(window)]
+    total = 0.0
+    for weight in kernel:
+        total += weight
+    return np.array([weight / total for weight in kernel])
+
+
+def gaussian_smooth(values, sigma=SIGMA, offsets=None):
+    """Rand-normierte Gauß-Glättung entlang der letzten Achse.
+
+    Args:
+        values: (..., n) - ein Wurf, gleich lange Würfe als Zeilen, oder
+            mehrere Würfe hintereinander (dann mit `offsets`)
+        offsets: Wurf i liegt in values[..., offsets[i]:offsets[i+1]]
+
+    Würfe, die kürzer als der Kernel sind, werden wie in Swift nur über
+    die vorhandenen Nachbarn normiert:
+
+    >>> gaussian_smooth(np.arange(3.), 1.5).round(3)
+    array([0.734, 1.   , 1.266])
+    >>> gaussian_smooth(np.arange(2.), 1.0).round(3)
+    array([0.378, 0.622])
+    """
+    values = np.asarray(values, dtype=np.float64)
+    kernel = gaussian_kernel(sigma)
+    center = len(kernel) // 2
+    segment = _segment_ids(values.shape[-1], offsets)
+
+    padded = _pad(values, center)
+    weighted = np.zeros_like(values)
+    total = np.zeros(values.shape[-1])
+    for j, weight in enumerate(kernel):
+        inside = _inside(segment, j - center)
+        weighted += np.where(inside, padded[..., j:j + values.shape[-1]] * weight, 0.0)
+        total += np.where(inside, weight, 0.0)
+    return weighted / total
+
+
+def smoothed_points(x, y, sigma=SIGMA):
+    """Wie Trajectory.smoothedPoints: ab 6 Punkten geglättet, sonst unverändert."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= MIN_POINTS:
+        return x, y
+    return tuple(gaussian_smooth(np.stack((x, y)), sigma))
+
+
+def savgol_coefficients(window=SAVGOL_WINDOW, polyorder=SAVGOL_POLYORDER):
+    """(window × window)-Matrix: Zeile k glättet Punkt k eines Fensters.
+
+    Die mittlere Zeile ist der klassische Savitzky-Golay-Kernel, die
+    übrigen Zeilen werten das Polynom am Rand aus.
+    """
+    if window % 2 == 0 or window <= polyorder:
+        raise ValueError(f"Fenster muss ungerade und > Polynomgrad sein ({window}, {polyorder})")
+    vandermonde = np.vander(np.arange(window) - window // 2, polyorder + 1, increasing=True)
+    return vandermonde @ np.linalg.pinv(vandermonde)
+
+
+def savgol_smooth(values, window=SAVGOL_WINDOW, polyorder=SAVGOL_POLYORDER, offsets=None):
+    """Savitzky-Golay-Glättung entlang der letzten Achse.
+
+    Am Rand wird das Polynom des ersten bzw. letzten vollen Fensters
+    ausgewertet. Würfe, die kürzer als das Fenster sind, bleiben unverändert.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    coefficients = savgol_coefficients(window, polyorder)
+    half = window // 2
+    n = values.shape[-1]
+    offsets = np.array([0, n]) if offsets is None else np.asarray(offsets, dtype=np.intp)
+    segment = _segment_ids(n, offsets)
+
+    # Pro Punkt: Anfang des Fensters (am Rand an den Wurf geklemmt) und Zeile der Matrix
+    first = offsets[:-1][segment]
+    last = offsets[1:][segment] - window
+    position = np.arange(n)
+    anchor = np.clip(position - half, first, np.maximum(last, first))
+    rows = coefficients[position - anchor]
+
+    smoothed = np.zeros_like(values)
+    for j in range(window):
+        source = np.minimum(anchor + j, n - 1)
+        smoothed += values[..., source] * rows[:, j]
+    return np.where(last >= first, smoothed, values)
+
+
+def smooth(values, method='gaussian', offsets=None, **options):
+    """Gemeinsamer Einstieg: method = 'gaussian' oder 'savgol'."""
+    if method == 'gaussian':
+        return gaussian_smooth(values, offsets=offsets, **options)
+    if method == 'savgol':
+        return savgol_smooth(values, offsets=offsets, **options)
+    raise ValueError(f"Unbekannte Glättung: {method!r}")
+
+
+def _segment_ids(n, offsets):
+    if offsets is None:
+        return np.zeros(n, dtype=np.intp)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    if offsets[0] != 0 or offsets[-1] != n:
+        raise ValueError(f"offsets müssen 0..{n} abdecken")
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _pad(values, width):
+    pad = [(0, 0)] * (values.ndim - 1) + [(width, width)]
+    return np.pad(values, pad)
+
+
+def _inside(segment, shift):
+    """Maske: Nachbar i+shift existiert und gehört zum selben Wurf."""
+    neighbour = np.full_like(segment, -1)
+    shift = int(np.sign(shift)) * min(abs(shift), len(segment))
+    if shift >= 0:
+        neighbour[:len(segment) - shift] = segment[shift:]
+    else:
+        neighbour[-shift:] = segment[:shift]
+    return neighbour == segment
+
+
+def _load_columns(inputs):
+    """Alle Würfe als hintereinander liegende x/y-Spalten + offsets."""
+    files = collect_files(inputs)
+    if len(files) == 1 and is_archive(files[0]):
+        from trajectory_archive import TrajectoryArchive
+        archive = TrajectoryArchive(files[0])
+        return archive.columns['x'], archive.columns['y'], archive.offsets
+
+    trajectories = [t for path in files for t in iter_trajectories(path)]
+    offsets = np.concatenate(([0], np.cumsum([len(t) for t in trajectories])))
+    return (np.concatenate([t.x for t in trajectories]),
+            np.concatenate([t.y for t in trajectories]), offsets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Glättungs-Parameter über viele Würfe vergleichen')
+    parser.add_argument('inputs', nargs='+', help='Archiv, CSV-Dateien, Xcode-Logs oder Verzeichnisse')
+    parser.add_argument('--sigma', type=float, nargs='+', default=[SIGMA], help='Gauß-Sigmas')
+    parser.add_argument('--savgol', type=int, nargs=2, metavar=('FENSTER', 'GRAD'), action='append',
+                        default=[], help='Zusätzlich Savitzky-Golay testen')
+    args = parser.parse_args(argv)
+
+    x, y, offsets = _load_columns(args.inputs)
+    if len(offsets) < 2:
+        print('❌ Keine Würfe gefunden', file=sys.stderr)
+        return 1
+    xy = np.stack((x, y)).astype(np.float64)
+    print(f"📂 {len(offsets) - 1} Würfe, {len(x)} Punkte")
+
+    variants = [(f"Gauß σ={sigma:g}", 'gaussian', {'sigma': sigma}) for sigma in args.sigma]
+    variants += [(f"Savitzky-Golay {w}/{p}", 'savgol', {'window': w, 'polyorder': p})
+                 for w, p in args.savgol]
+    for label, method, options in variants:
+        start = time.perf_counter()
+        smoothed = smooth(xy, method, offsets=offsets, **options)
+        elapsed = time.perf_counter() - start
+        shift = np.hypot(*(smoothed - xy))
+        print(f"   {label:24s} {elapsed * 1000:8.1f} ms   "
+              f"Verschiebung ∅ {shift.mean():.5f}, max {shift.max():.5f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Start-Position aus Pose-Zeitreihen
+==================================
+Offline-Gegenstück zum Arm-Trigger in CameraManager.processPoseObservation
+(LiveView.swift): Live startet das Hammer-Tracking erst, wenn ein Oberarm
+waagerecht zur Seite zeigt - rechts 160-180°, links 0-20°
+(calculateUpperArmAngle), beide Joints mit confidence > 0.2.
+
+Hier wird die Regel vektorisiert über eine ganze Pose-Aufnahme
+ausgewertet; jeder Beginn einer Folge von Start-Frames ist ein Wurf-Start.
+Die Video-Pipeline (video_tracking.py --pose) dekodiert und detektiert
+dann nur ab diesen Frames statt ab Frame 0 - Anlaufen, Einrichten und
+Pausen zwischen den Würfen kosten keinen Detektor-Aufruf mehr.
+
+Verwendung:
+    from start_detection import find_starts
+    starts = find_starts(keypoints, frames)               # Frame-Nummern
+    python start_detection.py pose_dump.npz --fps 60
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from pose_angles import as_keypoints, load_keypoints, upper_arm_angle
+
+RIGHT_ARM_RANGE = (160.0, 180.0)  # rightArmReady
+LEFT_ARM_RANGE = (0.0, 20.0)      # leftArmReady
+MIN_FRAMES = 1                    # Live löst schon beim ersten passenden Frame aus
+
+
+def start_mask(keypoints):
+    """Pro Frame: Start-Position wie isStartPosition (rightArmReady || leftArmReady).
+
+    upper_arm_angle ist NaN, wenn eine der Confidences ≤ 0.2 ist - NaN-
+    Vergleiche sind falsch, das Gate steckt also schon im Winkel.
+    """
+    keypoints = as_keypoints(keypoints)
+    right = upper_arm_angle(keypoints, 'right')
+    left = upper_arm_angle(keypoints, 'left')
+    with np.errstate(invalid='ignore'):
+        return (((right >= RIGHT_ARM_RANGE[0]) & (right <= RIGHT_ARM_RANGE[1]))
+                | ((left >= LEFT_ARM_RANGE[0]) & (left <= LEFT_ARM_RANGE[1])))
+
+
+def find_starts(keypoints, frames=None, min_frames=MIN_FRAMES, separation=0):
+    """Wurf-Starts: erster Frame jeder Folge von mindestens `min_frames` Start-Frames.
+
+    Mit min_frames > 1 löst erst der min_frames-te Frame in Folge aus
+    (gegen einzelne Fehl-Posen). Starts näher als `separation` Frames am
+    vorigen Start werden verworfen - wie isDetectingPose, das während eines
+    laufenden Wurfs weitere Trigger verhindert.
+
+    Returns:
+        Frame-Nummern (aus `frames`, Standard 0, 1, 2 …)
+    """
+    ready = start_mask(keypoints)
+    frames = np.arange(len(ready)) if frames is None else np.asarray(frames)
+    edges = np.diff(np.concatenate(([0], ready.astype(np.int8), [0])))
+    begin = np.flatnonzero(edges == 1)
+    end = np.flatnonzero(edges == -1)
+    starts = frames[begin[end - begin >= min_frames] + min_frames - 1]
+    if separation <= 0 or len(starts) < 2:
+        return starts
+    kept = [starts[0]]
+    for start in starts[1:]:  # wenige Starts pro Aufnahme
+        if start - kept[-1] >= separation:
+            kept.append(start)
+    return np.array(kept, dtype=starts.dtype)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Wurf-Starts (Arm waagerecht) in einer Pose-Aufnahme finden')
+    parser.add_argument('input', help='Pose-Dump (.npy oder .npz, Frames × Joints × 3)')
+    parser.add_argument('--fps', type=float, default=30.0, help='Für die Zeitangaben')
+    parser.add_argument('--min-frames', type=int, default=MIN_FRAMES, help='Start-Frames in Folge')
+    parser.add_argument('--separation', type=float, default=0.0, help='Mindestabstand zweier Starts in Sekunden')
+    args = parser.parse_args(argv)
+
+    try:
+        keypoints, frames = load_keypoints(args.input)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    starts = find_starts(keypoints, frames, args.min_frames, round(args.separation * args.fps))
+    print(f"📊 {len(frames)} Frames, {int(start_mask(keypoints).sum())} in Start-Position, {len(starts)} Starts")
+    for start in starts:
+        print(f"   Frame {start} ({start / args.fps:.2f} s)")
+    return 0 if len(starts) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Synthetische Hammerwurf-Trajektorien
+====================================
+Erzeugt federartige Würfe wie im geloggten X/Y-Verlauf: der Hammer läuft
+auf einer Ellipse, die sich mit jeder Umdrehung weiter öffnet und kippt,
+während die Drehung immer schneller wird (im Beispielwurf schrumpft die
+halbe Umdrehung von ~20 auf ~6 Frames).
+
+Modell pro Wurf (Phase φ läuft über `turns` Umdrehungen):
+- Winkelgeschwindigkeit wächst geometrisch von 2π/start_period auf
+  2π/end_period - φ(t) ist geschlossen invertierbar, kein Integrieren
+- Ellipse: Halbachsen a (X, wird breiter) und b (Y), gekippt um θ, das
+  sich von tilt_start nach tilt_end dreht; Mittelpunkt wandert in Y
+- Detektion: Gauß-Rauschen, Konfidenz pro Frame (unter 0.3 verworfen wie
+  HammerTracker.confidenceThreshold) und Aussetzer über mehrere Frames
+
+Alles ist über (Würfe × Frames)-Arrays vektorisiert und läuft in Blöcken
+von BATCH_THROWS Würfen - Millionen Würfe ohne Schleife pro Wurf oder
+Punkt. Jeder Wurf streut um die Parameter (`jitter`), damit kein Wurf
+dem anderen gleicht.
+
+Verwendung:
+    from synthetic import generate_throws
+    columns, offsets = generate_throws(1000, seed=1)     # Trajectory + Wurf-Grenzen
+    python synthetic.py -n 100000 -o wuerfe.csv          # ein Frame,X,Y-Block pro Wurf
+    python synthetic.py -n 1000000 -o saison.htarch --dropout 0.05
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from trajectory_io import Trajectory, format_trajectory_csv
+
+CONFIDENCE_THRESHOLD = 0.3  # wie HammerTracker.confidenceThreshold
+BATCH_THROWS = 4096         # Würfe pro Block (begrenzt den Speicher)
+
+# Standard-Parameter - am Beispielwurf abgelesen (30 fps, Frames 0-134)
+DEFAULTS = {
+    'turns': 6.0,             # Umdrehungen inkl. Anschwingen
+    'fps': 30.0,
+    'start_period': 1.3,      # Sekunden pro Umdrehung am Anfang ...
+    'end_period': 0.4,        # ... und am Ende
+    'amplitude': (0.35, 0.49),  # X-Halbachse Anfang → Ende
+    'height': 0.1,            # Y-Halbachse
+    'tilt': (-20.0, 7.0),     # Kippwinkel in Grad, Anfang → Ende
+    'center': (0.5, 0.52, 0.6),  # Mittelpunkt X, Y Anfang → Y Ende
+    'noise': 0.003,           # Detektions-Rauschen (Standardabweichung, normalisiert)
+    'confidence': 0.8,        # mittlere Detektions-Konfidenz
+    'dropout': 0.03,          # Wahrscheinlichkeit pro Frame, dass ein Aussetzer beginnt
+    'gap_length': 3.0,        # mittlere Aussetzer-Länge in Frames
+    'jitter': 0.1,            # relative Streuung der Parameter zwischen Würfen
+}
+
+
+def generate_throws(count, seed=None, **params):
+    """`count` Würfe hintereinander als eine Trajectory plus Wurf-Grenzen.
+
+    Parameter siehe DEFAULTS. Returns:
+        (Trajectory mit frames/x/y/confidence/timestamp, offsets) - Wurf i
+        liegt in [offsets[i], offsets[i+1])
+    """
+    batches = list(iter_throw_batches(count, seed=seed, **params))
+    if not batches:
+        empty = np.empty(0)
+        return Trajectory(np.empty(0, dtype=np.int32), empty, empty, empty, empty), np.zeros(1, dtype=np.int64)
+    columns = {name: np.concatenate([getattr(t, name) for t, _ in batches])
+               for name in ('frames', 'x', 'y', 'confidence', 'timestamp')}
+    sizes = np.concatenate([np.diff(offsets) for _, offsets in batches])
+    return Trajectory(**columns), np.concatenate(([0], np.cumsum(sizes)))
+
+
+def generate_trajectory(seed=None, **params):
+    """Ein einzelner Wurf als Trajectory."""
+    trajectory, _ = generate_throws(1, seed=seed, **params)
+    return trajectory
+
+
+def iter_throw_batches(count, seed=None, batch_throws=BATCH_THROWS, **params):
+    """Würfe blockweise: liefert (Trajectory, offsets) für je bis zu `batch_throws` Würfe."""
+    unknown = set(params) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unbekannte Parameter: {', '.join(sorted(unknown))}")
+    settings = {**DEFAULTS, **params}
+    rng = np.random.default_rng(seed)
+    for first in range(0, count, batch_throws):
+        yield _throw_batch(rng, min(batch_throws, count - first), settings)
+
+
+def _throw_batch(rng, count, p):
+    """Ein Block Würfe über (Würfe × Frames)-Arrays."""
+    def jittered(value):
+        return value * (1 + p['jitter'] * rng.uniform(-1, 1, (count, 1)))
+
+    # Winkelgeschwindigkeit ω(φ) = ω0 · r^(φ/Φ)  →  t(φ) = Φ/(ω0 ln r) · (1 - r^(-φ/Φ))
+    total = 2 * np.pi * jittered(p['turns'])
+    start_period = jittered(p['start_period'])
+    omega0 = 2 * np.pi / start_period
+    log_r = np.log(start_period / jittered(p['end_period']))
+    log_r = np.where(np.abs(log_r) < 1e-9, 1e-9, log_r)  # konstante Drehzahl: Grenzfall r → 1
+    duration = total / (omega0 * log_r) * (1 - np.exp(-log_r))
+    frames = np.floor(duration * p['fps']).astype(np.int64) + 1
+
+    t = np.arange(frames.max()) / p['fps']
+    inside = np.arange(frames.max()) < frames
+    phase = -total / log_r * np.log(np.maximum(1 - t * omega0 * log_r / total, 1e-12))
+    progress = np.clip(phase / total, 0, 1)
+
+    amplitude = _lerp(jittered(p['amplitude'][0]), jittered(p['amplitude'][1]), progress)
+    height = jittered(p['height'])
+    tilt = np.radians(_lerp(jittered(p['tilt'][0]), jittered(p['tilt'][1]), progress))
+    center_y = _lerp(jittered(p['center'][1]), jittered(p['center'][2]), progress)
+    angle = phase + 0.5  # Start rechts, erste Bewegung nach links (wie im Log)
+
+    u = amplitude * np.cos(angle)
+    v = height * np.sin(angle)
+    shape = u.shape
+    x = p['center'][0] + u * np.cos(tilt) - v * np.sin(tilt) + rng.normal(0, p['noise'], shape)
+    y = center_y + u * np.sin(tilt) + v * np.cos(tilt) + rng.normal(0, p['noise'], shape)
+    confidence = np.clip(rng.normal(p['confidence'], 0.15, shape), 0, 1)
+    # der erste Frame eines Wurfs ist immer erkannt: Konfidenz über dem Gate, kein Aussetzer
+    confidence[:, 0] = np.maximum(confidence[:, 0], CONFIDENCE_THRESHOLD)
+    dropouts = _dropouts(rng, shape, p['dropout'], p['gap_length'])
+    dropouts[:, 0] = False
+
+    detected = inside & (confidence >= CONFIDENCE_THRESHOLD) & ~dropouts
+    frame_index = np.broadcast_to(np.arange(shape[1]), shape)
+    trajectory = Trajectory(
+        frames=frame_index[detected].astype(np.int32),
+        x=np.clip(x, 0, 1)[detected],
+        y=np.clip(y, 0, 1)[detected],
+        confidence=confidence[detected],
+        timestamp=np.broadcast_to(t, shape)[detected],
+    )
+    return trajectory, np.concatenate(([0], np.cumsum(detected.sum(axis=1))))
+
+
+def _dropouts(rng, shape, probability, mean_length):
+    """Maske der Aussetzer: an jedem Frame beginnt mit `probability` eine Lücke (geometrische Länge)."""
+    if probability <= 0:
+        return np.zeros(shape, dtype=bool)
+    starts = rng.random(shape) < probability
+    lengths = rng.geometric(1 / max(mean_length, 1), shape)
+    position = np.arange(shape[1])
+    until = np.maximum.accumulate(np.where(starts, position + lengths, -1), axis=1)
+    return until > position
+
+
+def _lerp(start, end, progress):
+    return start + (end - start) * progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Synthetische Hammerwürfe erzeugen')
+    parser.add_argument('-n', '--count', type=int, default=1, help='Anzahl Würfe')
+    parser.add_argument('-o', '--output', default='-', help="Ziel: .csv/.txt (Frame,X,Y-Blöcke), .htarch oder '-'")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--turns', type=float, default=DEFAULTS['turns'])
+    parser.add_argument('--fps', type=float, default=DEFAULTS['fps'])
+    parser.add_argument('--noise', type=float, default=DEFAULTS['noise'])
+    parser.add_argument('--confidence', type=float, default=DEFAULTS['confidence'])
+    parser.add_argument('--dropout', type=float, default=DEFAULTS['dropout'])
+    parser.add_argument('--gap-length', type=float, default=DEFAULTS['gap_length'])
+    parser.add_argument('--jitter', type=float, default=DEFAULTS['jitter'])
+    args = parser.parse_args(argv)
+
+    params = {name: getattr(args, name) for name in
+              ('turns', 'fps', 'noise', 'confidence', 'dropout', 'gap_length', 'jitter')}
+    batches = iter_throw_batches(args.count, seed=args.seed, **params)
+    start = time.perf_counter()
+    points = 0
+
+    if args.output.endswith('.htarch'):
+        from trajectory_archive import ArchiveWriter
+        with ArchiveWriter(args.output) as writer:
+            for trajectory, offsets in batches:
+                writer.add_many(trajectory, offsets)
+                points += len(trajectory)
+    else:
+        out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        try:
+            for trajectory, offsets in batches:
+                out.write(format_trajectory_csv(trajectory, offsets=offsets))
+                points += len(trajectory)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+
+    if args.output != '-':
+        print(f"✅ {args.count} Würfe, {points} Punkte in {time.perf_counter() - start:.1f} s: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Wurf-gegen-Wurf-Ausrichtung
+===========================
+CompareView.swift synchronisiert zwei Videos über die Zeit und blättert
+Ellipse für Ellipse - bei unterschiedlichem Tempo passen die Drehungen
+dann nicht zusammen. Hier werden Würfe Drehung für Drehung per Dynamic
+Time Warping (DTW) aufeinander abgebildet.
+
+- Sequenz pro Wurf: eine Zeile pro Ellipse ('swift'-Segmentierung wie
+  createEllipsesFromThreePoints) mit Ellipsen-Winkel, Dauer in Frames und
+  X-Weite zwischen den Umkehrpunkten - gewichtet nach FEATURE_WEIGHTS
+- Sakoe-Chiba-Band: Drehung i darf nur Drehungen nahe der (auf gleiche
+  Länge gestreckten) Diagonale zugeordnet werden - höchstens BAND
+  Drehungen der kürzeren Sequenz daneben
+- Kosten: DTW-Summe / (n + m), gleich ob mit oder ohne Pfad berechnet
+- Vektorisiert: die Kostenmatrix wird Anti-Diagonale für Anti-Diagonale
+  gefüllt, für viele Wurf-Paare gleichzeitig ((Paare × n × m)-Arrays)
+- Ergebnis pro Paar: zugeordnete Drehungen, Winkel-Differenzen und die
+  Start-Frames beider Drehungen (z.B. zum Springen im Video)
+- Ein Wurf gegen die ganze Historie eines Athleten: Prozess-Pool wie in
+  batch_analysis.py, Archive in Blöcken
+
+Verwendung:
+    from throw_alignment import align, throw_profile
+    alignment = align(throw_profile(a), throw_profile(b))
+    alignment.pairs, alignment.angle_deltas
+    python throw_alignment.py wurf.csv historie.htarch -j 4 --top 5
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from ellipses import segment_ellipses
+from trajectory_archive import TrajectoryArchive
+from trajectory_io import collect_files, is_archive, iter_trajectories, load_trajectory
+from turning_points import MIN_DISTANCE, MIN_FRAMES, detect_turning_points
+
+BAND = 2.0            # Sakoe-Chiba-Band in Drehungen der kürzeren Sequenz (mindestens 1)
+ARCHIVE_CHUNK = 256   # Würfe pro Job bei .htarch-Archiven
+# Gewicht pro Merkmal, jeweils durch eine typische Größe geteilt
+FEATURE_WEIGHTS = {'angle': 1.0 / 10.0, 'period': 0.5 / 10.0, 'width': 0.5 / 0.1}
+
+
+@dataclass(frozen=True)
+class ThrowProfile:
+    """Drehungs-Sequenz eines Wurfs - eine Zeile pro Ellipse."""
+    angles: np.ndarray   # Ellipsen-Winkel in Grad
+    periods: np.ndarray  # Frames von TP(i) bis TP(i+2)
+    widths: np.ndarray   # |ΔX| von TP(i) nach TP(i+1)
+    frames: np.ndarray   # Frame des ersten Umkehrpunkts
+
+    def __len__(self):
+        return len(self.angles)
+
+    def features(self, weights=None):
+        """(Drehungen × 3)-Merkmale, gewichtet."""
+        weights = FEATURE_WEIGHTS if weights is None else weights
+        return np.column_stack((self.angles * weights['angle'], self.periods * weights['period'],
+                                self.widths * weights['width']))
+
+
+@dataclass(frozen=True)
+class Alignment:
+    """Zuordnung zweier Würfe Drehung für Drehung."""
+    pairs: np.ndarray         # (k, 2) Drehung in a, Drehung in b
+    cost: float               # DTW-Gesamtkosten / (n + m) - unabhängig vom Pfad
+    angle_deltas: np.ndarray  # Winkel b - Winkel a pro Paar (Grad)
+    frames: np.ndarray        # (k, 2) Start-Frames der Paare
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+def throw_profile(trajectory, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Trajectory → ThrowProfile (Umkehrpunkte wie HammerTracker, 'swift'-Ellipsen)."""
+    x = np.asarray(trajectory.x, dtype=np.float64)
+    y = np.asarray(trajectory.y, dtype=np.float64)
+    tp_index, _ = detect_turning_points(x, y, min_distance=min_distance, min_frames=min_frames)
+    segments = segment_ellipses(x, y, tp_index, strategies=['swift'])['swift']
+    frames = np.asarray(trajectory.frames)
+    return ThrowProfile(
+        angles=segments.angles,
+        periods=(frames[segments.end] - frames[segments.start]).astype(np.float64),
+        widths=np.abs(x[segments.angle_end] - x[segments.angle_start]),
+        frames=frames[segments.start],
+    )
+
+
+def dtw(cost, lengths_a=None, lengths_b=None, band=BAND):
+    """Gebändertes DTW für viele Kostenmatrizen gleichzeitig.
+
+    Args:
+        cost: (Paare × n × m) lokale Kosten (oder (n × m) für ein Paar);
+            Paar p nutzt nur cost[p, :lengths_a[p], :lengths_b[p]]
+        band: Zelle (i, j) nur, wenn |i·m_p − j·n_p| ≤ band·max(n_p, m_p) -
+            in Schritten der kürzeren Sequenz um die gestreckte Diagonale;
+            None = ohne Band
+
+    Returns:
+        (Gesamtkosten (Paare,), akkumulierte Matrix (Paare × n+1 × m+1))
+        - inf, wenn eine Sequenz leer ist
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    single = cost.ndim == 2
+    if single:
+        cost = cost[None]
+    pairs, n, m = cost.shape
+    lengths_a = np.full(pairs, n) if lengths_a is None else np.asarray(lengths_a)
+    lengths_b = np.full(pairs, m) if lengths_b is None else np.asarray(lengths_b)
+
+    i = np.arange(1, n + 1)[None, :, None]
+    j = np.arange(1, m + 1)[None, None, :]
+    na = lengths_a[:, None, None]
+    nb = lengths_b[:, None, None]
+    allowed = (i <= na) & (j <= nb)
+    if band is not None:
+        allowed &= np.abs(i * nb - j * na) <= max(band, 1.0) * np.maximum(na, nb)
+    local = np.where(allowed, cost, np.inf)
+
+    accumulated = np.full((pairs, n + 1, m + 1), np.inf)
+    accumulated[:, 0, 0] = 0.0
+    for diagonal in range(2, n + m + 1):  # Zellen mit i + j = diagonal hängen nur von den beiden davor ab
+        rows = np.arange(max(1, diagonal - m), min(n, diagonal - 1) + 1)
+        cols = diagonal - rows
+        best = np.minimum(np.minimum(accumulated[:, rows - 1, cols], accumulated[:, rows, cols - 1]),
+                          accumulated[:, rows - 1, cols - 1])
+        accumulated[:, rows, cols] = local[:, rows - 1, cols - 1] + best
+
+    total = accumulated[np.arange(pairs), lengths_a, lengths_b]
+    if single:
+        return total[0], accumulated[0]
+    return total, accumulated
+
+
+def warping_path(accumulated, length_a, length_b):
+    """Pfad aus der akkumulierten Matrix zurückverfolgen: (k, 2) Indizes ab 0."""
+    i, j = length_a, length_b
+    path = []
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        steps = (accumulated[i - 1, j - 1], accumulated[i - 1, j], accumulated[i, j - 1])
+        step = int(np.argmin(steps))  # bei Gleichstand diagonal
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    return np.array(path[::-1], dtype=np.intp).reshape(-1, 2)
+
+
+def align_batch(query, candidates, band=BAND, weights=None, paths=True):
+    """Ein Wurf gegen viele: ein DTW-Aufruf für alle Paare.
+
+    Returns:
+        [Alignment] in der Reihenfolge von `candidates` (ohne `paths` nur
+        mit Kosten, leere Paare); leere Profile haben cost = inf
+    """
+    if not candidates:
+        return []
+    features_query = query.features(weights)
+    lengths = np.array([len(candidate) for candidate in candidates])
+    padded = np.zeros((len(candidates), max(lengths.max(), 1), features_query.shape[1]))
+    for row, candidate in enumerate(candidates):
+        padded[row, :len(candidate)] = candidate.features(weights)
+    cost = np.sqrt(((features_query[None, :, None, :] - padded[:, None, :, :]) ** 2).sum(axis=-1))
+    total, accumulated = dtw(cost, np.full(len(candidates), len(query)), lengths, band)
+
+    results = []
+    for row, candidate in enumerate(candidates):
+        steps = len(query) + len(candidate)
+        cost = float(total[row] / steps) if steps else np.inf  # inf bei leeren Profilen
+        if not np.isfinite(cost) or not paths:
+            results.append(Alignment(np.empty((0, 2), dtype=np.intp), cost,
+                                     np.empty(0), np.empty((0, 2), dtype=np.int64)))
+            continue
+        path = warping_path(accumulated[row], len(query), len(candidate))
+        results.append(Alignment(
+            pairs=path,
+            cost=cost,
+            angle_deltas=candidate.angles[path[:, 1]] - query.angles[path[:, 0]],
+            frames=np.column_stack((query.frames[path[:, 0]], candidate.frames[path[:, 1]])),
+        ))
+    return results
+
+
+def align(a, b, band=BAND, weights=None):
+    """Zwei Würfe (ThrowProfile) Drehung für Drehung ausrichten."""
+    return align_batch(a, [b], band, weights)[0]
+
+
+def distance_matrix(profiles, band=BAND, weights=None):
+    """DTW-Kosten aller Paare (symmetrisch, Diagonale 0)."""
+    count = len(profiles)
+    matrix = np.zeros((count, count))
+    for row in range(count - 1):
+        others = align_batch(profiles[row], profiles[row + 1:], band, weights, paths=False)
+        matrix[row, row + 1:] = matrix[row + 1:, row] = [alignment.cost for alignment in others]
+    return matrix
+
+
+def compare_file(query, path, band=BAND, weights=None, throws=None):
+    """Ein Wurf gegen alle Würfe einer Datei. Returns [(Quelle, Block, Alignment)]."""
+    if throws is None:
+        blocks = list(enumerate(iter_trajectories(path)))
+    else:
+        archive = TrajectoryArchive(path)
+        blocks = [(i, archive[i]) for i in range(*throws)]
+    profiles = [throw_profile(trajectory) for _, trajectory in blocks]
+    alignments = align_batch(query, profiles, band, weights)
+    return [(str(path), block, alignment) for (block, _), alignment in zip(blocks, alignments)]
+
+
+def _compare_file_args(args):
+    return compare_file(*args)
+
+
+def _jobs(query, files, band, weights):
+    """Ein Job pro Datei; Archive werden in Blöcke zu ARCHIVE_CHUNK Würfen geteilt."""
+    for path in files:
+        if not is_archive(path):
+            yield query, path, band, weights, None
+            continue
+        count = len(TrajectoryArchive(path))
+        for start in range(0, count, ARCHIVE_CHUNK):
+            yield query, path, band, weights, (start, min(start + ARCHIVE_CHUNK, count))
+
+
+def compare_with_history(query, files, workers=None, band=BAND, weights=None):
+    """Ein Wurf gegen die ganze Historie, parallel. Returns [(Quelle, Block, Alignment)] nach Kosten sortiert."""
+    jobs = list(_jobs(query, files, band, weights))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 8))
+
+    matches = []
+    if workers == 1:
+        for job in jobs:
+            matches.extend(_compare_file_args(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file_matches in pool.map(_compare_file_args, jobs, chunksize=chunksize):
+                matches.extend(file_matches)
+    matches.sort(key=lambda match: match[2].cost)
+    return matches
+
+
+def format_alignment(alignment):
+    """Tabelle Drehung für Drehung."""
+    lines = ['   Drehung  Frame a  Frame b    Δ Winkel']
+    for (a, b), (frame_a, frame_b), delta in zip(alignment.pairs, alignment.frames, alignment.angle_deltas):
+        lines.append(f"   {a + 1:3d} ↔ {b + 1:<3d} {frame_a:7d}  {frame_b:7d}  {delta:+9.2f}°")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Einen Wurf Drehung für Drehung mit anderen Würfen vergleichen (DTW)')
+    parser.add_argument('query', help="Wurf: CSV-Datei, Xcode-Log, Archiv oder '-'")
+    parser.add_argument('history', nargs='+', help='Vergleichs-Würfe: Archive, CSV-Dateien, Logs oder Verzeichnisse')
+    parser.add_argument('--throw', type=int, default=0, help='Wurf-Nummer in der Query-Datei')
+    parser.add_argument('--band', type=float, default=BAND, help='Sakoe-Chiba-Band in Drehungen der kürzeren Sequenz (0 = ohne)')
+    parser.add_argument('--top', type=int, default=5, help='So viele ähnlichste Würfe zeigen')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Prozesse (Standard: alle CPUs)')
+    args = parser.parse_args(argv)
+
+    query = throw_profile(load_trajectory(args.query, throw=args.throw))
+    if not len(query):
+        print('❌ Wurf hat keine Ellipsen', file=sys.stderr)
+        return 1
+    files = collect_files(args.history)
+    if not files:
+        print('❌ Keine Vergleichs-Würfe gefunden', file=sys.stderr)
+        return 1
+
+    matches = compare_with_history(query, files, args.workers, args.band or None)
+    valid = [match for match in matches if np.isfinite(match[2].cost)]
+    print(f"📊 {len(query)} Drehungen, {len(valid)} von {len(matches)} Würfen vergleichbar")
+    for rank, (source, block, alignment) in enumerate(valid[:args.top], 1):
+        print(f"{rank:2d}. {os.path.basename(source)} #{block}: Kosten {alignment.cost:.3f}, "
+              f"∅ |Δ Winkel| {np.abs(alignment.angle_deltas).mean():.2f}°")
+        if rank == 1:
+            print(format_alignment(alignment))
+    return 0 if valid else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Ähnlichkeits-Index über alle Würfe
+==================================
+"Zeig mir die früheren Würfe, die diesem am ähnlichsten sind": jeder Wurf
+wird zu einem Merkmalsvektor fester Länge, alle Vektoren liegen in einem
+KD-Baum, der als .npz gespeichert und inkrementell erweitert wird.
+
+Merkmale pro Wurf (FEATURES):
+- Ellipsen-Winkel der 3-Punkt-Ellipsen (createEllipsesFromThreePoints),
+  auf TURNS Stützstellen interpoliert - Würfe mit 4 und mit 6 Drehungen
+  bleiben vergleichbar
+- Dauer jeder Drehung in Frames (TP(i) → TP(i+2)), ebenso interpoliert
+- Amplitude: halbe X-Spannweite der Umkehrpunkte
+- Torso-Winkel am 2. Umkehrpunkt (TP2, wie die Sprachausgabe); ohne
+  Torso-Daten (z.B. aus video_tracking.py) bleibt er NaN
+Alle Merkmale werden mit festen Konstanten (FEATURE_CENTER/-SPREAD) skaliert - neue
+Würfe verändern die Vektoren bestehender Würfe nie.
+
+KD-Baum:
+- Median-Teilung entlang der Dimension mit der größten Spannweite, bis
+  höchstens LEAF_SIZE Würfe pro Blatt übrig sind; die Vektoren liegen in
+  Blatt-Reihenfolge, pro Blatt wird die Bounding-Box gespeichert
+- Abfrage best-bin-first: untere Abstandsschranke zu allen Blatt-Boxen in
+  einem NumPy-Schritt, Blätter nach Schranke in sich verdoppelnden Gruppen
+  abarbeiten, abbrechen sobald die Schranke größer ist als der k-te Treffer
+- Fehlende Merkmale (NaN) zählen nicht zum Abstand - weder beim
+  Anfrage-Wurf noch beim gespeicherten; Blätter mit fehlenden Werten haben
+  in dieser Dimension eine unbegrenzte Box
+- Einfügen landet in einem Puffer, der bei jeder Abfrage komplett
+  durchsucht wird; wird er größer als REBUILD_FRACTION des Baums, wird der
+  Baum neu gebaut
+- Pro Quelle werden mtime und Größe gespeichert: geänderte oder
+  gewachsene Dateien werden beim nächsten Lauf neu indiziert
+
+Verwendung:
+    from throw_index import ThrowIndex, throw_features
+    index = ThrowIndex.load('index.npz')
+    index.add(throw_features(trajectory)[None], ['wurf.csv'], [0])
+    distances, rows = index.query(throw_features(trajectory), k=5)
+    python throw_index.py index.npz saison.htarch -j 4          # anlegen / erweitern
+    python throw_index.py index.npz --query wurf.csv -k 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ellipses import three_point_ellipse_angles, three_point_ellipses
+from trajectory_archive import TrajectoryArchive
+from trajectory_io import collect_files, is_archive, iter_trajectories, load_trajectory
+from turning_points import MIN_DISTANCE, MIN_FRAMES, detect_turning_points
+
+TURNS = 6              # Stützstellen für Winkel und Dauer
+LEAF_SIZE = 64         # Würfe pro Blatt
+FIRST_LEAVES = 4       # Blätter in der ersten Abfrage-Gruppe
+REBUILD_FRACTION = 0.05
+ARCHIVE_CHUNK = 256    # Würfe pro Job bei .htarch-Archiven
+FEATURES = ([f'angle_{i}' for i in range(TURNS)] + [f'period_{i}' for i in range(TURNS)]
+            + ['amplitude', 'torso_tp2'])
+# Referenz und typische Streuung pro Merkmal: skaliert = (Wert - Referenz) / Streuung
+FEATURE_CENTER = np.array([0.0] * TURNS + [0.0] * TURNS + [0.0, 20.0])
+FEATURE_SPREAD = np.array([10.0] * TURNS + [5.0] * TURNS + [0.05, 10.0])
+
+
+def throw_features(trajectory, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Trajectory → unskalierter Merkmalsvektor (len(FEATURES),); None ohne Ellipse."""
+    x = np.asarray(trajectory.x, dtype=np.float64)
+    y = np.asarray(trajectory.y, dtype=np.float64)
+    tp_index, _ = detect_turning_points(x, y, min_distance=min_distance, min_frames=min_frames)
+    angles = three_point_ellipse_angles(x, y, tp_index)
+    if not len(angles):
+        return None
+    start, _, end = three_point_ellipses(tp_index)
+    frames = np.asarray(trajectory.frames)
+    periods = (frames[end] - frames[start]).astype(np.float64)
+
+    slots = np.linspace(0.0, len(angles) - 1, TURNS)
+    turns = np.arange(len(angles))
+    tp_x = x[tp_index]
+    torso = np.nan if trajectory.torso_angle is None else float(trajectory.torso_angle[tp_index[1]])
+    return np.concatenate((np.interp(slots, turns, angles), np.interp(slots, turns, periods),
+                           [(tp_x.max() - tp_x.min()) / 2, torso]))
+
+
+def scale_features(features):
+    """(…, len(FEATURES)) unskaliert → skaliert; NaN (fehlender Torso) bleibt NaN."""
+    return (np.asarray(features, dtype=np.float64) - FEATURE_CENTER) / FEATURE_SPREAD
+
+
+def unscale_features(vectors):
+    """Umkehrung von scale_features."""
+    return np.asarray(vectors) * FEATURE_SPREAD + FEATURE_CENTER
+
+
+class ThrowIndex:
+    """KD-Baum über skalierte Merkmalsvektoren plus Einfüge-Puffer.
+
+    Zeilen 0 … tree_size-1 liegen in Blatt-Reihenfolge im Baum, alle
+    weiteren im Puffer. `sources` / `blocks` benennen den Wurf jeder Zeile,
+    `stamps` hält pro Quelle den Stand beim Indizieren (source_stamp).
+    """
+
+    def __init__(self, vectors=None, sources=None, blocks=None, leaf_offsets=None, leaf_bounds=None, stamps=None):
+        self.vectors = np.empty((0, len(FEATURES))) if vectors is None else np.asarray(vectors, dtype=np.float64)
+        self.sources = np.empty(0, dtype=str) if sources is None else np.asarray(sources, dtype=str)
+        self.blocks = np.empty(0, dtype=np.int32) if blocks is None else np.asarray(blocks, dtype=np.int32)
+        self.stamps = {} if stamps is None else dict(stamps)
+        if leaf_offsets is None:
+            self._build()
+        else:
+            self.leaf_offsets = np.asarray(leaf_offsets, dtype=np.int64)
+            self.leaf_bounds = np.asarray(leaf_bounds, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def tree_size(self):
+        return int(self.leaf_offsets[-1])
+
+    def add(self, vectors, sources, blocks):
+        """Würfe anhängen (skalierte Vektoren, (n, len(FEATURES))). Baut bei Bedarf neu."""
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(-1, len(FEATURES))
+        self.vectors = np.concatenate((self.vectors, vectors))
+        self.sources = np.concatenate((self.sources, np.asarray(sources, dtype=str)))
+        self.blocks = np.concatenate((self.blocks, np.asarray(blocks, dtype=np.int32)))
+        if len(self) - self.tree_size > max(LEAF_SIZE, REBUILD_FRACTION * self.tree_size):
+            self._build()
+
+    def query(self, vector, k=5):
+        """k nächste Würfe zu einem skalierten Vektor (NaN-Merkmale zählen nicht).
+
+        Returns:
+            (Abstände, Zeilen) aufsteigend sortiert, je höchstens k
+        """
+        vector = np.asarray(vector, dtype=np.float64)
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+
+        best_rows = np.arange(self.tree_size, len(self))
+        best = _distances(self.vectors[best_rows], vector)
+        keep = np.argsort(best, kind='stable')[:k]
+        best, best_rows = best[keep], best_rows[keep]
+
+        lower = np.sqrt(np.nansum(np.maximum(np.maximum(self.leaf_bounds[:, 0] - vector,
+                                                        vector - self.leaf_bounds[:, 1]), 0.0) ** 2, axis=1))
+        order = np.argsort(lower)
+        position, step = 0, FIRST_LEAVES
+        while position < len(order):  # Blätter in sich verdoppelnden Gruppen statt einzeln
+            if len(best) >= k and lower[order[position]] > best[k - 1]:
+                break
+            leaves = order[position:position + step]
+            position, step = position + step, step * 2
+            rows = _leaf_rows(self.leaf_offsets, leaves[lower[leaves] <= (best[k - 1] if len(best) >= k else np.inf)])
+            best = np.concatenate((best, _distances(self.vectors[rows], vector)))
+            best_rows = np.concatenate((best_rows, rows))
+            keep = np.argsort(best, kind='stable')[:k]
+            best, best_rows = best[keep], best_rows[keep]
+        return best, best_rows
+
+    def rows_for(self, source):
+        """Zeilen aller Würfe aus einer Quelle (Pfad wie beim Einfügen)."""
+        return np.flatnonzero(self.sources == str(source))
+
+    def remove(self, source):
+        """Alle Würfe einer Quelle entfernen (z.B. vor dem Neu-Indizieren). Returns die Anzahl."""
+        keep = self.sources != str(source)
+        removed = len(self) - int(keep.sum())
+        self.stamps.pop(str(source), None)
+        if removed:
+            self.vectors, self.sources, self.blocks = self.vectors[keep], self.sources[keep], self.blocks[keep]
+            self._build()
+        return removed
+
+    def _build(self):
+        """KD-Baum über alle Zeilen neu bauen (Puffer wird Teil des Baums)."""
+        order = np.arange(len(self))
+        leaves = []
+        stack = [(0, len(self))]
+        while stack:
+            begin, end = stack.pop()
+            if end - begin <= LEAF_SIZE:
+                if end > begin:
+                    leaves.append((begin, end))
+                continue
+            segment = order[begin:end]
+            points = self.vectors[segment]
+            spread = np.fmax.reduce(points, axis=0) - np.fmin.reduce(points, axis=0)  # ohne NaN
+            axis = int(np.argmax(np.nan_to_num(spread, nan=-1.0)))
+            half = (end - begin) // 2
+            order[begin:end] = segment[np.argpartition(points[:, axis], half)]
+            stack.append((begin + half, end))
+            stack.append((begin, begin + half))
+        leaves.sort()
+
+        self.vectors = self.vectors[order]
+        self.sources = self.sources[order]
+        self.blocks = self.blocks[order]
+        self.leaf_offsets = np.array([0] + [end for _, end in leaves], dtype=np.int64)
+        self.leaf_bounds = np.array([_leaf_box(self.vectors[begin:end]) for begin, end in leaves]
+                                    ).reshape(-1, 2, len(FEATURES))
+
+    def save(self, path):
+        """Als .npz speichern (Baum und Puffer, kein Neubau beim Laden)."""
+        path = os.fspath(path)
+        partial = path + '.tmp.npz'
+        np.savez(partial, vectors=self.vectors, sources=self.sources, blocks=self.blocks,
+                 leaf_offsets=self.leaf_offsets, leaf_bounds=self.leaf_bounds, features=np.array(FEATURES),
+                 stamp_sources=np.array(list(self.stamps), dtype=str),
+                 stamp_values=np.array(list(self.stamps.values()), dtype=str))
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path):
+        """Gespeicherten Index laden; fehlt die Datei, ist der Index leer."""
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            if list(data['features']) != FEATURES:
+                raise ValueError(f"{path}: andere Merkmale - Index neu anlegen")
+            stamps = zip(data['stamp_sources'], data['stamp_values']) if 'stamp_sources' in data.files else ()
+            return cls(data['vectors'], data['sources'], data['blocks'], data['leaf_offsets'], data['leaf_bounds'],
+                       {str(source): str(value) for source, value in stamps})
+
+
+def source_stamp(path):
+    """Stand einer Datei für das Neu-Indizieren: 'mtime_ns:Größe'."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _distances(vectors, vector):
+    """Euklidischer Abstand über die Dimensionen, die bei beiden vorhanden sind."""
+    return np.sqrt(np.nansum((vectors - vector) ** 2, axis=1))
+
+
+def _leaf_box(vectors):
+    """(min, max) pro Dimension; fehlt ein Wert, ist die Box dort unbegrenzt."""
+    missing = np.isnan(vectors).any(axis=0)
+    return (np.where(missing, -np.inf, np.fmin.reduce(vectors, axis=0)),
+            np.where(missing, np.inf, np.fmax.reduce(vectors, axis=0)))
+
+
+def _leaf_rows(leaf_offsets, leaves):
+    """Zeilen-Indizes mehrerer Blätter in einem Schritt (ohne Schleife über die Blätter)."""
+    starts = leaf_offsets[leaves]
+    lengths = leaf_offsets[leaves + 1] - starts
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+def file_features(path, throws=None):
+    """Merkmale aller Würfe einer Datei. Returns [(Quelle, Block, skalierter Vektor)]; Würfe ohne Ellipse fehlen."""
+    if throws is None:
+        blocks = enumerate(iter_trajectories(path))
+    else:
+        archive = TrajectoryArchive(path)
+        blocks = ((i, archive[i]) for i in range(*throws))
+    rows = []
+    try:
+        for block, trajectory in blocks:
+            features = throw_features(trajectory)
+            if features is not None:
+                rows.append((str(path), block, scale_features(features)))
+    except (OSError, ValueError) as error:
+        print(f"⚠️  {path}: {error}", file=sys.stderr)
+    return rows
+
+
+def _file_features_args(args):
+    return file_features(*args)
+
+
+def _jobs(files):
+    """Ein Job pro Datei; Archive werden in Blöcke zu ARCHIVE_CHUNK Würfen geteilt."""
+    for path in files:
+        if not is_archive(path):
+            yield path, None
+            continue
+        count = len(TrajectoryArchive(path))
+        for start in range(0, count, ARCHIVE_CHUNK):
+            yield path, (start, min(start + ARCHIVE_CHUNK, count))
+
+
+def extract_features(files, workers=None):
+    """Merkmale aller Würfe aller Dateien, parallel. Returns [(Quelle, Block, skalierter Vektor)]."""
+    jobs = list(_jobs(files))
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 8))
+
+    rows = []
+    if workers == 1:
+        for job in jobs:
+            rows.extend(_file_features_args(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file_rows in pool.map(_file_features_args, jobs, chunksize=chunksize):
+                rows.extend(file_rows)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ähnlichkeits-Index über alle Würfe: anlegen, erweitern, abfragen')
+    parser.add_argument('index', help='Index-Datei (.npz), wird angelegt falls nicht vorhanden')
+    parser.add_argument('inputs', nargs='*', help='Neue Würfe: Archive, CSV-Dateien, Logs oder Verzeichnisse')
+    parser.add_argument('--query', default=None, help='Ähnlichste Würfe zu diesem Wurf suchen')
+    parser.add_argument('--throw', type=int, default=0, help='Wurf-Nummer in der Query-Datei')
+    parser.add_argument('-k', type=int, default=5, help='So viele ähnlichste Würfe')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Prozesse (Standard: alle CPUs)')
+    args = parser.parse_args(argv)
+
+    try:
+        index = ThrowIndex.load(args.index)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    files = collect_files(args.inputs) if args.inputs else []
+    stamps = {str(path): source_stamp(path) for path in files}
+    files = [path for path in files if index.stamps.get(str(path)) != stamps[str(path)]]  # unverändert überspringen
+    if files:
+        start = time.perf_counter()
+        replaced = sum(index.remove(path) for path in files)
+        rows = extract_features(files, args.workers)
+        if rows:
+            sources, blocks, vectors = zip(*rows)
+            index.add(np.array(vectors), sources, blocks)
+        index.stamps.update((str(path), stamps[str(path)]) for path in files)
+        index.save(args.index)
+        print(f"✅ {len(rows)} Würfe aus {len(files)} Dateien in {time.perf_counter() - start:.2f} s "
+              f"({replaced} ersetzt), Index: {len(index)} Würfe")
+        print(f"💾 Gespeichert: {args.index}")
+    elif args.inputs:
+        print('ℹ️  Keine neuen oder geänderten Dateien')
+
+    if args.query:
+        features = throw_features(load_trajectory(args.query, throw=args.throw))
+        if features is None:
+            print('❌ Wurf hat keine Ellipsen', file=sys.stderr)
+            return 1
+        start = time.perf_counter()
+        distances, rows = index.query(scale_features(features), args.k)
+        print(f"🔍 {len(rows)} ähnlichste von {len(index)} Würfen ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        for rank, (distance, row) in enumerate(zip(distances, rows), 1):
+            angles = unscale_features(index.vectors[row])[:TURNS]
+            print(f"{rank:2d}. {Path(index.sources[row]).name} #{index.blocks[row]}: Abstand {distance:.2f}, "
+                  f"Winkel {' '.join(f'{angle:+.1f}' for angle in angles)}")
+    return 0 if len(index) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
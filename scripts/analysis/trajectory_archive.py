@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Binäres Trajektorien-Archiv (.htarch)
+=====================================
+Viele Würfe in EINER Datei, spaltenweise (Structure of Arrays) abgelegt,
+damit kein Analyse-Lauf mehr Text-Floats parsen muss.
+
+Layout:
+    ARCHIVE_MAGIC (8 Bytes) | Header-Länge (uint64) | JSON-Header | Spalten ...
+
+- Spalten über ALLE Würfe hintereinander, je 64-Byte-ausgerichtet:
+  frames int32, x/y float32, confidence float32, timestamp float64,
+  torso_angle float32 (NaN = kein Torso-Winkel)
+- offsets int64[n+1]: Wurf i liegt in [offsets[i], offsets[i+1])
+- Lesen über EIN mmap - ein Wurf oder Frame-Bereich ist eine Null-Kopie-
+  View; das Betriebssystem lädt nur die Seiten, die wirklich gelesen werden
+
+Verwendung:
+    python trajectory_archive.py saison.htarch wuerfe/    # packen
+    archive = TrajectoryArchive('saison.htarch')
+    archive[42]                                           # Trajectory (Views)
+    archive.frame_range(42, 100, 200)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+from trajectory_io import ARCHIVE_MAGIC, Trajectory, collect_files, iter_trajectories
+
+ALIGNMENT = 64
+
+COLUMNS = {
+    'frames': np.dtype('<i4'),
+    'x': np.dtype('<f4'),
+    'y': np.dtype('<f4'),
+    'confidence': np.dtype('<f4'),
+    'timestamp': np.dtype('<f8'),
+    'torso_angle': np.dtype('<f4'),
+}
+OFFSETS_DTYPE = np.dtype('<i8')
+
+
+class ArchiveWriter:
+    """Schreibt Würfe spaltenweise; der Speicherbedarf ist unabhängig von der Archivgröße.
+
+    Jede Spalte wird zunächst in eine eigene temporäre Datei angehängt und
+    beim Schließen hinter den Header kopiert.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._tmpdir = tempfile.mkdtemp(prefix='.htarch-', dir=os.path.dirname(os.path.abspath(self.path)))
+        self._spill = {name: open(os.path.join(self._tmpdir, name), 'wb') for name in COLUMNS}
+        self._offsets = [0]
+        self._names = []
+
+    def add(self, trajectory, name=None):
+        """Hängt einen Wurf an. Fehlende Spalten werden mit NaN gefüllt."""
+        n = len(trajectory)
+        for column, dtype in COLUMNS.items():
+            values = getattr(trajectory, column)
+            if values is None:
+                values = np.full(n, np.nan)
+            self._spill[column].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self._offsets.append(self._offsets[-1] + n)
+        self._names.append(str(len(self._names)) if name is None else str(name))
+
+    def add_many(self, trajectory, offsets, names=None):
+        """Hängt viele Würfe auf einmal an: Wurf i = trajectory[offsets[i]:offsets[i+1]]."""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        n = int(offsets[-1] - offsets[0])
+        for column, dtype in COLUMNS.items():
+            values = getattr(trajectory, column)
+            values = np.full(n, np.nan) if values is None else values[offsets[0]:offsets[-1]]
+            self._spill[column].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        if names is None:
+            names = range(len(self._names), len(self._names) + len(offsets) - 1)
+        self._offsets.extend((self._offsets[-1] + offsets[1:] - offsets[0]).tolist())
+        self._names.extend(map(str, names))
+
+    def close(self):
+        if self._spill is None:
+            return
+        for f in self._spill.values():
+            f.close()
+
+        header = {
+            'version': 1,
+            'throws': len(self._names),
+            'points': self._offsets[-1],
+            'names': self._names,
+            'columns': {},
+        }
+        # Spalten-Offsets hängen von der Header-Länge ab und umgekehrt
+        # → so lange neu berechnen, bis sich der Datenanfang nicht mehr ändert
+        data_start = None
+        while True:
+            header_bytes = json.dumps(header).encode('utf-8')
+            start = _align(len(ARCHIVE_MAGIC) + 8 + len(header_bytes))
+            if start == data_start:
+                break
+            data_start = position = start
+            for column, dtype in COLUMNS.items():
+                header['columns'][column] = {'dtype': dtype.str, 'offset': position}
+                position = _align(position + dtype.itemsize * self._offsets[-1])
+            header['offsets'] = {'dtype': OFFSETS_DTYPE.str, 'offset': position}
+
+        partial = self.path + '.tmp'
+        with open(partial, 'wb') as out:
+            out.write(ARCHIVE_MAGIC)
+            out.write(struct.pack('<Q', len(header_bytes)))
+            out.write(header_bytes)
+            for column in COLUMNS:
+                _pad_to(out, header['columns'][column]['offset'])
+                with open(os.path.join(self._tmpdir, column), 'rb') as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+            _pad_to(out, header['offsets']['offset'])
+            out.write(np.asarray(self._offsets, dtype=OFFSETS_DTYPE).tobytes())
+        os.replace(partial, self.path)
+
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+        self._spill = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self._spill.values():
+                f.close()
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._spill = None
+
+
+class TrajectoryArchive:
+    """Lesezugriff auf ein .htarch-Archiv über ein einziges mmap."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                raise ValueError(f"Kein HammerTrack-Archiv: {self.path}")
+            (header_length,) = struct.unpack('<Q', f.read(8))
+            self.header = json.loads(f.read(header_length))
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.names = self.header['names']
+        points = self.header['points']
+        self.columns = {
+            column: np.frombuffer(self._mmap, dtype=spec['dtype'], count=points, offset=spec['offset'])
+            for column, spec in self.header['columns'].items()
+        }
+        spec = self.header['offsets']
+        self.offsets = np.frombuffer(self._mmap, dtype=spec['dtype'], count=len(self.names) + 1,
+                                     offset=spec['offset'])
+        self._index = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, throw):
+        """Wurf per Index oder Name - alle Spalten sind Views ins mmap."""
+        i = self.index_of(throw)
+        return self._slice(self.offsets[i], self.offsets[i + 1])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def index_of(self, throw):
+        if isinstance(throw, (int, np.integer)):
+            if not -len(self) <= throw < len(self):
+                raise IndexError(f"Wurf {throw} nicht im Archiv ({len(self)} Würfe)")
+            return int(throw) % len(self)
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index[throw]
+
+    def frame_range(self, throw, first_frame, last_frame):
+        """Nur die Frames first_frame..last_frame (inklusive) eines Wurfs."""
+        i = self.index_of(throw)
+        start, stop = int(self.offsets[i]), int(self.offsets[i + 1])
+        frames = self.columns['frames'][start:stop]
+        lo = start + int(np.searchsorted(frames, first_frame, side='left'))
+        hi = start + int(np.searchsorted(frames, last_frame, side='right'))
+        return self._slice(lo, hi)
+
+    def _slice(self, start, stop):
+        return Trajectory(**{column: values[start:stop] for column, values in self.columns.items()})
+
+
+def write_archive(path, trajectories):
+    """Schreibt (Name, Trajektorie)-Paare in ein neues Archiv."""
+    with ArchiveWriter(path) as writer:
+        for name, trajectory in trajectories:
+            writer.add(trajectory, name=name)
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def _pad_to(f, position):
+    f.write(b'\0' * (position - f.tell()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Würfe in ein binäres .htarch-Archiv packen')
+    parser.add_argument('archive', help='Ziel-Archiv (.htarch)')
+    parser.add_argument('inputs', nargs='+', help='CSV-Dateien, Xcode-Logs oder Verzeichnisse')
+    args = parser.parse_args(argv)
+
+    def named_trajectories():
+        for path in collect_files(args.inputs):
+            for block, trajectory in enumerate(iter_trajectories(path)):
+                yield f"{path}:{block}", trajectory
+
+    write_archive(args.archive, named_trajectories())
+    archive = TrajectoryArchive(args.archive)
+    print(f"✅ {len(archive)} Würfe ({archive.header['points']} Punkte) gespeichert: {args.archive}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
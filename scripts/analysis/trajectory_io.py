@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer Trajektorien-Loader
+===============================
+Liest den `Frame,X,Y`-Block, den HammerTracker.analyzeTrajectory ins Log
+schreibt, aus CSV-Dateien, stdin oder rohen Xcode-Logs direkt in sortierte,
+zusammenhängende NumPy-Arrays.
+
+- Gelesen wird in festen Byte-Blöcken (CHUNK_BYTES pro Schritt)
+- Jeder Block wird vektorisiert geprüft und geparst - KEIN Dict pro Punkt
+- Im Log endet ein Datenblock an der ersten Zeile, die kein `Frame,X,Y` ist
+
+Verwendung:
+    from trajectory_io import load_trajectory
+    traj = load_trajectory('wurf.csv')      # oder '-' für stdin
+    traj.frames, traj.x, traj.y
+"""
+
+import io
+import os
+import re
+import sys
+from contextlib import suppress
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+HEADER = b'Frame,X,Y'
+CHUNK_BYTES = 1 << 23  # 8 MB pro Leseschritt (~300k Zeilen)
+FORMAT_CHUNK_ROWS = 1 << 20  # Zeilen pro Schritt in format_trajectory_csv
+ARCHIVE_MAGIC = b'HTARCH\x00\x01'  # siehe trajectory_archive.py
+FILE_PATTERNS = ('*.csv', '*.log', '*.txt', '*.htarch')
+
+_HEADER_RE = re.compile(rb'^[ \t]*Frame,X,Y[ \t\r]*$', re.MULTILINE)
+_NUMBER = rb'[ \t]*[-+0-9.eE]+[ \t]*'
+_DATA_LINES_RE = re.compile(rb'(?:' + _NUMBER + rb',' + _NUMBER + rb',' + _NUMBER + rb'\r?\n)*')
+
+# Zeichen, die in einer Datenzeile vorkommen dürfen
+_ALLOWED = np.zeros(256, dtype=bool)
+_ALLOWED[np.frombuffer(b'0123456789.-+eE,\t\r\n ', dtype=np.uint8)] = True
+
+
+@dataclass(frozen=True)
+class Trajectory:
+    """Eine Trajektorie als Spalten-Arrays, nach Frame sortiert.
+
+    Die Spalten entsprechen TrackedFrame in HammerTracker.swift. Aus dem
+    `Frame,X,Y`-Log kommen nur frames/x/y, der Rest bleibt None.
+    """
+    frames: np.ndarray              # int32, Original-Video-Framenummer
+    x: np.ndarray                   # normalisiert (0-1)
+    y: np.ndarray                   # normalisiert (0-1), Y=0 ist oben
+    confidence: np.ndarray = None   # Detektions-Konfidenz
+    timestamp: np.ndarray = None    # Sekunden
+    torso_angle: np.ndarray = None  # Grad, NaN = kein Torso-Winkel
+
+    def __len__(self):
+        return len(self.frames)
+
+
+def load_trajectory(source, throw=0, chunk_bytes=CHUNK_BYTES):
+    """Lädt einen Wurf aus Datei, Pfad, '-' (stdin) oder .htarch-Archiv.
+
+    `throw` wählt den n-ten `Frame,X,Y`-Block (bzw. im Archiv Index oder Name).
+    """
+    if is_archive(source):
+        from trajectory_archive import TrajectoryArchive
+        return TrajectoryArchive(source)[throw]
+
+    for trajectory in islice(iter_trajectories(source, chunk_bytes=chunk_bytes), throw, None):
+        return trajectory
+    raise ValueError(f"Kein 'Frame,X,Y'-Block Nr. {throw} gefunden in {source!r}")
+
+
+def parse_trajectory(text):
+    """Parst einen eingebetteten CSV-String (z.B. `csv_data` in den Skripten)."""
+    return load_trajectory(io.BytesIO(text.encode('utf-8')))
+
+
+def iter_trajectories(source, chunk_bytes=CHUNK_BYTES):
+    """Liefert jeden `Frame,X,Y`-Block (bzw. jeden Archiv-Wurf) als eigene Trajektorie."""
+    if is_archive(source):
+        from trajectory_archive import TrajectoryArchive
+        yield from TrajectoryArchive(source)
+        return
+
+    stream, close = _open_binary(source)
+    try:
+        yield from _scan_blocks(_iter_chunks(stream, chunk_bytes))
+    finally:
+        if close:
+            stream.close()
+
+
+def read_block_at(buf, pos, header_before=None):
+    """Liest den `Frame,X,Y`-Block ab Offset `pos` aus einem Puffer (bytes, mmap).
+
+    Der Header wird zwischen `pos` und `header_before` gesucht; kopiert wird
+    nur der Datenblock selbst, nie der Rest des Puffers. Gibt (Trajektorie,
+    Ende-Offset) zurück oder (None, pos), wenn dort kein Header steht.
+    """
+    match = _HEADER_RE.search(buf, pos, len(buf) if header_before is None else header_before)
+    if match is None:
+        return None, pos
+    start = min(match.end() + 1, len(buf))
+    end = _DATA_LINES_RE.match(buf, start).end()
+    values = _loadtxt(bytes(buf[start:end])) if end > start else np.empty((0, 3))
+    return _build_trajectory([values]), end
+
+
+def write_trajectory_csv(trajectory, path):
+    """Schreibt eine Trajektorie im `Frame,X,Y`-Format von HammerTracker."""
+    with open(path, 'wb') as f:
+        f.write(format_trajectory_csv(trajectory))
+
+
+def format_trajectory_csv(trajectory, header=True, offsets=None):
+    """`Frame,X,Y`-Block als Bytes - vektorisiert, ohne Formatierung pro Zeile.
+
+    X/Y mit 6 Nachkommastellen, Byte für Byte wie printf('%.6f') - auch an
+    Rundungsgrenzen (siehe _round_micro) - aber für Millionen Zeilen geeignet.
+
+    Args:
+        offsets: mehrere Würfe hintereinander (Wurf i = Zeilen offsets[i]:offsets[i+1]);
+            jeder Wurf bekommt seinen eigenen Header, leere Würfe entfallen
+    """
+    n = len(trajectory.frames)
+    starts = np.zeros(n, dtype=bool)
+    if offsets is not None:
+        starts[np.asarray(offsets[:-1])[np.diff(offsets) > 0]] = True
+    elif n:
+        starts[0] = True
+    parts = [HEADER + b'\n'] if header and not n else []
+    for start in range(0, n, FORMAT_CHUNK_ROWS):
+        rows = slice(start, min(start + FORMAT_CHUNK_ROWS, n))
+        frames = np.asarray(trajectory.frames[rows], dtype=np.int64)
+        columns = [_sign_byte(frames), _digit_bytes(np.abs(frames))]
+        if header:
+            header_bytes = np.zeros((len(frames), len(HEADER) + 1), dtype=np.uint8)
+            header_bytes[starts[rows]] = np.frombuffer(HEADER + b'\n', dtype=np.uint8)
+            columns.insert(0, header_bytes)
+        for values in (trajectory.x[rows], trajectory.y[rows]):
+            values = np.asarray(values, dtype=np.float64)
+            micro = _round_micro(np.abs(values))
+            columns += [_constant_byte(b',', len(micro)), _sign_byte(values),
+                        _digit_bytes(micro // 1_000_000), _constant_byte(b'.', len(micro)),
+                        _digit_bytes(micro % 1_000_000, width=6)]
+        columns.append(_constant_byte(b'\n', len(frames)))
+        table = np.hstack(columns)
+        parts.append(table[table != 0].tobytes())  # 0 = Füllbyte variabler Breite
+    return b''.join(parts)
+
+
+def collect_files(inputs, patterns=FILE_PATTERNS):
+    """Dateien und Verzeichnisse (rekursiv) zu einer sortierten Dateiliste."""
+    files = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            for pattern in patterns:
+                files.extend(item.rglob(pattern))
+        else:
+            files.append(item)
+    return sorted(set(files))
+
+
+def is_archive(source):
+    """True, wenn `source` ein Pfad auf ein .htarch-Archiv ist (Magic-Bytes)."""
+    if not isinstance(source, (str, os.PathLike)) or str(source) == '-':
+        return False
+    with suppress(OSError):
+        with open(source, 'rb') as f:
+            return f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+    return False
+
+
+def _open_binary(source):
+    """Öffnet die Quelle binär. Gibt (stream, muss_geschlossen_werden) zurück."""
+    if isinstance(source, (str, os.PathLike)):
+        if str(source) == '-':
+            return sys.stdin.buffer, False
+        return open(source, 'rb'), True
+    if isinstance(source, io.TextIOBase):
+        if hasattr(source, 'buffer'):
+            return source.buffer, False
+        return io.BytesIO(source.read().encode('utf-8')), True
+    return source, False
+
+
+def _iter_chunks(stream, chunk_bytes):
+    """Liest feste Byte-Blöcke, die immer an einem Zeilenende aufhören."""
+    carry = b''
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = carry + data
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry:
+        yield carry + b'\n'
+
+
+def _scan_blocks(chunks):
+    """Zustandsautomat: Header suchen, dann Datenzeilen bis zur ersten Nicht-Datenzeile."""
+    parts = None  # None = außerhalb eines Blocks
+
+    for buf in chunks:
+        pos = 0
+        while pos < len(buf):
+            if parts is None:
+                match = _HEADER_RE.search(buf, pos)
+                if match is None:
+                    break
+                pos = match.end() + 1
+                parts = []
+                continue
+
+            values, end = _parse_block(buf, pos)
+            if len(values):
+                parts.append(values)
+
+            if end < len(buf):
+                # Block endet in diesem Puffer - ab der Abbruchzeile weitersuchen
+                if parts:
+                    yield _build_trajectory(parts)
+                parts = None
+            pos = end
+
+    if parts:
+        yield _build_trajectory(parts)
+
+
+def _parse_block(buf, pos):
+    """Parst Datenzeilen ab `pos`. Gibt (Werte, Ende-Offset) zurück.
+
+    Reine CSV-Puffer gehen direkt durch `np.loadtxt`; nur wenn der Block
+    im Puffer endet (Log-Zeile, Leerzeile), wird die Byte-Prüfung nötig.
+    Geprüft wird höchstens bis zum nächsten Header - sonst würde jeder
+    Block eines Puffers mit vielen Würfen den ganzen Rest erneut lesen.
+    """
+    next_header = buf.find(HEADER, pos)  # Zeile mit Header-Text ist nie eine Datenzeile
+    if next_header < 0 and buf.find(b'\n\n', pos) < 0 and buf[pos:pos + 1] != b'\n':
+        try:
+            return _loadtxt(buf[pos:]), len(buf)
+        except ValueError:
+            pass
+    limit = buf.rfind(b'\n', pos, next_header) + 1 if next_header >= 0 else len(buf)
+    end = _valid_prefix_end(buf, pos, max(limit, pos))
+    return _parse_lines(buf[pos:end], pos)
+
+
+def _valid_prefix_end(buf, pos, limit=None):
+    """Byte-Offset, an dem die gültigen Datenzeilen ab `pos` (bis höchstens `limit`) enden.
+
+    Vektorisierte Byte-Prüfung: genau zwei Kommas pro Zeile und nur
+    Zeichen, die in Zahlen vorkommen.
+    """
+    limit = len(buf) if limit is None else limit
+    a = np.frombuffer(buf, dtype=np.uint8, count=limit - pos, offset=pos)
+    newlines = np.flatnonzero(a == 10)
+    commas = np.flatnonzero(a == 44)
+
+    ok = np.diff(np.searchsorted(commas, newlines), prepend=0) == 2
+    bad_chars = np.flatnonzero(~_ALLOWED[a])
+    if len(bad_chars):
+        ok[np.searchsorted(newlines, bad_chars[0]):] = False
+
+    n_valid = int(np.argmin(ok)) if not ok.all() else len(ok)
+    return pos + (int(newlines[n_valid - 1]) + 1 if n_valid else 0)
+
+
+def _parse_lines(data, pos):
+    """Parst geprüfte Datenzeilen zu einem (n, 3)-Array.
+
+    Schneller Pfad: ein einziger `np.loadtxt`-Aufruf über den ganzen Puffer.
+    Ist eine Zeile trotz Byte-Prüfung nicht parsebar (z.B. "1,,2"), wird
+    zeilenweise bis dorthin geparst. Gibt (Werte, Ende-Offset) zurück.
+    """
+    if not data:
+        return np.empty((0, 3)), pos
+    try:
+        return _loadtxt(data), pos + len(data)
+    except ValueError:
+        pass
+
+    rows = []
+    consumed = 0
+    for line in data.splitlines(keepends=True):
+        try:
+            frame, x, y = (float(v) for v in line.split(b','))
+        except ValueError:
+            break
+        rows.append((frame, x, y))
+        consumed += len(line)
+    return np.array(rows, dtype=np.float64).reshape(-1, 3), pos + consumed
+
+
+def _digit_bytes(values, width=None):
+    """Nicht-negative Ganzzahlen als (n × Breite)-ASCII-Matrix, führende Stellen als 0-Füllbyte.
+
+    Mit `width` wird stattdessen mit führenden Nullen auf genau `width` Stellen aufgefüllt.
+    """
+    fixed = width is not None
+    if not fixed:
+        width = len(str(int(values.max()))) if len(values) else 1
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = ((values[:, None] // powers) % 10 + ord('0')).astype(np.uint8)
+    if not fixed:
+        digits[(values[:, None] < powers) & (powers > 1)] = 0
+    return digits
+
+
+def _round_micro(values):
+    """round(values · 10⁶) exakt wie printf, ohne Rundungsfehler der Multiplikation.
+
+    values · 10⁶ wird als Summe p + e ohne Fehler berechnet (Dekker-Produkt);
+    e entscheidet, auf welche Seite ein scheinbarer .5-Fall wirklich fällt.
+    """
+    p = values * 1e6
+    hi = values * 134217729.0  # 2^27 + 1: Aufteilung in je 26 Mantissen-Bits
+    hi = hi - (hi - values)
+    lo = values - hi
+    error = ((hi * 1e6 - p) + lo * 1e6)  # 10⁶ ist in 26 Bits exakt
+    micro = np.rint(p)
+    rest = (p - micro) + error
+    micro += (rest > 0.5).astype(np.float64) - (rest < -0.5)
+    return micro.astype(np.int64)
+
+
+def _sign_byte(values):
+    return np.where(np.signbit(values), ord('-'), 0).astype(np.uint8)[:, None]
+
+
+def _constant_byte(char, n):
+    return np.full((n, 1), ord(char), dtype=np.uint8)
+
+
+def _loadtxt(data):
+    return np.loadtxt(io.BytesIO(data), delimiter=',', comments=None,
+                      dtype=np.float64, ndmin=2)
+
+
+def _build_trajectory(chunks):
+    """Fügt die Blöcke zu sortierten, zusammenhängenden Spalten-Arrays zusammen."""
+    if chunks:
+        data = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+    else:
+        data = np.empty((0, 3))
+
+    frames = data[:, 0].astype(np.int32)
+    x = np.ascontiguousarray(data[:, 1])
+    y = np.ascontiguousarray(data[:, 2])
+
+    # WICHTIG: Nach Frame sortieren! (stabil, nur wenn nötig)
+    if len(frames) > 1 and np.any(frames[1:] < frames[:-1]):
+        order = np.argsort(frames, kind='stable')
+        frames, x, y = frames[order], x[order], y[order]
+
+    return Trajectory(frames=frames, x=x, y=y)
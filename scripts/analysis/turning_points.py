@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Umkehrpunkt-Erkennung (FEDERUNGS-LOGIK) - vektorisiert
+=====================================================
+NumPy-Port von HammerTracker.findTurningPoints und
+HammerTracker.filterSignificantTurningPoints.
+
+- TP0 ist IMMER der erste erkannte Punkt
+- Umkehrpunkt = Vorzeichenwechsel von dx (nur X-Achse)
+- dx == 0 ändert die Richtung nicht (Richtung wird weitergetragen)
+- Der Punkt VOR dem Wechsel ist der Umkehrpunkt
+- Danach optional: Signifikanz-Filter (minDistance / minFrames)
+
+Alle Indizes sind Indizes ins Punkte-Array (wie TurningPoint.frameIndex
+in Swift), NICHT Video-Framenummern.
+"""
+
+import math
+
+import numpy as np
+
+MIN_DISTANCE = 0.08  # Mindestens 8% Bildbreite Bewegung
+MIN_FRAMES = 5       # Mindestens 5 Frames zwischen Umkehrpunkten
+
+TP_START = 'START'
+TP_MAXIMUM = 'MAXIMUM'
+TP_MINIMUM = 'MINIMUM'
+
+
+def find_turning_points(x):
+    """Alle X-Richtungswechsel, ohne Schwellwerte.
+
+    Returns:
+        (index, is_maximum) - index[0] ist immer 0 (START, is_maximum=False)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) <= 2:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=bool)
+
+    direction = np.sign(np.diff(x))
+
+    # dx == 0 überspringen: Richtung wird vom letzten echten dx weitergetragen
+    moving = np.flatnonzero(direction)
+    moving_direction = direction[moving]
+
+    # Wechsel zwischen aufeinanderfolgenden echten Bewegungen.
+    # moving[k] ist der Index des Punkts VOR dem k-ten echten dx = Umkehrpunkt.
+    changed = moving_direction[1:] != moving_direction[:-1]
+    index = np.concatenate(([0], moving[1:][changed]))
+    is_maximum = np.concatenate(([False], moving_direction[:-1][changed] > 0))
+    return index, is_maximum
+
+
+def filter_significant_turning_points(index, is_maximum, x, y,
+                                      min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Behält nur bedeutende Umkehrpunkte (wie filterSignificantTurningPoints).
+
+    Ein Kandidat wird akzeptiert, wenn er vom zuletzt AKZEPTIERTEN Punkt
+    mindestens `min_distance` (euklidisch) und `min_frames` Indizes entfernt
+    ist. Diese Abhängigkeit ist sequenziell - die Schleife läuft deshalb nur
+    über die (wenigen) Kandidaten aus find_turning_points, nie über alle Frames.
+    """
+    index = np.asarray(index)
+    is_maximum = np.asarray(is_maximum)
+    if len(index) <= 1:
+        return index, is_maximum
+
+    candidates = index.tolist()
+    tp_x = np.asarray(x, dtype=np.float64)[index].tolist()
+    tp_y = np.asarray(y, dtype=np.float64)[index].tolist()
+
+    # Erster Punkt ist immer dabei (Startpunkt)
+    accepted = [0]
+    last_index, last_x, last_y = candidates[0], tp_x[0], tp_y[0]
+    for k in range(1, len(candidates)):
+        dx = tp_x[k] - last_x
+        dy = tp_y[k] - last_y
+        if candidates[k] - last_index >= min_frames and math.sqrt(dx * dx + dy * dy) >= min_distance:
+            accepted.append(k)
+            last_index, last_x, last_y = candidates[k], tp_x[k], tp_y[k]
+
+    accepted = np.asarray(accepted, dtype=np.intp)
+    return index[accepted], is_maximum[accepted]
+
+
+def detect_turning_points(x, y, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES):
+    """Entspricht HammerTracker.findTurningPoints: Erkennung + Filter."""
+    index, is_maximum = find_turning_points(x)
+    return filter_significant_turning_points(index, is_maximum, x, y,
+                                             min_distance=min_distance, min_frames=min_frames)
+
+
+def turning_point_types(is_maximum):
+    """'START' / 'MAXIMUM' / 'MINIMUM' pro Umkehrpunkt (für Ausgaben und Plots)."""
+    types = np.where(np.asarray(is_maximum), TP_MAXIMUM, TP_MINIMUM).astype(object)
+    if len(types):
+        types[0] = TP_START
+    return types
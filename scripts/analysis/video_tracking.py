@@ -0,0 +1,910 @@
+#!/usr/bin/env python3
+"""
+Video-Pipeline: Hammer-Erkennung ohne iPhone
+============================================
+Linux-Gegenstück zu HammerTracker.processVideo für archivierte Vereins-
+Videos: dekodiert ein Video, ruft pro Frame einen austauschbaren Detektor
+auf und liefert TrackedFrame-Datensätze (bzw. eine Trajectory).
+
+- Dekodieren: ffmpeg (rawvideo-Pipe, selbst mehrfädig) wird von einem
+  Hintergrund-Thread in einen Ring wiederverwendbarer Frame-Puffer gelesen
+  - keine neue Allokation pro Frame, der Dekoder läuft der Erkennung voraus
+- Erkennung: Thread-Pool (onnxruntime gibt den GIL frei), Ergebnisse in
+  Frame-Reihenfolge
+- Detektoren: OnnxDetector (YOLO-Export, CPU) oder ReplayDetector (spielt
+  geloggte Positionen ab - zum Testen der Pipeline ohne Modell)
+- Wie detectHammer: beste Detektion pro Frame, nur ab Konfidenz 0.3
+- Adaptive Schrittweite (AdaptiveStride): in der langsamen Anschwung-Phase
+  wird nur jeder n-te Frame detektiert, nahe vorhergesagter Umkehrpunkte
+  jeder; übersprungene Frames werden linear interpoliert
+- Ausschnitt (RegionOfInterest): detektiert wird nur ein Fenster um die
+  vorhergesagte Position, nach einem Fehlschlag im ganzen Frame; mit
+  --kalman sagt ein KalmanTracker die Position samt Unsicherheit für dieses
+  Fenster voraus (die Schrittweite von --adaptive bleibt davon unberührt)
+- Lücken: --bridge füllt fehlende Frames mit Kalman-Schätzungen (kalman.py)
+- Start per Pose (--pose): dekodiert wird erst ab jedem Wurf-Start aus der
+  Pose-Aufnahme (start_detection.py) und wie live nach einer Sekunde ohne
+  Hammer beendet (maxFramesWithoutHammer) - ein Wurf pro Start
+- Wie processVideo: Orientierung aus der Rotations-Metadaten des Videos
+  (orientationFromTransform), der Detektor sieht das aufrecht gedrehte Bild,
+  boundingBox normalisiert mit Ursprung unten links (Vision)
+
+Benötigt ffmpeg/ffprobe im PATH, für OnnxDetector zusätzlich onnxruntime.
+
+Verwendung:
+    python video_tracking.py wurf.mov --model best.onnx -o wurf.csv
+    python video_tracking.py videos/ --model best.onnx -o saison.htarch -j 4
+    python video_tracking.py wurf.mov --replay wurf.csv   # ohne Modell
+    python video_tracking.py videos/ --model best.onnx --adaptive --max-stride 4
+    python video_tracking.py videos/ --model best.onnx --roi   # kleine Eingaben bei dynamischem Modell
+    python video_tracking.py videos/ --model best.onnx --roi --kalman --bridge 8
+    python video_tracking.py videos/ --model best.onnx --pose posen/   # posen/<video>.npz
+"""
+
+import argparse
+import json
+import math
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from kalman import KalmanTracker, bridge_gaps
+from live_analysis import LiveEllipseDetector
+from trajectory_io import Trajectory, format_trajectory_csv, load_trajectory
+from turning_points import MIN_DISTANCE, MIN_FRAMES
+
+CONFIDENCE_THRESHOLD = 0.3  # wie HammerTracker.confidenceThreshold
+FRAME_BUFFERS = 8           # Puffer im Dekoder-Ring
+REPLAY_BOX_SIZE = 0.04      # Kantenlänge der abgespielten Boxen (normalisiert)
+MAX_STRIDE = 8              # adaptive Schrittweite: höchstens jeder 8. Frame
+STRIDE_STEP = 0.25          # erlaubte vorhergesagte Bewegung zwischen zwei Detektionen (normalisiert)
+TURN_MARGIN = 2             # Frames Reserve vor einem vorhergesagten Umkehrpunkt
+TURN_TOLERANCE = 0.01       # kleinere X-Schritte zwischen Treffern gelten als möglicher Richtungswechsel
+TIMEOUT_SECONDS = 1.0       # maxFramesWithoutHammer: 60 Frames bei 60 fps
+MISS_PATIENCE = 15          # Fehlschläge in Folge, ab denen nur noch stichprobenartig detektiert wird
+ROI_CONTEXT = 4.0           # Fenster-Seite mindestens 4 × Box-Größe ...
+ROI_MIN_SIZE = 0.15         # ... und 15 % der kürzeren Bildseite
+ROI_MAX_SIZE = 0.6          # größere Fenster lohnen nicht → ganzer Frame
+ROI_MOTION_MARGIN = 0.5     # Reserve je Seite in Anteilen der vorhergesagten Bewegung
+ROI_INPUT_SIZE = 320        # Eingabe-Größe für Ausschnitte (nur Modelle mit dynamischer Größe)
+ROI_SIGMAS = 3.0            # mit KalmanTracker: Reserve je Seite in Standardabweichungen der Vorhersage
+VIDEO_PATTERNS = ('*.mov', '*.mp4', '*.m4v')
+POSE_SUFFIXES = ('.npz', '.npy')
+
+# CGImagePropertyOrientation (ohne Mirrored) → Drehung im Uhrzeigersinn in Grad
+ORIENTATIONS = {'up': 0, 'right': 90, 'down': 180, 'left': 270}
+INVERSE_ORIENTATIONS = {'up': 'up', 'right': 'left', 'down': 'down', 'left': 'right'}
+
+_END = object()
+
+
+@dataclass(frozen=True)
+class TrackedFrame:
+    """Wie TrackedFrame in HammerTracker.swift.
+
+    bounding_box ist (x, y, Breite, Höhe) normalisiert im aufrecht gedrehten
+    Bild, Ursprung unten links - wie VNRecognizedObjectObservation.boundingBox.
+    """
+    frame_number: int      # Original-Video-Framenummer
+    bounding_box: tuple
+    confidence: float
+    timestamp: float       # Sekunden
+    torso_angle: float = None
+    interpolated: bool = False  # übersprungener Frame (adaptive Schrittweite), nicht detektiert
+
+
+@dataclass(frozen=True)
+class VideoInfo:
+    width: int             # Puffer-Größe (naturalSize, vor der Drehung)
+    height: int
+    fps: float
+    orientation: str       # Schlüssel von ORIENTATIONS
+
+    @property
+    def display_size(self):
+        """Größe nach der Drehung (videoDisplaySize)."""
+        if self.orientation in ('left', 'right'):
+            return self.height, self.width
+        return self.width, self.height
+
+
+@dataclass(frozen=True)
+class DecodedFrame:
+    number: int
+    timestamp: float
+    image: np.ndarray      # (Höhe, Breite, 3) uint8 RGB, Puffer-Orientierung
+    slot: int = None       # Puffer im Ring (FrameReader.release)
+
+
+def probe_video(path):
+    """Größe, Bildrate und Orientierung über ffprobe."""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_streams', '-of', 'json', str(path)],
+        check=True, capture_output=True)
+    streams = json.loads(result.stdout).get('streams')
+    if not streams:
+        raise ValueError(f"Keine Video-Spur gefunden in {path}")  # wie processVideo: "No video track found"
+    stream = streams[0]
+    return VideoInfo(int(stream['width']), int(stream['height']), _frame_rate(stream),
+                     orientation_from_rotation(_rotation(stream), stream['width'], stream['height']))
+
+
+def orientation_from_rotation(clockwise, width, height):
+    """Wie orientationFromTransform: Drehung (Grad, im Uhrzeigersinn) → Orientierung.
+
+    Krumme Winkel werden wie in Swift über das Seitenverhältnis geraten.
+    """
+    for orientation, degrees in ORIENTATIONS.items():
+        if math.isclose(clockwise % 360, degrees):
+            return orientation
+    if round(clockwise / 90) % 2:
+        width, height = height, width
+    return 'right' if width < height else 'up'
+
+
+def transform_bounding_box(boxes, orientation):
+    """Wie transformBoundingBox: normalisierte Boxen (x, y, w, h) vom Puffer in die Anzeige.
+
+    Vektorisiert über ein (n, 4)-Array.
+    """
+    x, y, w, h = np.moveaxis(np.asarray(boxes, dtype=np.float64), -1, 0)
+    if orientation == 'down':
+        return np.stack((1 - (x + w), 1 - (y + h), w, h), axis=-1)
+    if orientation == 'left':
+        return np.stack((1 - (y + h), x, h, w), axis=-1)
+    if orientation == 'right':
+        return np.stack((y, 1 - (x + w), h, w), axis=-1)
+    return np.stack((x, y, w, h), axis=-1)
+
+
+def orient_image(image, orientation):
+    """Aufrecht gedrehtes Bild wie Vision es mit `orientation` sieht - eine View, keine Kopie."""
+    return np.rot90(image, k=-ORIENTATIONS[orientation] // 90)
+
+
+def crop_region(image, window, orientation):
+    """Ausschnitt `window` (normalisiert in der Anzeige, wie boundingBox) aus dem Puffer-Bild.
+
+    Das Fenster wird mit transformBoundingBox-Logik (umgekehrte Drehung) in
+    den Puffer übertragen und dort zusammenhängend ausgeschnitten; gedreht
+    wird nur der Ausschnitt.
+
+    Returns:
+        (aufrecht gedrehter Ausschnitt als View, tatsächliches Fenster nach Pixel-Rundung)
+    """
+    height, width = image.shape[:2]
+    x, y, w, h = transform_bounding_box(window, INVERSE_ORIENTATIONS[orientation])
+    left = min(max(math.floor(x * width), 0), width - 1)
+    right = min(max(math.ceil((x + w) * width), left + 1), width)
+    top = min(max(math.floor((1 - (y + h)) * height), 0), height - 1)  # Ursprung unten links → Zeilen
+    bottom = min(max(math.ceil((1 - y) * height), top + 1), height)
+    actual = (left / width, 1 - bottom / height, (right - left) / width, (bottom - top) / height)
+    return (orient_image(image[top:bottom, left:right], orientation),
+            tuple(transform_bounding_box(actual, orientation).tolist()))
+
+
+def region_to_frame(boxes, window):
+    """Boxen relativ zum Ausschnitt `window` → normalisiert im ganzen Frame."""
+    x, y, w, h = window
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4) * [w, h, w, h] + [x, y, 0, 0]
+
+
+class FrameReader:
+    """Dekodiert ein Video im Hintergrund in einen Ring wiederverwendbarer Puffer.
+
+    Jeder gelieferte Frame belegt seinen Puffer, bis release(frame.slot)
+    aufgerufen wird; ist der Ring voll, wartet der Dekoder. Mit
+    `start_frame` springt ffmpeg direkt dorthin (-ss vor -i: ab dem
+    Keyframe davor dekodiert, aber erst ab dem Frame ausgegeben).
+
+        with FrameReader('wurf.mov') as reader:
+            for frame in reader:
+                ...
+                reader.release(frame.slot)
+    """
+
+    def __init__(self, path, buffers=FRAME_BUFFERS, decode_threads=0, start_frame=0):
+        self.path = str(path)
+        self.info = probe_video(path)
+        self.decode_threads = decode_threads
+        self.start_frame = start_frame
+        self._buffers = np.empty((buffers, self.info.height, self.info.width, 3), dtype=np.uint8)
+        self._free = queue.Queue()
+        self._ready = queue.Queue()
+        self._process = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        for slot in range(len(self._buffers)):
+            self._free.put(slot)
+        # -noautorotate: Puffer wie bei AVAssetReader, gedreht wird erst für den Detektor
+        seek = ['-ss', f"{self.start_frame / self.info.fps:.6f}"] if self.start_frame else []
+        self._process = subprocess.Popen(
+            ['ffmpeg', '-v', 'error', '-noautorotate', '-threads', str(self.decode_threads), *seek, '-i', self.path,
+             '-map', '0:v:0', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'],
+            stdout=subprocess.PIPE, bufsize=0)
+        self._thread = threading.Thread(target=self._decode, name='hammertrack-decode', daemon=True)
+        self._thread.start()
+
+    def release(self, slot):
+        """Gibt den Puffer eines Frames an den Dekoder zurück."""
+        self._free.put(slot)
+
+    def close(self):
+        if self._process is not None:
+            self._process.kill()
+        if self._thread is not None:
+            self._free.put(None)
+            self._thread.join()
+        if self._process is not None:
+            self._process.wait()
+            self._process.stdout.close()
+        self._process = self._thread = None
+
+    def __iter__(self):
+        while True:
+            item = self._ready.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def _decode(self):
+        try:
+            number = self.start_frame
+            while True:
+                slot = self._free.get()
+                if slot is None:  # close() vor dem Ende des Videos
+                    return
+                if not _read_exactly(self._process.stdout, self._buffers[slot]):
+                    break
+                self._ready.put(DecodedFrame(number, number / self.info.fps, self._buffers[slot], slot))
+                number += 1
+            if self._process.wait():
+                raise subprocess.CalledProcessError(self._process.returncode, 'ffmpeg')
+        except BaseException as error:  # im Verbraucher-Thread erneut werfen
+            self._ready.put(error)
+        finally:
+            self._ready.put(_END)
+
+
+class OnnxDetector:
+    """YOLO-Modell im ONNX-Format (z.B. `yolo export format=onnx`) auf der CPU.
+
+    Eingabe wird ohne Rand auf die Modell-Größe gestreckt (nächster Nachbar);
+    Ausgabe (1, 4 + Klassen, Kandidaten) mit cx, cy, w, h in Eingabe-Pixeln.
+    Hat das Modell eine dynamische Eingabe-Größe, laufen Ausschnitte
+    (`region`) mit roi_input_size statt input_size - deutlich schneller.
+    """
+
+    def __init__(self, model_path, input_size=640, roi_input_size=ROI_INPUT_SIZE, threads=0):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(str(model_path), options,
+                                                    providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        height, width = model_input.shape[2:4]
+        self.dynamic = not (isinstance(height, int) and isinstance(width, int))
+        self.input_size = (height if isinstance(height, int) else input_size,
+                           width if isinstance(width, int) else input_size)
+        self.roi_input_size = (roi_input_size, roi_input_size) if self.dynamic else self.input_size
+        self._local = threading.local()  # Eingabe-Tensoren pro Thread, wiederverwendet
+
+    def detect(self, image, frame_number=None, region=None):
+        """Returns (Boxen (n, 4) normalisiert wie Vision, Konfidenzen (n,)) relativ zu `image`."""
+        size = self.input_size if region is None else self.roi_input_size
+        height, width = size
+        tensor = self._tensor(size)
+        rows, cols = _resize_index(image.shape[:2], size)
+        np.multiply(image[rows[:, None], cols].transpose(2, 0, 1), 1 / 255, out=tensor[0], casting='unsafe')
+        output = self.session.run(None, {self._input_name: tensor})[0][0]
+        if output.shape[0] > output.shape[1]:
+            output = output.T  # (Kandidaten, 4 + Klassen)-Export
+        scores = output[4:].max(axis=0)
+        cx, cy, w, h = output[:4] / np.array([[width], [height], [width], [height]])
+        return np.stack((cx - w / 2, 1 - (cy + h / 2), w, h), axis=-1), scores
+
+    def _tensor(self, size):
+        tensors = getattr(self._local, 'tensors', None)
+        if tensors is None:
+            tensors = self._local.tensors = {}
+        if size not in tensors:
+            tensors[size] = np.empty((1, 3, *size), dtype=np.float32)
+        return tensors[size]
+
+
+class ReplayDetector:
+    """Stub ohne Modell: spielt geloggte Positionen (Frame,X,Y) als Detektionen ab.
+
+    Die Box liegt zentriert auf (x, y) wie boundingBox.midX/midY im Log;
+    ohne Konfidenz-Spalte gilt 1.0. Mit `region` (Ausschnitt) zählt die
+    Position nur, wenn sie im Ausschnitt liegt, und kommt relativ zu ihm.
+    """
+
+    def __init__(self, trajectory, box_size=REPLAY_BOX_SIZE):
+        self.trajectory = trajectory
+        self.box_size = box_size
+        self._index = dict(zip(np.asarray(trajectory.frames).tolist(), range(len(trajectory))))
+
+    def detect(self, image, frame_number=None, region=None):
+        index = self._index.get(frame_number)
+        if index is None:
+            return np.empty((0, 4)), np.empty(0)
+        half = self.box_size / 2
+        x, y = self.trajectory.x[index], self.trajectory.y[index]
+        box = np.array([[x - half, y - half, self.box_size, self.box_size]])
+        if region is not None:
+            rx, ry, rw, rh = region
+            if not (rx <= x <= rx + rw and ry <= y <= ry + rh):
+                return np.empty((0, 4)), np.empty(0)
+            box = (box - [rx, ry, 0, 0]) / [rw, rh, rw, rh]
+        confidence = 1.0 if self.trajectory.confidence is None else self.trajectory.confidence[index]
+        return box, np.array([confidence])
+
+
+class AdaptiveStride:
+    """Bewegungsabhängige Schrittweite für den Detektor.
+
+    Aus den letzten drei Treffern werden Geschwindigkeit und X-Beschleunigung
+    geschätzt. Die Schrittweite ist so groß, dass sich der Hammer bis zur
+    nächsten Detektion um höchstens `step` bewegt (maximal `max_stride`
+    Frames); läuft die X-Geschwindigkeit innerhalb dieser Spanne (plus
+    `turn_margin`) auf null zu - ein Umkehrpunkt -, wird jeder Frame
+    detektiert. `calls` / `frames` zählen Detektor-Aufrufe und Frames.
+
+    `turn_tolerance`, `min_distance`, `min_frames` und `miss_patience`
+    steuern, wann übersprungene Frames doch detektiert werden (siehe
+    _track_adaptive).
+    """
+
+    def __init__(self, max_stride=MAX_STRIDE, step=STRIDE_STEP, turn_margin=TURN_MARGIN,
+                 turn_tolerance=TURN_TOLERANCE, min_distance=MIN_DISTANCE, min_frames=MIN_FRAMES,
+                 miss_patience=MISS_PATIENCE):
+        self.max_stride = max_stride
+        self.step = step
+        self.turn_margin = turn_margin
+        self.turn_tolerance = turn_tolerance
+        self.min_distance = min_distance
+        self.min_frames = min_frames
+        self.miss_patience = miss_patience
+        self.calls = 0
+        self.frames = 0
+
+    def next_stride(self, recent):
+        """Frames bis zur nächsten Detektion aus den letzten drei Treffern [(frame, x, y), ...]."""
+        if len(recent) < 3:
+            return 1
+        (f0, x0, _), (f1, x1, y1), (f2, x2, y2) = recent
+        vx = (x2 - x1) / (f2 - f1)
+        speed = math.hypot(vx, (y2 - y1) / (f2 - f1))
+        ax = (vx - (x1 - x0) / (f1 - f0)) * 2 / (f2 - f0)
+        if speed * self.max_stride <= self.step:
+            stride = self.max_stride
+        else:
+            stride = max(1, int(self.step / speed))
+        if vx * ax < 0 and -vx / ax <= stride + self.turn_margin:
+            return 1  # Umkehrpunkt in X voraus
+        return stride
+
+
+class RegionOfInterest:
+    """Fenster um die vorhergesagte Hammer-Position statt des ganzen Frames.
+
+    Vorhersage: letzte boundingBox plus Geschwindigkeit aus den letzten zwei
+    Treffern. Das Fenster ist quadratisch in Pixeln (wie die Modell-Eingabe):
+    `context` × Box-Größe, mindestens `min_size` der kürzeren Bildseite, plus
+    `motion_margin` × Bewegung pro Frame × Abstand² je Seite. Wird es größer als
+    `max_size`, oder fehlen zwei Treffer in Folge (nach einem Fehlschlag), wird
+    der ganze Frame durchsucht. `crops` / `fallbacks` zählen Ausschnitte und
+    Ausschnitte ohne Treffer (dann erneut im ganzen Frame), `area` die
+    summierte Fläche der Ausschnitte.
+
+    Mit einem KalmanTracker als `tracker` kommt die Vorhersage aus dem
+    Filter und die Reserve aus ihrer Unsicherheit (`sigmas` × σ je Seite);
+    ein Fehlschlag löscht sie nicht, die Unsicherheit wächst nur weiter.
+    Der Filter platziert nur das Fenster - wie oft detektiert wird,
+    entscheidet weiter AdaptiveStride aus den Treffern.
+    """
+
+    def __init__(self, context=ROI_CONTEXT, min_size=ROI_MIN_SIZE, max_size=ROI_MAX_SIZE,
+                 motion_margin=ROI_MOTION_MARGIN, tracker=None, sigmas=ROI_SIGMAS):
+        self.context = context
+        self.min_size = min_size
+        self.max_size = max_size
+        self.motion_margin = motion_margin
+        self.tracker = tracker
+        self.sigmas = sigmas
+        self.crops = 0
+        self.fallbacks = 0
+        self.area = 0.0
+        self._hits = deque(maxlen=2)  # (frame, boundingBox)
+
+    def window(self, frame_number, display_size):
+        """Fenster (x, y, w, h) normalisiert in der Anzeige oder None (ganzer Frame)."""
+        if len(self._hits) < 2:
+            return None  # ohne Geschwindigkeit keine Vorhersage
+        (first_frame, first_box), (last_frame, box) = self._hits
+        width, height = display_size
+        side = max(self.context * max(box[2] * width, box[3] * height), self.min_size * min(width, height))
+        if self.tracker is not None:
+            px, py, deviation = self.tracker.predict(frame_number)
+            side += 2 * self.sigmas * deviation * max(width, height)
+        else:
+            fx, fy = _center(first_box)
+            cx, cy = _center(box)
+            vx, vy = (cx - fx) / (last_frame - first_frame), (cy - fy) / (last_frame - first_frame)
+            gap = frame_number - last_frame
+            px, py = cx + vx * gap, cy + vy * gap
+            # Fehler der linearen Vorhersage auf dem Kreis wächst etwa mit gap²
+            side += 2 * self.motion_margin * math.hypot(vx * width, vy * height) * gap * gap
+        if side > self.max_size * min(width, height):
+            return None
+        w, h = side / width, side / height
+        return (min(max(px - w / 2, 0.0), 1 - w), min(max(py - h / 2, 0.0), 1 - h), w, h)
+
+    def update(self, frame_number, detection):
+        """Ergebnis eines Frames: (boundingBox, Konfidenz) oder None (dann wieder ganzer Frame)."""
+        if self._hits and frame_number < self._hits[-1][0]:
+            return  # nachgeholter älterer Frame (adaptive Schrittweite)
+        if detection is None:
+            if self.tracker is None:
+                self._hits.clear()
+        else:
+            self._hits.append((frame_number, detection[0]))
+            if self.tracker is not None:
+                self.tracker.update(frame_number, *_center(detection[0]), detection[1])
+
+
+def best_detection(boxes, scores, threshold=CONFIDENCE_THRESHOLD):
+    """Wie detectHammer: höchste Konfidenz, nur ab `threshold`. Returns (Box, Konfidenz) oder None."""
+    if not len(scores):
+        return None
+    best = int(np.argmax(scores))
+    if scores[best] < threshold:
+        return None
+    return tuple(float(v) for v in boxes[best]), float(scores[best])
+
+
+def track_frames(frames, detector, orientation='up', threshold=CONFIDENCE_THRESHOLD, workers=1, release=None,
+                 stride=None, roi=None, timeout=None):
+    """Erkennung auf einer Folge von DecodedFrames. Returns [TrackedFrame] in Frame-Reihenfolge.
+
+    Mit workers > 1 laufen bis zu 2 × workers Frames gleichzeitig im
+    Thread-Pool; `release(slot)` gibt ihre Puffer danach zurück. Mit einem
+    AdaptiveStride als `stride` wird nicht jeder Frame detektiert (siehe
+    _track_adaptive, dann immer im aufrufenden Thread). Mit einer
+    RegionOfInterest als `roi` wird zuerst nur im Fenster gesucht; im
+    Thread-Pool beruht das Fenster auf den bis dahin fertigen Frames, die
+    Vorhersage reicht also bis zu 2 × workers Frames weit und fällt meist
+    auf den ganzen Frame zurück. Mit `timeout` endet die Erkennung wie live
+    nach so vielen Frames ohne Hammer (ab dem ersten Frame gezählt).
+    """
+    last_hit = None
+
+    def window_for(frame):
+        if roi is None:
+            return None
+        height, width = frame.image.shape[:2]
+        window = roi.window(frame.number, (height, width) if orientation in ('left', 'right') else (width, height))
+        if window is not None:
+            roi.crops += 1
+            roi.area += window[2] * window[3]
+        return window
+
+    def detect(frame, window):
+        """(Boxen im ganzen Frame, Konfidenzen, True wenn nur der Ausschnitt detektiert wurde)."""
+        if window is not None:
+            crop, window = crop_region(frame.image, window, orientation)
+            boxes, scores = detector.detect(crop, frame.number, region=window)
+            if len(scores) and scores.max() >= threshold:
+                return region_to_frame(boxes, window), scores, True
+        boxes, scores = detector.detect(orient_image(frame.image, orientation), frame.number)
+        return boxes, scores, False
+
+    def observe(frame, window, result):
+        boxes, scores, cropped = result
+        if window is not None and not cropped:
+            roi.fallbacks += 1
+        detection = best_detection(boxes, scores, threshold=threshold)
+        if roi is not None:
+            roi.update(frame.number, detection)
+        if detection is not None and timeout is not None:
+            nonlocal last_hit
+            last_hit = max(last_hit, frame.number)
+        return detection
+
+    def until_timeout(frames):
+        nonlocal last_hit
+        for frame in frames:
+            if last_hit is None:
+                last_hit = frame.number - 1
+            if frame.number - last_hit > timeout:
+                return  # framesWithoutHammer >= maxFramesWithoutHammer → completeAnalysis
+            yield frame
+
+    if timeout is not None:
+        frames = until_timeout(frames)
+
+    def locate(frame):
+        window = window_for(frame)
+        return observe(frame, window, detect(frame, window))
+
+    if stride is not None:
+        return _track_adaptive(frames, locate, stride, release)
+
+    tracked = []
+
+    def finish(frame, detection):
+        if release is not None and frame.slot is not None:
+            release(frame.slot)
+        if detection is not None:
+            tracked.append(TrackedFrame(frame.number, detection[0], detection[1], frame.timestamp))
+
+    if workers <= 1:
+        for frame in frames:
+            finish(frame, locate(frame))
+        return tracked
+
+    pending = deque()
+
+    def finish_oldest():
+        frame, window, future = pending.popleft()
+        finish(frame, observe(frame, window, future.result()))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hammertrack-detect') as pool:
+        for frame in frames:
+            if len(pending) >= 2 * workers:
+                finish_oldest()
+            window = window_for(frame)
+            pending.append((frame, window, pool.submit(detect, frame, window)))
+        while pending:
+            finish_oldest()
+    return tracked
+
+
+def track_video(path, detector, threshold=CONFIDENCE_THRESHOLD, workers=1, decode_threads=0, stride=None,
+                roi=None, start_frame=0, timeout=None):
+    """Ein Video ab `start_frame` verarbeiten (mit `timeout` in Sekunden nur bis zum Timeout).
+
+    Returns ([TrackedFrame], VideoInfo).
+    """
+    # mehr Frames in Arbeit (bzw. zurückgehalten) als Puffer → Stillstand
+    held = 2 * workers if stride is None else 2 * stride.max_stride + 2
+    with FrameReader(path, buffers=max(FRAME_BUFFERS, held + 2), decode_threads=decode_threads,
+                     start_frame=start_frame) as reader:
+        timeout_frames = None if timeout is None else max(1, round(timeout * reader.info.fps))
+        tracked = track_frames(reader, detector, reader.info.orientation, threshold, workers, reader.release,
+                               stride, roi, timeout_frames)
+    return tracked, reader.info
+
+
+def _track_adaptive(frames, locate, scheduler, release):
+    """Detektion mit adaptiver Schrittweite.
+
+    Übersprungene Frames bleiben im Puffer, bis über sie entschieden ist:
+    - Wechselt die X-Richtung direkt vor, über oder nach einer Lücke (oder
+      ist ein X-Schritt kleiner als turn_tolerance, also im Rauschen), kann
+      in den Lücken ein Umkehrpunkt liegen → alle zurückgehaltenen Frames
+      detektieren. Ausnahme: alle Treffer liegen näher als min_distance am
+      zuletzt akzeptierten Umkehrpunkt - dort verwirft der Signifikanz-Filter
+      jeden Richtungswechsel (Hammer in Ruhe, z.B. vor dem Anschwingen)
+    - Verliert der Detektor den Hammer → ebenso (wie bei voller Detektion).
+      Nach miss_patience Fehlschlägen in Folge (Hammer nicht im Bild, z.B.
+      nach dem Abwurf) wird nur noch jeder max_stride-te Frame geprüft; der
+      erste Treffer holt die zurückgehaltenen Frames davor nach
+    - Sonst wird die ältere Lücke linear interpoliert. Lineare Werte liegen
+      zwischen ihren Stützpunkten, erzeugen also keinen neuen Richtungswechsel
+      - die Umkehrpunkte bleiben auf detektierten Frames.
+      Ausnahme: zwischen dem letzten akzeptierten Umkehrpunkt und dem letzten
+      Treffer liegen weniger als min_frames detektierte Punkte. Dort kann der
+      Index-Abstand des Signifikanz-Filters entscheiden, und ein interpolierter
+      Punkt an Stelle eines Aussetzers würde ihn verlängern → der Frame wird
+      detektiert.
+    """
+    significance = LiveEllipseDetector(min_distance=scheduler.min_distance, min_frames=scheduler.min_frames,
+                                       min_confidence=0)
+    tracked = []
+    detected_rows = [0]  # detected_rows[i]: detektierte (nicht interpolierte) Punkte unter tracked[:i]
+    window = []  # DecodedFrames nach dem letzten fertigen Treffer, Puffer noch belegt
+    hits = []    # Treffer im Fenster
+    tried = set()  # schon detektierte Frames im Fenster (auch ohne Treffer)
+    misses = 0     # Fehlschläge in Folge
+    next_detection = None
+
+    def run(frame):
+        scheduler.calls += 1
+        tried.add(frame.number)
+        detection = locate(frame)
+        return None if detection is None else TrackedFrame(frame.number, *detection, frame.timestamp)
+
+    def far_from_turn(frame):
+        """Liegen sicher min_frames detektierte Punkte zwischen letztem und nächstem Umkehrpunkt?
+
+        Bis zum letzten Treffer steigt X streng monoton (_may_turn), der
+        nächste Umkehrpunkt kommt also frühestens dort.
+        """
+        last = significance.last_turning_point
+        if last is None:
+            return False
+        before = detected_rows[-1] - detected_rows[last.sample_index + 1]
+        after = sum(hit.frame_number > frame.number for hit in hits)
+        return before + after >= scheduler.min_frames
+
+    def settle(count, fill):
+        """Die ersten `count` Frames des Fensters fertigstellen und freigeben.
+
+        Nicht detektierte Frames: fill='detect' (nachholen), 'interpolate' oder 'drop'.
+        """
+        detected = {hit.frame_number: hit for hit in hits}
+        anchor = tracked[-1] if tracked else None
+        for frame in window[:count]:
+            if frame.number in tried:
+                hit = detected.get(frame.number)
+            elif fill == 'detect' or (fill == 'interpolate' and not far_from_turn(frame)):
+                hit = run(frame)
+            elif fill == 'drop':
+                hit = None
+            else:
+                following = next(h for h in hits if h.frame_number > frame.number)
+                hit = _interpolate(anchor, following, frame)
+            if hit is not None:
+                tracked.append(hit)
+                detected_rows.append(detected_rows[-1] + (not hit.interpolated))
+                significance.push(hit.frame_number, *_center(hit.bounding_box))
+                if not hit.interpolated:
+                    anchor = hit
+            if release is not None and frame.slot is not None:
+                release(frame.slot)
+        last = window[count - 1].number
+        del window[:count]
+        hits[:] = [hit for hit in hits if hit.frame_number > last]
+        tried.difference_update([number for number in tried if number <= last])
+
+    for frame in frames:
+        scheduler.frames += 1
+        window.append(frame)
+        if next_detection is not None and frame.number < next_detection:
+            continue
+        hit = run(frame)
+        if hit is None:
+            misses += 1
+            settle(len(window), 'drop' if misses > scheduler.miss_patience else 'detect')
+            next_detection = frame.number + (scheduler.max_stride if misses >= scheduler.miss_patience else 1)
+            continue
+        hits.append(hit)
+        if misses >= scheduler.miss_patience or \
+                _may_turn((tracked[-2:] + hits)[-4:], significance.last_turning_point, scheduler):
+            settle(len(window), 'detect')
+        elif len(hits) >= 2:
+            settle(next(k for k, f in enumerate(window) if f.number == hits[-2].frame_number) + 1, 'interpolate')
+        misses = 0
+        recent = [(t.frame_number, *_center(t.bounding_box)) for t in (tracked[-3:] + hits)[-3:]]
+        next_detection = frame.number + scheduler.next_stride(recent)
+    if window:
+        settle(len(window), 'drop' if misses >= scheduler.miss_patience else 'detect')  # Ende: keine Stützstelle danach
+    return tracked
+
+
+def to_trajectory(tracked):
+    """[TrackedFrame] → Trajectory (x/y = Mitte der boundingBox, wie Trajectory.points)."""
+    boxes = np.array([frame.bounding_box for frame in tracked], dtype=np.float64).reshape(-1, 4)
+    return Trajectory(
+        frames=np.array([frame.frame_number for frame in tracked], dtype=np.int32),
+        x=boxes[:, 0] + boxes[:, 2] / 2,
+        y=boxes[:, 1] + boxes[:, 3] / 2,
+        confidence=np.array([frame.confidence for frame in tracked], dtype=np.float32),
+        timestamp=np.array([frame.timestamp for frame in tracked], dtype=np.float64),
+        torso_angle=np.array([np.nan if frame.torso_angle is None else frame.torso_angle for frame in tracked]),
+    )
+
+
+def _pose_starts(video, pose, single):
+    """Wurf-Starts eines Videos aus seinem Pose-Dump oder None (mit Meldung)."""
+    from pose_angles import load_keypoints
+    from start_detection import find_starts
+
+    pose = Path(pose)
+    if pose.is_dir():
+        candidates = [pose / f"{video.stem}{suffix}" for suffix in POSE_SUFFIXES]
+        dump = next((candidate for candidate in candidates if candidate.exists()), None)
+    else:
+        dump = pose if single and pose.exists() else None
+    if dump is None:
+        print(f"⚠️  {video.name}: Kein Pose-Dump gefunden - übersprungen", file=sys.stderr)
+        return None
+    try:
+        keypoints, frames = load_keypoints(dump)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"⚠️  {video.name}: {dump.name}: {error} - übersprungen", file=sys.stderr)
+        return None
+    starts = find_starts(keypoints, frames)
+    if not len(starts):
+        print(f"⚠️  {video.name}: Keine Start-Position in {dump.name} - übersprungen", file=sys.stderr)
+        return None
+    return starts
+
+
+def collect_videos(inputs, patterns=VIDEO_PATTERNS):
+    """Videos und Verzeichnisse (rekursiv) zu einer sortierten Dateiliste."""
+    videos = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            for pattern in patterns:
+                videos.extend(item.rglob(pattern))
+                videos.extend(item.rglob(pattern.upper()))
+        else:
+            videos.append(item)
+    return sorted(set(videos))
+
+
+def _may_turn(points, last_turning_point, scheduler):
+    """Kann zwischen den Punkten ein signifikanter Umkehrpunkt liegen?
+
+    `points`: die letzten fertigen Punkte und die Treffer danach - jede Lücke
+    braucht die X-Richtung davor und danach.
+    """
+    if len(points) < 3:
+        return False
+    centers = [_center(point.bounding_box) for point in points]
+    dx = np.diff([x for x, _ in centers])
+    if (np.all(dx > 0) or np.all(dx < 0)) and np.abs(dx).min() >= scheduler.turn_tolerance:
+        return False  # eindeutig gleiche Richtung
+    if last_turning_point is None:
+        return True
+    reach = scheduler.min_distance - 2 * scheduler.turn_tolerance  # Reserve für die Lücken
+    return any(math.hypot(x - last_turning_point.x, y - last_turning_point.y) >= reach for x, y in centers)
+
+
+def _interpolate(before, after, frame):
+    """Linear zwischen zwei Treffern interpolierter TrackedFrame für `frame`."""
+    s = (frame.number - before.frame_number) / (after.frame_number - before.frame_number)
+    box = tuple(a + s * (b - a) for a, b in zip(before.bounding_box, after.bounding_box))
+    return TrackedFrame(frame.number, box, before.confidence + s * (after.confidence - before.confidence),
+                        frame.timestamp, interpolated=True)
+
+
+def _center(box):
+    return box[0] + box[2] / 2, box[1] + box[3] / 2
+
+
+def _read_exactly(stream, buffer):
+    """Füllt `buffer` komplett aus dem Stream. False am Ende des Videos."""
+    view = memoryview(buffer).cast('B')
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            if filled:
+                raise EOFError(f"Unvollständiger Frame: {filled} von {len(view)} Bytes")
+            return False
+        filled += count
+    return True
+
+
+@lru_cache(maxsize=64)
+def _resize_index(shape, size):
+    """Zeilen-/Spalten-Indizes für nächster-Nachbar-Skalierung von `shape` auf `size` (gecacht)."""
+    return tuple(((np.arange(target) + 0.5) * source / target).astype(np.intp)
+                 for source, target in zip(shape, size))
+
+
+def _frame_rate(stream):
+    for key in ('avg_frame_rate', 'r_frame_rate'):
+        numerator, _, denominator = stream.get(key, '0/0').partition('/')
+        if float(denominator or 1) and float(numerator):
+            return float(numerator) / float(denominator or 1)
+    return 30.0
+
+
+def _rotation(stream):
+    """Drehung im Uhrzeigersinn: alter `rotate`-Tag oder Display-Matrix (gegen den Uhrzeigersinn)."""
+    if 'rotate' in stream.get('tags', {}):
+        return float(stream['tags']['rotate'])
+    for side_data in stream.get('side_data_list', []):
+        if 'rotation' in side_data:
+            return -float(side_data['rotation'])
+    return 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hammer in Videos erkennen (ohne iPhone)')
+    parser.add_argument('inputs', nargs='+', help='Videos oder Verzeichnisse')
+    detectors = parser.add_mutually_exclusive_group(required=True)
+    detectors.add_argument('--model', help='YOLO-Modell als ONNX (onnxruntime, CPU)')
+    detectors.add_argument('--replay', help='Geloggte Positionen abspielen (CSV, Log oder Archiv) statt Modell')
+    parser.add_argument('-o', '--output', default='-', help="Ziel: .csv (Frame,X,Y-Blöcke), .htarch oder '-'")
+    parser.add_argument('-j', '--workers', type=int, default=1, help='Detektor-Threads')
+    parser.add_argument('--decode-threads', type=int, default=0, help='ffmpeg-Threads (0 = automatisch)')
+    parser.add_argument('--threshold', type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument('--adaptive', action='store_true', help='Adaptive Schrittweite statt jedem Frame')
+    parser.add_argument('--max-stride', type=int, default=MAX_STRIDE, help='Größte Schrittweite (--adaptive)')
+    parser.add_argument('--roi', action='store_true', help='Nur ein Fenster um die vorhergesagte Position detektieren')
+    parser.add_argument('--kalman', action='store_true', help='Fenster-Vorhersage mit Kalman-Filter (nur --roi)')
+    parser.add_argument('--bridge', type=int, default=None, metavar='FRAMES',
+                        help='Lücken bis zu so vielen Frames mit Kalman-Schätzungen füllen')
+    parser.add_argument('--pose', default=None,
+                        help='Pose-Dump (.npz/.npy) oder Verzeichnis mit <Video-Name>.npz: nur ab Wurf-Starts detektieren')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_SECONDS,
+                        help='Sekunden ohne Hammer bis zum Ende eines Wurfs (--pose)')
+    args = parser.parse_args(argv)
+
+    detector = OnnxDetector(args.model) if args.model else ReplayDetector(load_trajectory(args.replay))
+    videos = collect_videos(args.inputs)
+    results = []
+    for path in videos:
+        if args.pose is None:
+            windows, timeout = [0], None
+        else:
+            windows, timeout = _pose_starts(path, args.pose, single=len(videos) == 1), args.timeout
+            if windows is None:
+                continue
+        end = -1
+        throws = 0
+        for start_frame in map(int, windows):
+            if start_frame <= end:
+                continue  # Start während des vorigen Wurfs (wie isDetectingPose)
+            name = path.stem if len(windows) == 1 else f"{path.stem}_{throws}"
+            throws += 1
+            start = time.perf_counter()
+            stride = AdaptiveStride(max_stride=args.max_stride) if args.adaptive else None
+            roi = RegionOfInterest(tracker=KalmanTracker() if args.kalman else None) if args.roi else None
+            tracked, info = track_video(path, detector, args.threshold, args.workers, args.decode_threads, stride,
+                                        roi, start_frame, timeout)
+            seconds = time.perf_counter() - start
+            if timeout is not None:
+                last = tracked[-1].frame_number if tracked else start_frame - 1
+                end = last + max(1, round(timeout * info.fps))
+            calls = f", {stride.calls}/{stride.frames} Detektor-Aufrufe" if stride else ''
+            if roi and roi.crops:
+                calls += (f", {roi.crops} Ausschnitte (∅ {roi.area / roi.crops:.0%} der Fläche, "
+                          f"{roi.fallbacks} ohne Treffer)")
+            window = f"Frames {start_frame}-{end}, " if timeout is not None else ''
+            print(f"🎬 {name}: {len(tracked)} Frames erkannt ({window}{info.orientation}, "
+                  f"{'x'.join(map(str, info.display_size))}) in {seconds:.1f} s{calls}", file=sys.stderr)
+            if not tracked:
+                print(f"⚠️  {name}: Kein Hammer im Video erkannt", file=sys.stderr)
+            trajectory = to_trajectory(tracked)
+            if args.bridge is not None and len(trajectory):
+                trajectory, estimated = bridge_gaps(trajectory, max_gap=args.bridge)
+                print(f"   {estimated.sum()} fehlende Frames mit Kalman-Schätzungen gefüllt", file=sys.stderr)
+            results.append((name, trajectory))
+
+    if not results:
+        print('❌ Keine Videos gefunden' if not videos else '❌ Keine Würfe gefunden', file=sys.stderr)
+        return 1
+    if args.output.endswith('.htarch'):
+        from trajectory_archive import ArchiveWriter
+        with ArchiveWriter(args.output) as writer:
+            for name, trajectory in results:
+                writer.add(trajectory, name=name)
+    else:
+        data = b''.join(format_trajectory_csv(trajectory) for _, trajectory in results)
+        if args.output == '-':
+            sys.stdout.buffer.write(data)
+        else:
+            Path(args.output).write_bytes(data)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
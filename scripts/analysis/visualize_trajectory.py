@@ -6,9 +6,12 @@ Visualisierung der Hammer-Trajektorie
 - Umkehrpunkte hervorgehoben
 """
 
-import matplotlib.pyplot as plt
+import sys
+
 import numpy as np
 
+from trajectory_io import load_trajectory, parse_trajectory
+
 # === DATEN AUS DEM LOG ===
 # CSV-Daten der detektierten Punkte
 csv_data = """Frame,X,Y
@@ -125,215 +128,185 @@ csv_data = """Frame,X,Y
 133,0.050018,0.478851
 134,0.005936,0.578964"""
 
-# Umkehrpunkte (aus dem Log)
-turning_points = [
-    {"frame": 0, "x": 0.782, "y": 0.399, "type": "Start", "is_max": False},
-    {"frame": 16, "x": 0.242, "y": 0.648, "type": "Minimum", "is_max": False},
-    {"frame": 32, "x": 0.914, "y": 0.393, "type": "Maximum", "is_max": True},
-    {"frame": 47, "x": 0.313, "y": 0.650, "type": "Minimum", "is_max": False},
-    {"frame": 62, "x": 0.237, "y": 0.517, "type": "Maximum", "is_max": True},
-    {"frame": 78, "x": 0.067, "y": 0.597, "type": "Minimum", "is_max": False},
-    {"frame": 96, "x": 0.977, "y": 0.546, "type": "Maximum", "is_max": True},
-]
-
-# Ellipsen-Zuordnung
-ellipses = [
-    {"name": "Ellipse 1", "start_frame": 0, "end_frame": 16, "angle": -24.73, "color": "#FF4444"},
-    {"name": "Ellipse 2", "start_frame": 32, "end_frame": 47, "angle": -23.09, "color": "#44FF44"},
-    {"name": "Ellipse 3", "start_frame": 62, "end_frame": 78, "angle": -25.19, "color": "#4444FF"},
-]
-
-# === CSV PARSEN ===
-lines = csv_data.strip().split('\n')[1:]  # Skip header
-data_points = []
-
-for line in lines:
-    parts = line.split(',')
-    frame = int(parts[0])
-    x = float(parts[1])
-    y = float(parts[2])
-    data_points.append({'frame': frame, 'x': x, 'y': y})
-
-# WICHTIG: Nach Frame-Nummer sortieren!
-data_points.sort(key=lambda p: p['frame'])
-
-# Extrahiere sortierte Arrays
-frames = [p['frame'] for p in data_points]
-x_coords = [p['x'] for p in data_points]
-y_coords = [p['y'] for p in data_points]
-
-print(f"📊 Geladene Punkte: {len(frames)}")
-print(f"🔢 Frame-Bereich: {frames[0]} → {frames[-1]}")
+OUTPUT_PATH = '/Users/merlinhummel/Documents/HammerTrack/trajectory_visualization.png'
+
+
+# === ANALYSE ===
+def analyze(trajectory):
+    """Umkehrpunkte und Ellipsen direkt aus der geladenen Trajektorie (wie `hammertrack plot`)."""
+    from rendering import analyze_throw, ellipse_colors
+    from turning_points import turning_point_types
+
+    tp_index, tp_is_maximum, segments = analyze_throw(trajectory)
+    turning_points = [
+        {"frame": int(trajectory.frames[i]), "x": float(trajectory.x[i]), "y": float(trajectory.y[i]),
+         "type": tp_type}
+        for i, tp_type in zip(tp_index.tolist(), turning_point_types(tp_is_maximum))
+    ]
+    ellipses = [
+        {"name": f"Ellipse {i + 1}", "start_frame": int(trajectory.frames[start]),
+         "end_frame": int(trajectory.frames[end]), "angle": float(angle), "color": color}
+        for i, (start, end, angle, color) in enumerate(zip(segments.start.tolist(), segments.end.tolist(),
+                                                           segments.angles.tolist(),
+                                                           ellipse_colors(len(segments))))
+    ]
+    return turning_points, ellipses
+
 
 # === VISUALISIERUNG ===
-fig, ax = plt.subplots(figsize=(14, 10))
-
-# === TRAJEKTORIE MIT LINIEN ===
-# Zeichne EINE durchgehende Bahn durch ALLE Punkte
-y_flipped = [1 - y for y in y_coords]
-
-# Grundlinie: Gesamte Trajektorie in grau
-ax.plot(
-    x_coords, y_flipped,
-    color='#CCCCCC',
-    linewidth=2.5,
-    alpha=0.4,
-    zorder=2,
-    linestyle='-'
-)
-
-# Zeichne Ellipsen-Segmente farbig darüber
-for ellipse in ellipses:
-    # Sammle alle Punkte dieser Ellipse in richtiger Reihenfolge
-    ellipse_x = []
-    ellipse_y = []
-
-    for i, frame in enumerate(frames):
-        if ellipse["start_frame"] <= frame <= ellipse["end_frame"]:
-            ellipse_x.append(x_coords[i])
-            ellipse_y.append(1 - y_coords[i])  # Y-Flip für Display
-
-    if len(ellipse_x) > 1:
-        # Zeichne farbige Linie für diese Ellipse
-        ax.plot(
-            ellipse_x, ellipse_y,
-            color=ellipse["color"],
-            linewidth=4,
-            alpha=0.8,
-            zorder=4,
-            label=f'{ellipse["name"]} ({ellipse["angle"]:.2f}°)'
-        )
+def render_figure(trajectory, turning_points, ellipses):
+    """Baut die Figure - wird bei einem Cache-Treffer nicht aufgerufen."""
+    from matplotlib.lines import Line2D
 
-# Zeichne ALLE Punkte
-ax.scatter(
-    x_coords, y_flipped,
-    s=50,
-    color='white',
-    alpha=0.6,
-    edgecolors='gray',
-    linewidth=0.6,
-    zorder=5
-)
-
-# Zeichne Ellipsen-Punkte farbig
-for ellipse in ellipses:
-    ellipse_x = []
-    ellipse_y = []
-
-    for i, frame in enumerate(frames):
-        if ellipse["start_frame"] <= frame <= ellipse["end_frame"]:
-            ellipse_x.append(x_coords[i])
-            ellipse_y.append(1 - y_coords[i])
-
-    if ellipse_x:
-        ax.scatter(
-            ellipse_x, ellipse_y,
-            s=70,
-            color=ellipse["color"],
-            alpha=0.9,
-            edgecolors='black',
-            linewidth=1,
-            zorder=6
-        )
+    from rendering import draw_segment_points, draw_segments, draw_turning_points, new_figure
+
+    fig, ax = new_figure((14, 10))
 
-# === UMKEHRPUNKTE HERVORHEBEN ===
-for i, tp in enumerate(turning_points):
-    color = '#FFD700' if tp["type"] == "Start" else '#FF1493' if tp["is_max"] else '#00CED1'
-    marker = 'o' if tp["type"] == "Start" else '^' if tp["is_max"] else 'v'
-    size = 500 if tp["type"] == "Start" else 350
+    # === TRAJEKTORIE MIT LINIEN ===
+    # Zeichne EINE durchgehende Bahn durch ALLE Punkte
+    y_flipped = 1 - trajectory.y
 
+    # Grundlinie: Gesamte Trajektorie in grau
+    ax.plot(
+        trajectory.x, y_flipped,
+        color='#CCCCCC',
+        linewidth=2.5,
+        alpha=0.4,
+        zorder=2,
+        linestyle='-'
+    )
+
+    # Frame-Bereich jeder Ellipse → Zeilen-Indizes (Frames sind sortiert)
+    colors = [ellipse["color"] for ellipse in ellipses]
+    start = np.searchsorted(trajectory.frames, [e["start_frame"] for e in ellipses], side='left')
+    end = np.searchsorted(trajectory.frames, [e["end_frame"] for e in ellipses], side='right') - 1
+
+    # Ellipsen-Segmente farbig darüber - EINE LineCollection
+    draw_segments(ax, trajectory.x, y_flipped, start, end, colors, linewidth=4, alpha=0.8, zorder=4)
+
+    # Zeichne ALLE Punkte
     ax.scatter(
-        tp["x"], 1 - tp["y"],
-        s=size,
-        color=color,
-        marker=marker,
-        edgecolors='black',
-        linewidth=3,
-        zorder=10,
-        alpha=0.95
+        trajectory.x, y_flipped,
+        s=50,
+        color='white',
+        alpha=0.6,
+        edgecolors='gray',
+        linewidth=0.6,
+        zorder=5
     )
 
-    # Label mit Frame-Nummer
-    label_text = f'TP{i}\nF{tp["frame"]}'
-    offset = 0.07
+    # Ellipsen-Punkte farbig
+    draw_segment_points(ax, trajectory.x, y_flipped, start, end, colors, s=70, alpha=0.9, linewidth=1, zorder=6)
+
+    # === UMKEHRPUNKTE HERVORHEBEN ===
+    draw_turning_points(ax, [tp["x"] for tp in turning_points], [1 - tp["y"] for tp in turning_points],
+                        [tp["type"] for tp in turning_points], size=350, start_size=500)
+
+    for i, tp in enumerate(turning_points):
+        # Label mit Frame-Nummer
+        label_text = f'TP{i}\nF{tp["frame"]}'
+        offset = 0.07
+        ax.text(
+            tp["x"], 1 - tp["y"] - offset,
+            label_text,
+            ha='center', va='top',
+            fontsize=10, fontweight='bold',
+            bbox=dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.9, edgecolor='black', linewidth=2)
+        )
+
+    # === START/ENDE MARKIERUNG ===
+    # Start
     ax.text(
-        tp["x"], 1 - tp["y"] - offset,
-        label_text,
+        trajectory.x[0], 1 - trajectory.y[0] + 0.08,
+        'START',
+        ha='center', va='bottom',
+        fontsize=11, fontweight='bold',
+        color='darkgreen',
+        bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.9, edgecolor='darkgreen', linewidth=2)
+    )
+
+    # Ende
+    ax.text(
+        trajectory.x[-1], 1 - trajectory.y[-1] - 0.08,
+        'ENDE',
         ha='center', va='top',
-        fontsize=10, fontweight='bold',
-        bbox=dict(boxstyle='round,pad=0.5', facecolor='white', alpha=0.9, edgecolor='black', linewidth=2)
+        fontsize=11, fontweight='bold',
+        color='darkred',
+        bbox=dict(boxstyle='round,pad=0.5', facecolor='lightcoral', alpha=0.9, edgecolor='darkred', linewidth=2)
     )
 
-# === START/ENDE MARKIERUNG ===
-# Start
-ax.text(
-    x_coords[0], 1 - y_coords[0] + 0.08,
-    'START',
-    ha='center', va='bottom',
-    fontsize=11, fontweight='bold',
-    color='darkgreen',
-    bbox=dict(boxstyle='round,pad=0.5', facecolor='lightgreen', alpha=0.9, edgecolor='darkgreen', linewidth=2)
-)
-
-# Ende
-ax.text(
-    x_coords[-1], 1 - y_coords[-1] - 0.08,
-    'ENDE',
-    ha='center', va='top',
-    fontsize=11, fontweight='bold',
-    color='darkred',
-    bbox=dict(boxstyle='round,pad=0.5', facecolor='lightcoral', alpha=0.9, edgecolor='darkred', linewidth=2)
-)
-
-# === LAYOUT ===
-ax.set_xlim(-0.05, 1.05)
-ax.set_ylim(-0.05, 1.05)
-ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
-ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
-ax.set_title('HammerTrack: Trajektorie der Hammerbewegung\n112 Frames • 3 Ellipsen • 7 Umkehrpunkte',
-             fontsize=15, fontweight='bold', pad=20)
-ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
-ax.set_aspect('equal')
-
-# Legende
-legend_elements = [
-    plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#FFD700',
-               markersize=14, label='Start (TP0)', markeredgecolor='black', markeredgewidth=2),
-    plt.Line2D([0], [0], marker='^', color='w', markerfacecolor='#FF1493',
-               markersize=13, label='Maximum', markeredgecolor='black', markeredgewidth=2),
-    plt.Line2D([0], [0], marker='v', color='w', markerfacecolor='#00CED1',
-               markersize=13, label='Minimum', markeredgecolor='black', markeredgewidth=2),
-]
-for ellipse in ellipses:
-    legend_elements.append(
-        plt.Line2D([0], [0], color=ellipse["color"], linewidth=3,
-                   label=f'{ellipse["name"]}: {ellipse["angle"]:.2f}°', alpha=0.7)
+    # === LAYOUT ===
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+    ax.set_xlabel('X-Position (normalisiert)', fontsize=13, fontweight='bold')
+    ax.set_ylabel('Y-Position (normalisiert, geflippt)', fontsize=13, fontweight='bold')
+    ax.set_title(f'HammerTrack: Trajektorie der Hammerbewegung\n{len(trajectory)} Frames • '
+                 f'{len(ellipses)} Ellipsen • {len(turning_points)} Umkehrpunkte',
+                 fontsize=15, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
+    ax.set_aspect('equal')
+
+    # Legende
+    legend_elements = [
+        Line2D([0], [0], marker='o', color='w', markerfacecolor='#FFD700',
+                   markersize=14, label='Start (TP0)', markeredgecolor='black', markeredgewidth=2),
+        Line2D([0], [0], marker='^', color='w', markerfacecolor='#FF1493',
+                   markersize=13, label='Maximum', markeredgecolor='black', markeredgewidth=2),
+        Line2D([0], [0], marker='v', color='w', markerfacecolor='#00CED1',
+                   markersize=13, label='Minimum', markeredgecolor='black', markeredgewidth=2),
+    ]
+    for ellipse in ellipses:
+        legend_elements.append(
+            Line2D([0], [0], color=ellipse["color"], linewidth=3,
+                       label=f'{ellipse["name"]}: {ellipse["angle"]:.2f}°', alpha=0.7)
+        )
+
+    ax.legend(handles=legend_elements, loc='upper right', fontsize=11, framealpha=0.95, edgecolor='black', fancybox=True)
+
+    # Info-Box
+    average = f"{np.mean([e['angle'] for e in ellipses]):.2f}°" if ellipses else '–'
+    info_text = f"""Detektions-Statistik:
+    • {len(trajectory)} Frames detektiert ({trajectory.frames[0]}-{trajectory.frames[-1]})
+    • {len(turning_points)} Umkehrpunkte gefunden
+    • {len(ellipses)} Ellipsen gebildet
+    • Durchschnittlicher Winkel: {average}"""
+
+    ax.text(
+        0.02, 0.98, info_text,
+        transform=ax.transAxes,
+        fontsize=10,
+        verticalalignment='top',
+        bbox=dict(boxstyle='round,pad=1', facecolor='lightyellow', alpha=0.9, edgecolor='black', linewidth=2),
+        family='monospace'
     )
 
-ax.legend(handles=legend_elements, loc='upper right', fontsize=11, framealpha=0.95, edgecolor='black', fancybox=True)
-
-# Info-Box
-info_text = f"""Detektions-Statistik:
-• 112 Frames detektiert (0-134)
-• 7 Umkehrpunkte gefunden
-• 3 Ellipsen gebildet
-• Durchschnittlicher Winkel: -24.33°
-• Video: Portrait 1080x1920
-• Alle Ellipsen fallen nach links"""
-
-ax.text(
-    0.02, 0.98, info_text,
-    transform=ax.transAxes,
-    fontsize=10,
-    verticalalignment='top',
-    bbox=dict(boxstyle='round,pad=1', facecolor='lightyellow', alpha=0.9, edgecolor='black', linewidth=2),
-    family='monospace'
-)
-
-plt.tight_layout()
-output_path = '/Users/merlinhummel/Documents/HammerTrack/trajectory_visualization.png'
-plt.savefig(output_path, dpi=150, bbox_inches='tight')
-print(f"✅ Visualisierung gespeichert: {output_path}")
-print(f"📊 {len(frames)} Punkte visualisiert")
-print(f"🎯 {len(turning_points)} Umkehrpunkte markiert")
-print(f"📐 {len(ellipses)} Ellipsen als Bahnen dargestellt")
+    fig.tight_layout()
+    return fig
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Datei, Xcode-Log oder '-' (stdin) als Argument - sonst die eingebetteten Daten
+    trajectory = load_trajectory(argv[0]) if argv else parse_trajectory(csv_data)
+
+    print(f"📊 Geladene Punkte: {len(trajectory)}")
+    print(f"🔢 Frame-Bereich: {trajectory.frames[0]} → {trajectory.frames[-1]}")
+
+    import rendering
+    from render_cache import render_cached
+
+    turning_points, ellipses = analyze(trajectory)
+    cached = render_cached(OUTPUT_PATH, lambda: render_figure(trajectory, turning_points, ellipses),
+                           arrays=(trajectory.frames, trajectory.x, trajectory.y),
+                           params={'turning_points': turning_points, 'ellipses': ellipses,
+                                   'style': rendering.STYLE_PARAMS},
+                           style_sources=(render_figure, *rendering.STYLE_SOURCES), dpi=150, bbox_inches='tight')
+    print(f"✅ Visualisierung gespeichert: {OUTPUT_PATH}{' (aus Cache)' if cached else ''}")
+    print(f"📊 {len(trajectory)} Punkte visualisiert")
+    print(f"🎯 {len(turning_points)} Umkehrpunkte markiert")
+    print(f"📐 {len(ellipses)} Ellipsen als Bahnen dargestellt")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
-import os
-from PIL import Image
+"""
+App-Icons für das Xcode-Asset-Katalog erzeugen
+Skaliert das Quellbild auf alle Größen und schreibt Contents.json.
+
+Verwendung:
+    python generate_app_icons.py [--source logo.png] [--output AppIcon.appiconset]
+"""
+
+import argparse
 import json
+import os
+import sys
 
 # Pfade definieren
-base_path = "/Users/merlinhummel/Documents/HammerTrack/Hammer Track/Assets.xcassets/AppIcon.appiconset"
-source_image_path = os.path.join(base_path, "logo dark.png")
-output_path = base_path
+BASE_PATH = "/Users/merlinhummel/Documents/HammerTrack/Hammer Track/Assets.xcassets/AppIcon.appiconset"
+SOURCE_IMAGE_PATH = os.path.join(BASE_PATH, "logo dark.png")
 
 # Icon-Größen definieren (exakt wie im Screenshot)
 icon_configs = [
@@ -49,66 +57,87 @@ icon_configs = [
     {"idiom": "ios-marketing", "size": "1024x1024", "scale": "1x", "filename": "icon-1024x1024.png"}
 ]
 
-# Contents.json erstellen
-contents = {
-    "images": icon_configs,
-    "info": {
-        "author": "xcode",
-        "version": 1
+
+def icon_sizes(configs=icon_configs):
+    """(Pixel-Größe, Dateiname) aller Icons - die Größe steht im Dateinamen."""
+    sizes_to_generate = set()
+    for config in configs:
+        filename = config["filename"]
+        # Größe aus Dateinamen extrahieren
+        size_str = filename.replace("icon-", "").replace(".png", "").split("-")[0]
+        size = int(size_str.split("x")[0])
+        sizes_to_generate.add((size, filename))
+    return sizes_to_generate
+
+
+def generate_icons(source_image_path=SOURCE_IMAGE_PATH, output_path=BASE_PATH):
+    """Erzeugt alle Icons und Contents.json. Gibt den Exit-Code zurück."""
+    from PIL import Image
+
+    # Contents.json erstellen
+    contents = {
+        "images": icon_configs,
+        "info": {
+            "author": "xcode",
+            "version": 1
+        }
     }
-}
 
-print("🎨 Generiere App Icons...")
-print(f"📂 Quellbild: {source_image_path}")
-print(f"📂 Ausgabeordner: {output_path}")
-print("")
+    print("🎨 Generiere App Icons...")
+    print(f"📂 Quellbild: {source_image_path}")
+    print(f"📂 Ausgabeordner: {output_path}")
+    print("")
 
-# Quellbild laden
-try:
-    source_image = Image.open(source_image_path)
-    print(f"✅ Quellbild geladen: {source_image.size[0]}x{source_image.size[1]} Pixel")
-    
-    # In RGBA konvertieren für Transparenz-Support
-    if source_image.mode != 'RGBA':
-        source_image = source_image.convert('RGBA')
-    
-except Exception as e:
-    print(f"❌ Fehler beim Laden des Quellbilds: {e}")
-    exit(1)
-
-# Alle benötigten Größen extrahieren
-sizes_to_generate = set()
-for config in icon_configs:
-    filename = config["filename"]
-    # Größe aus Dateinamen extrahieren
-    size_str = filename.replace("icon-", "").replace(".png", "").split("-")[0]
-    size = int(size_str.split("x")[0])
-    sizes_to_generate.add((size, filename))
-
-# Icons generieren
-for size, filename in sizes_to_generate:
-    filepath = os.path.join(output_path, filename)
-    
+    # Quellbild laden
     try:
-        # Icon erstellen mit Antialiasing
-        icon = source_image.resize((size, size), Image.Resampling.LANCZOS)
-        
-        # Als PNG speichern
-        icon.save(filepath, "PNG", optimize=True)
-        print(f"✅ Erstellt: {filename} ({size}x{size})")
-            
+        source_image = Image.open(source_image_path)
+        print(f"✅ Quellbild geladen: {source_image.size[0]}x{source_image.size[1]} Pixel")
+
+        # In RGBA konvertieren für Transparenz-Support
+        if source_image.mode != 'RGBA':
+            source_image = source_image.convert('RGBA')
+
     except Exception as e:
-        print(f"❌ Fehler beim Erstellen von {filename}: {e}")
-
-# Contents.json speichern
-contents_path = os.path.join(output_path, "Contents.json")
-try:
-    with open(contents_path, 'w') as f:
-        json.dump(contents, f, indent=2)
-    print(f"\n✅ Contents.json aktualisiert")
-except Exception as e:
-    print(f"❌ Fehler beim Speichern von Contents.json: {e}")
-
-print("\n🎉 Icon-Generierung abgeschlossen!")
-print(f"📁 Alle Icons wurden in {output_path} gespeichert")
-print("\n🔄 Nächster Schritt: Erstelle ein neues Archive in Xcode")
+        print(f"❌ Fehler beim Laden des Quellbilds: {e}")
+        return 1
+
+    # Icons generieren
+    for size, filename in icon_sizes():
+        filepath = os.path.join(output_path, filename)
+
+        try:
+            # Icon erstellen mit Antialiasing
+            icon = source_image.resize((size, size), Image.Resampling.LANCZOS)
+
+            # Als PNG speichern
+            icon.save(filepath, "PNG", optimize=True)
+            print(f"✅ Erstellt: {filename} ({size}x{size})")
+
+        except Exception as e:
+            print(f"❌ Fehler beim Erstellen von {filename}: {e}")
+
+    # Contents.json speichern
+    contents_path = os.path.join(output_path, "Contents.json")
+    try:
+        with open(contents_path, 'w') as f:
+            json.dump(contents, f, indent=2)
+        print(f"\n✅ Contents.json aktualisiert")
+    except Exception as e:
+        print(f"❌ Fehler beim Speichern von Contents.json: {e}")
+
+    print("\n🎉 Icon-Generierung abgeschlossen!")
+    print(f"📁 Alle Icons wurden in {output_path} gespeichert")
+    print("\n🔄 Nächster Schritt: Erstelle ein neues Archive in Xcode")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='App-Icons aus einem Quellbild erzeugen')
+    parser.add_argument('--source', default=SOURCE_IMAGE_PATH, help='Quellbild (PNG)')
+    parser.add_argument('--output', default=BASE_PATH, help='AppIcon.appiconset-Verzeichnis')
+    args = parser.parse_args(argv)
+    return generate_icons(args.source, args.output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())